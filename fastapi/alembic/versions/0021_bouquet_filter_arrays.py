@@ -0,0 +1,93 @@
+"""bouquet flower type and color token arrays
+
+Revision ID: 0021_bouquet_filter_arrays
+Revises: 0020_order_delivery_datetime
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0021_bouquet_filter_arrays"
+down_revision = "0020_order_delivery_datetime"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "Bouquet",
+        sa.Column(
+            "flowerTypes",
+            postgresql.ARRAY(sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::text[]"),
+        ),
+    )
+    op.add_column(
+        "Bouquet",
+        sa.Column(
+            "colorTokens",
+            postgresql.ARRAY(sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::text[]"),
+        ),
+    )
+
+    # flowerType is always part of the array so a single && covers the old
+    # "flowerType = X OR style LIKE '%x%'" filter.
+    op.execute(
+        """
+        UPDATE "Bouquet"
+        SET "flowerTypes" = ARRAY(
+            SELECT DISTINCT TRIM(token)
+            FROM unnest(
+                ARRAY["flowerType"::text]
+                || string_to_array(UPPER(COALESCE("style", '')), ',')
+            ) AS token
+            WHERE TRIM(token) <> ''
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE "Bouquet"
+        SET "colorTokens" = ARRAY(
+            SELECT DISTINCT CASE TRIM(token)
+                WHEN 'blush' THEN 'pink'
+                WHEN 'ivory' THEN 'white'
+                WHEN 'ruby' THEN 'burgundy'
+                WHEN 'sage' THEN 'light blue'
+                WHEN 'champagne' THEN 'yellow'
+                WHEN 'champange' THEN 'yellow'
+                ELSE TRIM(token)
+            END
+            FROM unnest(string_to_array(LOWER(COALESCE("colors", '')), ',')) AS token
+            WHERE TRIM(token) <> ''
+        )
+        """
+    )
+
+    op.create_index(
+        "ix_Bouquet_flowerTypes",
+        "Bouquet",
+        ["flowerTypes"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_Bouquet_colorTokens",
+        "Bouquet",
+        ["colorTokens"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    op.drop_index("ix_Bouquet_colorTokens", table_name="Bouquet")
+    op.drop_index("ix_Bouquet_flowerTypes", table_name="Bouquet")
+    op.drop_column("Bouquet", "colorTokens")
+    op.drop_column("Bouquet", "flowerTypes")
@@ -0,0 +1,40 @@
+"""bouquet catalog keyset sort indexes
+
+Revision ID: 0022_bouquet_catalog_sort_indexes
+Revises: 0021_bouquet_filter_arrays
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0022_bouquet_catalog_sort_indexes"
+down_revision = "0021_bouquet_filter_arrays"
+branch_labels = None
+depends_on = None
+
+
+# One (sort key, id) index per catalog sort; ascending and descending pages
+# scan the same index in opposite directions.
+SORT_INDEXES = {
+    "ix_Bouquet_active_createdAt_id": ['"createdAt"', "id"],
+    "ix_Bouquet_active_priceCents_id": ['"priceCents"', "id"],
+    "ix_Bouquet_active_lowerName_id": ["LOWER(COALESCE(name, ''))", "id"],
+}
+
+
+def upgrade():
+    for name, columns in SORT_INDEXES.items():
+        op.create_index(
+            name,
+            "Bouquet",
+            [sa.text(column) for column in columns],
+            unique=False,
+            postgresql_where=sa.text('"isActive" IS TRUE'),
+        )
+
+
+def downgrade():
+    for name in reversed(list(SORT_INDEXES)):
+        op.drop_index(name, table_name="Bouquet")
@@ -0,0 +1,42 @@
+"""bouquet full-text search vector
+
+Revision ID: 0023_bouquet_search_vector
+Revises: 0022_bouquet_catalog_sort_indexes
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0023_bouquet_search_vector"
+down_revision = "0022_bouquet_catalog_sort_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Flower types are stored as ROSE/SPRAY_ROSES, so underscores become spaces
+    # before stemming; name ranks above style/colors, description lowest.
+    op.execute(
+        """
+        ALTER TABLE "Bouquet"
+        ADD COLUMN "searchVector" tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE("name", '')), 'A')
+            || setweight(
+                to_tsvector('english', REPLACE(COALESCE("style", ''), '_', ' ')),
+                'B'
+            )
+            || setweight(to_tsvector('english', COALESCE("colors", '')), 'B')
+            || setweight(to_tsvector('english', COALESCE("description", '')), 'C')
+        ) STORED
+        """
+    )
+    op.execute(
+        'CREATE INDEX "ix_Bouquet_searchVector" ON "Bouquet" USING GIN ("searchVector")'
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS "ix_Bouquet_searchVector"')
+    op.execute('ALTER TABLE "Bouquet" DROP COLUMN IF EXISTS "searchVector"')
@@ -0,0 +1,51 @@
+"""add delivery geocode cache
+
+Revision ID: 0024_delivery_geocode_cache
+Revises: 0023_bouquet_search_vector
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0024_delivery_geocode_cache"
+down_revision = "0023_bouquet_search_vector"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "DeliveryGeocodeCache",
+        sa.Column("addressKey", sa.String(), nullable=False),
+        sa.Column("baseAddress", sa.String(), nullable=False),
+        sa.Column("formattedAddress", sa.String(), nullable=True),
+        sa.Column("lat", sa.Float(), nullable=True),
+        sa.Column("lng", sa.Float(), nullable=True),
+        sa.Column("miles", sa.Float(), nullable=True),
+        sa.Column("distanceText", sa.String(), nullable=True),
+        sa.Column("providerStatus", sa.String(), nullable=True),
+        sa.Column("errorStage", sa.String(), nullable=True),
+        sa.Column("errorCode", sa.String(), nullable=True),
+        sa.Column("errorMessage", sa.String(), nullable=True),
+        sa.Column("expiresAt", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updatedAt",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("addressKey"),
+    )
+    op.create_index(
+        "ix_DeliveryGeocodeCache_expiresAt",
+        "DeliveryGeocodeCache",
+        ["expiresAt"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_DeliveryGeocodeCache_expiresAt", table_name="DeliveryGeocodeCache")
+    op.drop_table("DeliveryGeocodeCache")
@@ -0,0 +1,43 @@
+"""typed, indexed order delivery schedule columns
+
+Revision ID: 0025_order_delivery_schedule
+Revises: 0024_delivery_geocode_cache
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0025_order_delivery_schedule"
+down_revision = "0024_delivery_geocode_cache"
+branch_labels = None
+depends_on = None
+
+
+# Existing rows are filled by scripts/backfill_delivery_schedule.py in batches
+# rather than here, so the migration never holds a long lock on "Order".
+def upgrade():
+    op.add_column("Order", sa.Column("deliveryDate", sa.Date(), nullable=True))
+    op.add_column("Order", sa.Column("deliveryWindow", sa.String(), nullable=True))
+    op.add_column("Order", sa.Column("deliveryIdealTime", sa.Time(), nullable=True))
+    op.create_index(
+        "ix_Order_isDeleted_deliveryDate_idealTime",
+        "Order",
+        ["isDeleted", "deliveryDate", "deliveryIdealTime"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_Order_deliveryDate_window_status",
+        "Order",
+        ["deliveryDate", "deliveryWindow", "status"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_Order_deliveryDate_window_status", table_name="Order")
+    op.drop_index("ix_Order_isDeleted_deliveryDate_idealTime", table_name="Order")
+    op.drop_column("Order", "deliveryIdealTime")
+    op.drop_column("Order", "deliveryWindow")
+    op.drop_column("Order", "deliveryDate")
@@ -0,0 +1,47 @@
+"""delivery slot capacity and order slot reservations
+
+Revision ID: 0026_delivery_slots
+Revises: 0025_order_delivery_schedule
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0026_delivery_slots"
+down_revision = "0025_order_delivery_schedule"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "DeliverySlot",
+        sa.Column("deliveryDate", sa.Date(), nullable=False),
+        sa.Column("window", sa.String(), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        sa.Column("reserved", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "updatedAt",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("deliveryDate", "window"),
+        sa.CheckConstraint('"reserved" >= 0', name="ck_DeliverySlot_reserved"),
+    )
+    op.add_column(
+        "Order",
+        sa.Column(
+            "deliverySlotReserved",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.text("false"),
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("Order", "deliverySlotReserved")
+    op.drop_table("DeliverySlot")
@@ -0,0 +1,23 @@
+"""order provider sync freshness marker
+
+Revision ID: 0027_order_synced_at
+Revises: 0026_delivery_slots
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0027_order_synced_at"
+down_revision = "0026_delivery_slots"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("Order", sa.Column("syncedAt", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column("Order", "syncedAt")
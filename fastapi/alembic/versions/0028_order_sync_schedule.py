@@ -0,0 +1,30 @@
+"""per-order provider sync schedule
+
+Revision ID: 0028_order_sync_schedule
+Revises: 0027_order_synced_at
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0028_order_sync_schedule"
+down_revision = "0027_order_synced_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("Order", sa.Column("nextSyncAt", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "Order",
+        sa.Column("syncAttempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_index("ix_Order_status_nextSyncAt", "Order", ["status", "nextSyncAt"])
+
+
+def downgrade():
+    op.drop_index("ix_Order_status_nextSyncAt", table_name="Order")
+    op.drop_column("Order", "syncAttempts")
+    op.drop_column("Order", "nextSyncAt")
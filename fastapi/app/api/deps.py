@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import logging
+from typing import AsyncIterator
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.critical_logging import log_critical_event
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal, SessionLocal, get_async_engine
 from app.core.security import decode_access_token
 from app.models.user import User
 from app.models.enums import Role
@@ -22,6 +24,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+
 security = HTTPBearer(auto_error=False)
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -8,7 +8,13 @@ from app.api.deps import get_db, require_admin
 from app.models.bouquet import Bouquet
 from app.models.enums import BouquetType, FlowerType
 from app.schemas.bouquet import BouquetCreate, BouquetOut, BouquetUpdate
+from app.schemas.catalog import BouquetBatchRequest, BouquetBatchResponse, CatalogItem
+from app.services.bouquet_tokens import apply_search_tokens
+from app.services.catalog_snapshot import refresh_catalog_snapshot
 from app.services.colors import normalize_color_csv
+from app.services.pricing import get_bouquet_pricing_batch
+from app.services.settings import get_store_settings
+from app.utils.http_cache import build_etag, not_modified_or_tag, table_content_version
 
 router = APIRouter(prefix="/api/bouquets", tags=["bouquets"])
 
@@ -16,6 +22,7 @@ FLOWER_TYPE_VALUES = {member.value for member in FlowerType}
 FLOWER_QUANTITY_MIN = 1
 FLOWER_QUANTITY_MAX = 1001
 FLOWER_QUANTITY_ELIGIBLE_TYPES = {BouquetType.MONO, BouquetType.SEASON}
+BOUQUET_BATCH_MAX_IDS = 100
 
 
 def _normalize_flower_types_csv(value: str | None, fallback: FlowerType | str | None) -> str:
@@ -67,16 +74,92 @@ def _normalize_default_flower_quantity(value: object) -> int:
 
 @router.get("", response_model=list[BouquetOut])
 def list_bouquets(
+    request: Request,
+    response: Response,
     include_inactive: bool = Query(default=False),
     db: Session = Depends(get_db),
 ):
-    stmt = select(Bouquet)
-    if not include_inactive:
-        stmt = stmt.where(Bouquet.is_active.is_(True))
+    criteria = [] if include_inactive else [Bouquet.is_active.is_(True)]
+    etag = build_etag(
+        "bouquets", include_inactive, table_content_version(db, Bouquet, *criteria)
+    )
+    not_modified = not_modified_or_tag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    stmt = select(Bouquet).where(*criteria)
     stmt = stmt.order_by(Bouquet.created_at.desc())
     return db.execute(stmt).scalars().all()
 
 
+def _normalize_batch_ids(raw_ids: list[str]) -> list[str]:
+    # Sorted and de-duplicated so every ordering of the same id set shares one
+    # response body and ETag.
+    ids = sorted({value.strip() for value in raw_ids if value and value.strip()})
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one bouquet id is required.")
+    if len(ids) > BOUQUET_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BOUQUET_BATCH_MAX_IDS} bouquet ids are allowed.",
+        )
+    return ids
+
+
+def _load_bouquet_batch(db: Session, ids: list[str]):
+    bouquets = db.execute(select(Bouquet).where(Bouquet.id.in_(ids))).scalars().all()
+    found = {bouquet.id: bouquet for bouquet in bouquets}
+    active, missing, inactive = [], [], []
+    for bouquet_id in ids:
+        bouquet = found.get(bouquet_id)
+        if bouquet is None:
+            missing.append(bouquet_id)
+        elif bouquet.is_active:
+            active.append(bouquet)
+        else:
+            inactive.append(bouquet_id)
+    return active, missing, inactive
+
+
+def _bouquet_batch_response(db: Session, active, missing, inactive) -> BouquetBatchResponse:
+    settings = get_store_settings(db)
+    return BouquetBatchResponse(
+        items=[
+            CatalogItem(bouquet=BouquetOut.model_validate(bouquet), pricing=pricing)
+            for bouquet, pricing in zip(active, get_bouquet_pricing_batch(active, settings))
+        ],
+        missing=missing,
+        inactive=inactive,
+    )
+
+
+@router.get("/batch", response_model=BouquetBatchResponse)
+def get_bouquet_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(min_length=1),
+    db: Session = Depends(get_db),
+):
+    normalized_ids = _normalize_batch_ids(ids.split(","))
+    active, missing, inactive = _load_bouquet_batch(db, normalized_ids)
+    etag = build_etag(
+        "bouquets-batch",
+        get_store_settings(db),
+        [(bouquet.id, bouquet.updated_at) for bouquet in active],
+        missing,
+        inactive,
+    )
+    not_modified = not_modified_or_tag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return _bouquet_batch_response(db, active, missing, inactive)
+
+
+@router.post("/batch", response_model=BouquetBatchResponse)
+def post_bouquet_batch(payload: BouquetBatchRequest, db: Session = Depends(get_db)):
+    active, missing, inactive = _load_bouquet_batch(db, _normalize_batch_ids(payload.ids))
+    return _bouquet_batch_response(db, active, missing, inactive)
+
+
 @router.get("/{bouquet_id}", response_model=BouquetOut)
 def get_bouquet(bouquet_id: str, db: Session = Depends(get_db)):
     bouquet = db.get(Bouquet, bouquet_id)
@@ -107,9 +190,11 @@ def create_bouquet(
     data["style"] = _normalize_flower_types_csv(data.get("style"), data.get("flower_type"))
     data["flower_type"] = FlowerType(data["style"].split(",")[0].strip())
     bouquet = Bouquet(**data)
+    apply_search_tokens(bouquet)
     db.add(bouquet)
     db.commit()
     db.refresh(bouquet)
+    refresh_catalog_snapshot(db)
     return bouquet
 
 
@@ -147,8 +232,10 @@ def update_bouquet(
     data["default_flower_quantity"] = default_flower_quantity
     for key, value in data.items():
         setattr(bouquet, key, value)
+    apply_search_tokens(bouquet)
     db.commit()
     db.refresh(bouquet)
+    refresh_catalog_snapshot(db)
     return bouquet
 
 
@@ -163,4 +250,5 @@ def delete_bouquet(
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(bouquet)
     db.commit()
+    refresh_catalog_snapshot(db)
     return {"ok": True}
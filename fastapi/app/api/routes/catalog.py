@@ -1,20 +1,45 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Float, and_, func, literal_column, or_, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.core.security import load_opaque_payload, sign_opaque_payload
 from app.models.bouquet import Bouquet
 from app.models.enums import BouquetType, FlowerType
-from app.schemas.catalog import CatalogResponse
+from app.models.types import array_overlaps
+from app.schemas.catalog import (
+    CatalogFacetsResponse,
+    CatalogItem,
+    CatalogResponse,
+    FacetCount,
+    PriceBucket,
+)
 from app.schemas.bouquet import BouquetOut
+from app.services.catalog_snapshot import (
+    CatalogCursor,
+    CatalogFilters,
+    CatalogPage,
+    catalog_sort_columns,
+    decode_catalog_cursor,
+    encode_catalog_cursor,
+    get_catalog_snapshot,
+)
 from app.services.colors import color_filter_candidates
-from app.services.pricing import get_bouquet_pricing
+from app.services.pricing import get_bouquet_pricing_batch
 from app.services.settings import get_store_settings
+from app.utils.http_cache import build_etag, not_modified_or_tag
 
 router = APIRouter(prefix="/api/catalog", tags=["catalog"])
 
+SEARCH_QUERY_MAX_LENGTH = 200
+SEARCH_CURSOR_PURPOSE = "catalog_search_cursor"
+# Generated column maintained by Postgres (see migration 0023); not mapped on
+# the model so other dialects can still create the table.
+SEARCH_VECTOR = literal_column('"Bouquet"."searchVector"')
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
 
 def _normalize_enum(value: str | None, enum_cls):
     if not value:
@@ -64,37 +89,39 @@ def _normalize_sort(value: str | None) -> str:
     return "created_desc"
 
 
-@router.get("", response_model=CatalogResponse)
-def list_catalog(
-    flower: str | None = None,
-    color: str | None = None,
-    bouquet_type: str | None = Query(default=None, alias="bouquetType"),
-    style: str | None = None,
-    mixed: str | None = None,
-    min: float | None = Query(default=None, alias="min"),
-    max: float | None = Query(default=None, alias="max"),
-    sort: str | None = None,
-    filter: str | None = None,
-    cursor: str | None = None,
-    take: int = Query(default=12, ge=1, le=50),
-    db: Session = Depends(get_db),
-):
-    filters = [Bouquet.is_active.is_(True)]
-    if filter == "featured":
-        filters.append(Bouquet.is_featured.is_(True))
-
-    selected_flowers = _parse_flower_filters(flower)
-    if selected_flowers:
-        flower_filters = []
-        for flower_enum in selected_flowers:
-            token = flower_enum.value.lower()
-            flower_filters.append(Bouquet.flower_type == flower_enum)
-            flower_filters.append(func.lower(Bouquet.style).contains(token))
-        filters.append(or_(*flower_filters))
-
-    normalized_bouquet_type = _resolve_bouquet_type_filter(bouquet_type, mixed, style)
-    if normalized_bouquet_type == "mono":
-        filters.append(
+def _build_catalog_filters(
+    *,
+    flower: str | None,
+    color: str | None,
+    bouquet_type: str | None,
+    style: str | None,
+    mixed: str | None,
+    min: float | None,
+    max: float | None,
+    filter: str | None,
+) -> CatalogFilters:
+    return CatalogFilters(
+        featured=filter == "featured",
+        flowers=tuple(_parse_flower_filters(flower)),
+        bouquet_type=_resolve_bouquet_type_filter(bouquet_type, mixed, style),
+        min_cents=int(min * 100) if min is not None else None,
+        max_cents=int(max * 100) if max is not None else None,
+        color_candidates=tuple(color_filter_candidates(color)) if color else (),
+    )
+
+
+def _catalog_sql_filters(filters: CatalogFilters) -> list:
+    clauses = [Bouquet.is_active.is_(True)]
+    if filters.featured:
+        clauses.append(Bouquet.is_featured.is_(True))
+
+    if filters.flowers:
+        clauses.append(
+            array_overlaps(Bouquet.flower_types, [flower.value for flower in filters.flowers])
+        )
+
+    if filters.bouquet_type == "mono":
+        clauses.append(
             or_(
                 Bouquet.bouquet_type == BouquetType.MONO.value,
                 and_(
@@ -104,15 +131,15 @@ def list_catalog(
                 ),
             )
         )
-    if normalized_bouquet_type == "mixed":
-        filters.append(
+    if filters.bouquet_type == "mixed":
+        clauses.append(
             or_(
                 Bouquet.bouquet_type == BouquetType.MIXED.value,
                 and_(Bouquet.bouquet_type.is_(None), Bouquet.is_mixed.is_(True)),
             )
         )
-    if normalized_bouquet_type == "season":
-        filters.append(
+    if filters.bouquet_type == "season":
+        clauses.append(
             or_(
                 Bouquet.bouquet_type == BouquetType.SEASON.value,
                 and_(
@@ -122,95 +149,261 @@ def list_catalog(
             )
         )
 
-    if min is not None or max is not None:
-        min_cents = int(min * 100) if min is not None else None
-        max_cents = int(max * 100) if max is not None else None
-        if min_cents is not None:
-            filters.append(Bouquet.price_cents >= min_cents)
-        if max_cents is not None:
-            filters.append(Bouquet.price_cents <= max_cents)
-
-    if color:
-        candidates = color_filter_candidates(color)
-        if candidates:
-            filters.append(
-                or_(*[func.lower(Bouquet.colors).contains(candidate) for candidate in candidates])
-            )
+    if filters.min_cents is not None:
+        clauses.append(Bouquet.price_cents >= filters.min_cents)
+    if filters.max_cents is not None:
+        clauses.append(Bouquet.price_cents <= filters.max_cents)
 
-    base_query = select(Bouquet).where(and_(*filters))
-    normalized_sort = _normalize_sort(sort)
-    name_sort_expr = func.lower(func.coalesce(Bouquet.name, ""))
+    if filters.color_candidates:
+        clauses.append(array_overlaps(Bouquet.color_tokens, filters.color_candidates))
+    return clauses
 
-    if cursor:
-        cursor_row = db.execute(select(Bouquet).where(Bouquet.id == cursor)).scalars().first()
-        if not cursor_row:
-            raise HTTPException(status_code=400, detail="Invalid cursor.")
-
-        if normalized_sort == "name_asc":
-            cursor_name = (cursor_row.name or "").lower()
-            base_query = base_query.where(
-                or_(
-                    name_sort_expr > cursor_name,
-                    and_(name_sort_expr == cursor_name, Bouquet.id > cursor_row.id),
-                )
-            )
-        elif normalized_sort == "name_desc":
-            cursor_name = (cursor_row.name or "").lower()
-            base_query = base_query.where(
-                or_(
-                    name_sort_expr < cursor_name,
-                    and_(name_sort_expr == cursor_name, Bouquet.id < cursor_row.id),
-                )
-            )
-        elif normalized_sort == "price_asc":
-            cursor_price = cursor_row.price_cents or 0
-            base_query = base_query.where(
-                or_(
-                    Bouquet.price_cents > cursor_price,
-                    and_(Bouquet.price_cents == cursor_price, Bouquet.id > cursor_row.id),
-                )
-            )
-        elif normalized_sort == "price_desc":
-            cursor_price = cursor_row.price_cents or 0
-            base_query = base_query.where(
-                or_(
-                    Bouquet.price_cents < cursor_price,
-                    and_(Bouquet.price_cents == cursor_price, Bouquet.id < cursor_row.id),
-                )
-            )
-        else:
-            base_query = base_query.where(
-                or_(
-                    Bouquet.created_at < cursor_row.created_at,
-                    and_(
-                        Bouquet.created_at == cursor_row.created_at,
-                        Bouquet.id < cursor_row.id,
-                    ),
-                )
-            )
 
-    if normalized_sort == "name_asc":
-        query = base_query.order_by(name_sort_expr.asc(), Bouquet.id.asc()).limit(take + 1)
-    elif normalized_sort == "name_desc":
-        query = base_query.order_by(name_sort_expr.desc(), Bouquet.id.desc()).limit(take + 1)
-    elif normalized_sort == "price_asc":
-        query = base_query.order_by(Bouquet.price_cents.asc(), Bouquet.id.asc()).limit(take + 1)
-    elif normalized_sort == "price_desc":
-        query = base_query.order_by(Bouquet.price_cents.desc(), Bouquet.id.desc()).limit(take + 1)
+def _decode_cursor(cursor: str, normalized_sort: str) -> CatalogCursor:
+    try:
+        decoded = decode_catalog_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if decoded.sort != normalized_sort:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return decoded
+
+
+def _keyset_clause(cursor: CatalogCursor):
+    # Row-value comparisons match the composite (sort key, id) indexes.
+    if cursor.sort in {"name_asc", "name_desc"}:
+        key_expr = func.lower(func.coalesce(Bouquet.name, ""))
+    elif cursor.sort in {"price_asc", "price_desc"}:
+        key_expr = Bouquet.price_cents
     else:
-        query = base_query.order_by(Bouquet.created_at.desc(), Bouquet.id.desc()).limit(take + 1)
+        key_expr = Bouquet.created_at
+    row = tuple_(key_expr, Bouquet.id)
+    if cursor.sort in {"name_asc", "price_asc"}:
+        return row > (cursor.key, cursor.id)
+    return row < (cursor.key, cursor.id)
+
+
+def _list_catalog_from_db(
+    db: Session,
+    filters: CatalogFilters,
+    *,
+    normalized_sort: str,
+    cursor: CatalogCursor | None,
+    take: int,
+) -> CatalogPage:
+    query = select(Bouquet).where(and_(*_catalog_sql_filters(filters)))
+    if cursor:
+        query = query.where(_keyset_clause(cursor))
+    query = query.order_by(*catalog_sort_columns(normalized_sort)).limit(take + 1)
     results = db.execute(query).scalars().all()
 
     has_more = len(results) > take
     page = results[:take]
-    next_cursor = page[-1].id if has_more and page else None
+    next_cursor = (
+        encode_catalog_cursor(normalized_sort, page[-1]) if has_more and page else None
+    )
+
+    return CatalogPage(items=_priced_items(db, page), next_cursor=next_cursor)
+
 
+def _priced_items(db: Session, bouquets) -> list[CatalogItem]:
     settings = get_store_settings(db)
-    items = [
-        {
-            "bouquet": BouquetOut.model_validate(bouquet),
-            "pricing": get_bouquet_pricing(bouquet, settings),
-        }
-        for bouquet in page
+    return [
+        CatalogItem(bouquet=BouquetOut.model_validate(bouquet), pricing=pricing)
+        for bouquet, pricing in zip(bouquets, get_bouquet_pricing_batch(bouquets, settings))
     ]
-    return CatalogResponse(items=items, next_cursor=next_cursor)
+
+
+def _normalize_search_query(value: str | None) -> str:
+    return " ".join((value or "").split())[:SEARCH_QUERY_MAX_LENGTH]
+
+
+def _search_match_and_rank(query_text: str):
+    """Full-text match and rank over the Postgres ``searchVector`` column."""
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query_text)
+    return (
+        SEARCH_VECTOR.op("@@")(ts_query),
+        func.ts_rank(SEARCH_VECTOR, ts_query, type_=Float),
+    )
+
+
+def _decode_search_cursor(cursor: str, query_text: str) -> tuple[float, str]:
+    try:
+        payload = load_opaque_payload(cursor, SEARCH_CURSOR_PURPOSE)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    rank = payload.get("k")
+    anchor_id = payload.get("id")
+    if (
+        payload.get("q") != query_text
+        or not isinstance(rank, (int, float))
+        or isinstance(rank, bool)
+        or not isinstance(anchor_id, str)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return float(rank), anchor_id
+
+
+def _search_catalog_from_db(
+    db: Session,
+    filters: CatalogFilters,
+    *,
+    query_text: str,
+    cursor: str | None,
+    take: int,
+) -> CatalogPage:
+    match, rank = _search_match_and_rank(query_text)
+    query = select(Bouquet, rank.label("rank")).where(
+        match, and_(*_catalog_sql_filters(filters))
+    )
+    if cursor:
+        anchor_rank, anchor_id = _decode_search_cursor(cursor, query_text)
+        query = query.where(tuple_(rank, Bouquet.id) < (anchor_rank, anchor_id))
+    query = query.order_by(rank.desc(), Bouquet.id.desc()).limit(take + 1)
+    results = db.execute(query).all()
+
+    has_more = len(results) > take
+    page = results[:take]
+    next_cursor = None
+    if has_more and page:
+        last = page[-1]
+        next_cursor = sign_opaque_payload(
+            {"q": query_text, "k": float(last.rank), "id": last.Bouquet.id},
+            SEARCH_CURSOR_PURPOSE,
+        )
+    return CatalogPage(
+        items=_priced_items(db, [row.Bouquet for row in page]), next_cursor=next_cursor
+    )
+
+
+@router.get("", response_model=CatalogResponse)
+def list_catalog(
+    request: Request,
+    response: Response,
+    flower: str | None = None,
+    color: str | None = None,
+    bouquet_type: str | None = Query(default=None, alias="bouquetType"),
+    style: str | None = None,
+    mixed: str | None = None,
+    min: float | None = Query(default=None, alias="min"),
+    max: float | None = Query(default=None, alias="max"),
+    sort: str | None = None,
+    filter: str | None = None,
+    cursor: str | None = None,
+    take: int = Query(default=12, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    filters = _build_catalog_filters(
+        flower=flower,
+        color=color,
+        bouquet_type=bouquet_type,
+        style=style,
+        mixed=mixed,
+        min=min,
+        max=max,
+        filter=filter,
+    )
+    normalized_sort = _normalize_sort(sort)
+
+    decoded_cursor = _decode_cursor(cursor, normalized_sort) if cursor else None
+
+    snapshot = get_catalog_snapshot(db)
+    if decoded_cursor and not snapshot.has_anchor(decoded_cursor):
+        # The anchor row is gone or has moved; the cursor carries its sort key,
+        # so one range query picks up right after where it used to be.
+        page = _list_catalog_from_db(
+            db, filters, normalized_sort=normalized_sort, cursor=decoded_cursor, take=take
+        )
+    else:
+        etag = build_etag(snapshot.fingerprint, filters, normalized_sort, cursor, take)
+        not_modified = not_modified_or_tag(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+        page = snapshot.query(
+            filters, sort=normalized_sort, cursor=decoded_cursor, take=take
+        )
+    return CatalogResponse(items=page.items, next_cursor=page.next_cursor)
+
+
+@router.get("/search", response_model=CatalogResponse)
+def search_catalog(
+    q: str = Query(min_length=1, max_length=SEARCH_QUERY_MAX_LENGTH),
+    flower: str | None = None,
+    color: str | None = None,
+    bouquet_type: str | None = Query(default=None, alias="bouquetType"),
+    style: str | None = None,
+    mixed: str | None = None,
+    min: float | None = Query(default=None, alias="min"),
+    max: float | None = Query(default=None, alias="max"),
+    filter: str | None = None,
+    cursor: str | None = None,
+    take: int = Query(default=12, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    query_text = _normalize_search_query(q)
+    if not query_text:
+        return CatalogResponse(items=[], next_cursor=None)
+    filters = _build_catalog_filters(
+        flower=flower,
+        color=color,
+        bouquet_type=bouquet_type,
+        style=style,
+        mixed=mixed,
+        min=min,
+        max=max,
+        filter=filter,
+    )
+    page = _search_catalog_from_db(
+        db, filters, query_text=query_text, cursor=cursor, take=take
+    )
+    return CatalogResponse(items=page.items, next_cursor=page.next_cursor)
+
+
+@router.get("/facets", response_model=CatalogFacetsResponse)
+def catalog_facets(
+    request: Request,
+    response: Response,
+    flower: str | None = None,
+    color: str | None = None,
+    bouquet_type: str | None = Query(default=None, alias="bouquetType"),
+    style: str | None = None,
+    mixed: str | None = None,
+    min: float | None = Query(default=None, alias="min"),
+    max: float | None = Query(default=None, alias="max"),
+    filter: str | None = None,
+    db: Session = Depends(get_db),
+):
+    filters = _build_catalog_filters(
+        flower=flower,
+        color=color,
+        bouquet_type=bouquet_type,
+        style=style,
+        mixed=mixed,
+        min=min,
+        max=max,
+        filter=filter,
+    )
+    snapshot = get_catalog_snapshot(db)
+    not_modified = not_modified_or_tag(
+        request, response, build_etag(snapshot.fingerprint, "facets", filters)
+    )
+    if not_modified is not None:
+        return not_modified
+
+    facets = snapshot.facets(filters)
+    return CatalogFacetsResponse(
+        total=facets.total,
+        flowers=[FacetCount(value=value, count=count) for value, count in facets.flowers],
+        colors=[FacetCount(value=value, count=count) for value, count in facets.colors],
+        bouquet_types=[
+            FacetCount(value=value, count=count) for value, count in facets.bouquet_types
+        ],
+        price_histogram=[
+            PriceBucket(
+                min_cents=bucket.min_cents,
+                max_cents=bucket.max_cents,
+                count=bucket.count,
+            )
+            for bucket in facets.price_histogram
+        ],
+    )
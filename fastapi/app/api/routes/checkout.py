@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import calendar
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import json
 import logging
+from threading import Lock
 from urllib.parse import quote_plus
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 import stripe
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_optional_user
+from app.api.deps import get_async_db, get_db, get_optional_user
 from app.core.config import settings
 from app.core.critical_logging import log_critical_event
 from app.core.security import create_checkout_cancel_token, decode_checkout_cancel_token
@@ -25,6 +27,9 @@ from app.schemas.checkout import (
     CheckoutCancelResponse,
     CheckoutEventRequest,
     CheckoutEventResponse,
+    CheckoutQuoteItem,
+    CheckoutQuoteRequest,
+    CheckoutQuoteResponse,
     CheckoutRequest,
     CheckoutResponse,
     CheckoutStatusRequest,
@@ -33,13 +38,20 @@ from app.schemas.checkout import (
 from app.services.delivery import (
     build_delivery_quote_log_context,
     delivery_quote_failure_level,
+    delivery_quote_from_token,
     get_delivery_quote,
 )
+from app.services.delivery_schedule import DELIVERY_TIME_WINDOWS, delivery_schedule_values
+from app.services.delivery_slots import release_delivery_slots, reserve_delivery_slot
 from app.services.orders import (
     STRIPE_CHECKOUT_SESSION_EXPIRATION_SECONDS,
     expire_pending_orders,
+    fetch_paypal_order_for_sync,
+    fetch_stripe_session_for_sync,
     resolve_order_status_from_paypal_order,
     resolve_order_status_from_session,
+    retrieve_stripe_session,
+    stripe_session_payment_intent_id,
     sync_order_with_paypal,
     sync_order_with_stripe,
 )
@@ -58,13 +70,19 @@ from app.services.paypal import (
     paypal_is_configured,
     paypal_void_order,
 )
-from app.services.pricing import apply_percent_discount, get_bouquet_discount
+from app.services.pricing import apply_percent_discount, get_bouquet_pricing_batch
+from app.services.provider_gateway import paypal_gateway, stripe_gateway
 from app.services.settings import get_store_settings
+from app.utils.client_keys import get_forwarded_client_ip
 
 router = APIRouter(prefix="/api/checkout", tags=["checkout"])
 FLOWER_QUANTITY_MIN = 1
 FLOWER_QUANTITY_MAX = 1001
-DELIVERY_TIME_WINDOWS = {"8:30 AM - 12 PM", "12 PM - 4 PM", "4 PM - 8 PM"}
+QUOTE_RATE_WINDOW = timedelta(minutes=1)
+QUOTE_RATE_LIMIT = 60
+QUOTE_RATE_LIMIT_MAX_ENTRIES = 10_000
+quote_rate_limit: dict[str, dict[str, object]] = {}
+_quote_rate_limit_lock = Lock()
 
 
 def _is_flower_quantity_enabled_for_bouquet(bouquet: Bouquet) -> bool:
@@ -74,7 +92,9 @@ def _is_flower_quantity_enabled_for_bouquet(bouquet: Bouquet) -> bool:
     return bool(getattr(bouquet, "allow_flower_quantity", False))
 
 
-def _set_order_status_safely(db: Session, order: Order, status: OrderStatus) -> None:
+async def _set_order_status_safely(
+    db: AsyncSession, order: Order, status: OrderStatus
+) -> None:
     try:
         if status == OrderStatus.PAID:
             values = payment_success_values()
@@ -82,13 +102,15 @@ def _set_order_status_safely(db: Session, order: Order, status: OrderStatus) ->
             values = {"status": status}
         for key, value in values.items():
             setattr(order, key, value)
-        db.commit()
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
+        return
+    await db.run_sync(release_delivery_slots, [order.id])
 
 
-def _set_order_failed_safely(
-    db: Session,
+async def _set_order_failed_safely(
+    db: AsyncSession,
     order: Order,
     *,
     diagnostics,
@@ -97,9 +119,11 @@ def _set_order_failed_safely(
         values = payment_failure_values(diagnostics)
         for key, value in values.items():
             setattr(order, key, value)
-        db.commit()
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
+        return
+    await db.run_sync(release_delivery_slots, [order.id])
 
 
 def _order_email(order: Order) -> str:
@@ -275,12 +299,283 @@ def _resolve_first_order_discount_percent(
     return percent
 
 
+def _normalize_checkout_items(
+    db: Session,
+    items,
+    store_settings,
+    *,
+    request: Request,
+    user_id: str | None,
+) -> tuple[list[dict], bool]:
+    """Validate cart items and price them with one bouquet query.
+
+    Returns the normalized line items (unit prices after bouquet/category/global
+    discounts) and whether any of those discounts applied.
+    """
+    bouquet_ids = [item.id for item in items if not item.is_custom]
+    bouquets = (
+        db.execute(
+            select(Bouquet).where(
+                Bouquet.id.in_(bouquet_ids),
+                Bouquet.is_active.is_(True),
+                Bouquet.is_sold_out.is_(False),
+            )
+        )
+        .scalars()
+        .all()
+    )
+    bouquet_map = {bouquet.id: bouquet for bouquet in bouquets}
+    pricing_map = {
+        bouquet.id: pricing
+        for bouquet, pricing in zip(bouquets, get_bouquet_pricing_batch(bouquets, store_settings))
+    }
+
+    has_any_discount = False
+    normalized_items = []
+
+    for item in items:
+        if item.is_custom:
+            price_cents = int(item.price_cents or 0)
+            quantity = max(1, item.quantity)
+            details = _clean_text(item.details)
+            if details and len(details) > 500:
+                log_critical_event(
+                    domain="cart",
+                    event="checkout_custom_item_details_too_long",
+                    message="Custom cart item details are too long.",
+                    request=request,
+                    context={
+                        "user_id": user_id,
+                        "item_id": item.id,
+                        "details_length": len(details),
+                    },
+                    level=logging.WARNING,
+                )
+                raise HTTPException(
+                    status_code=400, detail="Custom item details are too long."
+                )
+            if not item.name or not item.image:
+                log_critical_event(
+                    domain="cart",
+                    event="invalid_custom_item_payload",
+                    message="Custom cart item is missing required fields.",
+                    request=request,
+                    context={"user_id": user_id, "item_id": item.id},
+                    level=logging.WARNING,
+                )
+                raise HTTPException(
+                    status_code=400, detail="Some items are unavailable."
+                )
+            if price_cents < 6500 or price_cents > 18000:
+                log_critical_event(
+                    domain="cart",
+                    event="invalid_custom_item_price",
+                    message="Custom cart item price is out of expected range.",
+                    request=request,
+                    context={
+                        "user_id": user_id,
+                        "item_id": item.id,
+                        "price_cents": price_cents,
+                    },
+                    level=logging.WARNING,
+                )
+                raise HTTPException(
+                    status_code=400, detail="Some items are unavailable."
+                )
+            normalized_items.append(
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "image": item.image,
+                    "quantity": quantity,
+                    "unit_price": price_cents,
+                    "details": details or None,
+                }
+            )
+            continue
+
+        bouquet = bouquet_map.get(item.id)
+        if not bouquet:
+            log_critical_event(
+                domain="cart",
+                event="checkout_item_not_found",
+                message="Checkout item does not exist, is inactive, or is sold out.",
+                request=request,
+                context={"user_id": user_id, "item_id": item.id},
+                level=logging.WARNING,
+            )
+            raise HTTPException(status_code=400, detail="Some items are unavailable.")
+        pricing = pricing_map[bouquet.id]
+        if pricing["discount"]:
+            has_any_discount = True
+        unit_price = pricing["final_price_cents"]
+        has_flower_quantity = _is_flower_quantity_enabled_for_bouquet(bouquet)
+        raw_quantity = int(item.quantity or 0)
+        quantity = max(1, raw_quantity)
+        details = None
+        if has_flower_quantity:
+            if raw_quantity < FLOWER_QUANTITY_MIN or raw_quantity > FLOWER_QUANTITY_MAX:
+                log_critical_event(
+                    domain="cart",
+                    event="checkout_flower_quantity_out_of_range",
+                    message="Checkout flower quantity is outside the allowed range.",
+                    request=request,
+                    context={
+                        "user_id": user_id,
+                        "item_id": item.id,
+                        "flower_quantity": raw_quantity,
+                        "min_quantity": FLOWER_QUANTITY_MIN,
+                        "max_quantity": FLOWER_QUANTITY_MAX,
+                    },
+                    level=logging.WARNING,
+                )
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        "Flower quantity must be between "
+                        f"{FLOWER_QUANTITY_MIN} and {FLOWER_QUANTITY_MAX}."
+                    ),
+                )
+            quantity = raw_quantity
+            details = f"Flowers: {quantity}"
+        normalized_items.append(
+            {
+                "id": bouquet.id,
+                "name": bouquet.name,
+                "image": bouquet.image,
+                "quantity": quantity,
+                "unit_price": unit_price,
+                "details": details,
+            }
+        )
+
+    return normalized_items, has_any_discount
+
+
+def _has_blocking_order_history(db: Session, email: str) -> bool:
+    return (
+        db.execute(
+            select(Order.id)
+            .where(
+                Order.email == email,
+                Order.status.in_([OrderStatus.PENDING, OrderStatus.PAID]),
+            )
+            .limit(1)
+        )
+        .scalars()
+        .first()
+        is not None
+    )
+
+
+def _allow_guest_quote(key: str) -> bool:
+    now = datetime.utcnow()
+    with _quote_rate_limit_lock:
+        entry = quote_rate_limit.get(key)
+        if not entry or entry["reset_at"] <= now:
+            if len(quote_rate_limit) >= QUOTE_RATE_LIMIT_MAX_ENTRIES:
+                for stale_key, stale in list(quote_rate_limit.items()):
+                    if stale["reset_at"] <= now:
+                        del quote_rate_limit[stale_key]
+            quote_rate_limit[key] = {"count": 1, "reset_at": now + QUOTE_RATE_WINDOW}
+            return True
+        if entry["count"] >= QUOTE_RATE_LIMIT:
+            return False
+        entry["count"] += 1
+        return True
+
+
+def _stripe_product_images(image: str | None, origin: str) -> list[str]:
+    if not image:
+        return []
+    if not image.startswith(("http://", "https://")):
+        image = f"{origin}{image}"
+    return [image]
+
+
+def _apply_first_order_discount(items: list[dict], percent: int) -> list[dict]:
+    discounted_items = []
+    for item in items:
+        unit_price = (
+            apply_percent_discount(item["unit_price"], percent)
+            if percent > 0
+            else item["unit_price"]
+        )
+        discounted_items.append({**item, "unit_price": unit_price})
+    return discounted_items
+
+
+@router.post("/quote", response_model=CheckoutQuoteResponse)
+def quote_checkout(
+    payload: CheckoutQuoteRequest,
+    request: Request,
+    user=Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    """Price a cart with checkout's rules without creating orders or calling providers.
+
+    Delivery is quoted separately by /api/delivery/quote. The first-order
+    discount is only shown to a signed-in user with no pending/paid orders, so
+    the quote never undercuts the checkout total. Guests see it once checkout
+    prices their order; quoting it for any typed email would reveal whether
+    that address has ordered before.
+    """
+    user_id = user.id if user else None
+    if not user:
+        client_ip = get_forwarded_client_ip(request)
+        if client_ip and not _allow_guest_quote(client_ip):
+            log_critical_event(
+                domain="cart",
+                event="checkout_quote_rate_limited",
+                message="Checkout quote request blocked by rate limit.",
+                request=request,
+                level=logging.WARNING,
+            )
+            raise HTTPException(
+                status_code=429, detail="Too many requests. Please try again later."
+            )
+    if not payload.items:
+        raise HTTPException(status_code=400, detail="No items provided.")
+
+    store_settings = get_store_settings(db)
+    normalized_items, has_any_discount = _normalize_checkout_items(
+        db, payload.items, store_settings, request=request, user_id=user_id
+    )
+
+    quote_email = (user.email or "").strip().lower() if user else ""
+    first_order_discount_percent = 0
+    if "@" in quote_email:
+        first_order_discount_percent = _resolve_first_order_discount_percent(
+            configured_percent=store_settings.first_order_discount_percent,
+            has_blocking_order_history=_has_blocking_order_history(db, quote_email),
+            has_any_discount=has_any_discount,
+        )
+
+    quoted_items = [
+        CheckoutQuoteItem(
+            id=item["id"],
+            name=item["name"],
+            quantity=item["quantity"],
+            unit_price_cents=item["unit_price"],
+            line_total_cents=item["unit_price"] * item["quantity"],
+            details=item.get("details"),
+        )
+        for item in _apply_first_order_discount(normalized_items, first_order_discount_percent)
+    ]
+    return CheckoutQuoteResponse(
+        items=quoted_items,
+        has_item_discount=has_any_discount,
+        first_order_discount_percent=first_order_discount_percent,
+        subtotal_cents=sum(item.line_total_cents for item in quoted_items),
+    )
+
+
 @router.post("", response_model=CheckoutResponse)
 async def start_checkout(
     payload: CheckoutRequest,
     request: Request,
     user=Depends(get_optional_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user_id = user.id if user else None
 
@@ -456,8 +751,12 @@ async def start_checkout(
         )
         raise HTTPException(status_code=400, detail="Use phone format +1 312 555 0123.")
 
-    settings_row = get_store_settings(db)
-    delivery = await get_delivery_quote(address_for_quote)
+    settings_row = await db.run_sync(get_store_settings)
+    # A still-valid token from /api/delivery/quote for this exact address saves
+    # a second round of Google Maps calls on the checkout hot path.
+    delivery = delivery_quote_from_token(payload.delivery_quote_token, address_for_quote)
+    if delivery is None:
+        delivery = await get_delivery_quote(address_for_quote)
     if not delivery.ok:
         delivery_context = build_delivery_quote_log_context(address_for_quote, delivery)
         delivery_context.update({"user_id": user_id, "item_count": len(items)})
@@ -473,164 +772,21 @@ async def start_checkout(
             status_code=400, detail=delivery.error or "Unable to calculate delivery."
         )
 
-    bouquet_ids = [item.id for item in items if not item.is_custom]
-    bouquets = (
-        db.execute(
-            select(Bouquet).where(
-                Bouquet.id.in_(bouquet_ids),
-                Bouquet.is_active.is_(True),
-                Bouquet.is_sold_out.is_(False),
-            )
-        )
-        .scalars()
-        .all()
+    normalized_items, has_any_discount = await db.run_sync(
+        _normalize_checkout_items, items, settings_row, request=request, user_id=user_id
     )
-    bouquet_map = {bouquet.id: bouquet for bouquet in bouquets}
-
-    has_any_discount = False
-    normalized_items = []
-
-    for item in items:
-        if item.is_custom:
-            price_cents = int(item.price_cents or 0)
-            quantity = max(1, item.quantity)
-            details = _clean_text(item.details)
-            if details and len(details) > 500:
-                log_critical_event(
-                    domain="cart",
-                    event="checkout_custom_item_details_too_long",
-                    message="Custom cart item details are too long.",
-                    request=request,
-                    context={
-                        "user_id": user_id,
-                        "item_id": item.id,
-                        "details_length": len(details),
-                    },
-                    level=logging.WARNING,
-                )
-                raise HTTPException(
-                    status_code=400, detail="Custom item details are too long."
-                )
-            if not item.name or not item.image:
-                log_critical_event(
-                    domain="cart",
-                    event="invalid_custom_item_payload",
-                    message="Custom cart item is missing required fields.",
-                    request=request,
-                    context={"user_id": user_id, "item_id": item.id},
-                    level=logging.WARNING,
-                )
-                raise HTTPException(
-                    status_code=400, detail="Some items are unavailable."
-                )
-            if price_cents < 6500 or price_cents > 18000:
-                log_critical_event(
-                    domain="cart",
-                    event="invalid_custom_item_price",
-                    message="Custom cart item price is out of expected range.",
-                    request=request,
-                    context={
-                        "user_id": user_id,
-                        "item_id": item.id,
-                        "price_cents": price_cents,
-                    },
-                    level=logging.WARNING,
-                )
-                raise HTTPException(
-                    status_code=400, detail="Some items are unavailable."
-                )
-            normalized_items.append(
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "image": item.image,
-                    "quantity": quantity,
-                    "unit_price": price_cents,
-                    "details": details or None,
-                }
-            )
-            continue
-
-        bouquet = bouquet_map.get(item.id)
-        if not bouquet:
-            log_critical_event(
-                domain="cart",
-                event="checkout_item_not_found",
-                message="Checkout item does not exist, is inactive, or is sold out.",
-                request=request,
-                context={"user_id": user_id, "item_id": item.id},
-                level=logging.WARNING,
-            )
-            raise HTTPException(status_code=400, detail="Some items are unavailable.")
-        discount = get_bouquet_discount(bouquet, settings_row)
-        if discount:
-            has_any_discount = True
-        unit_price = (
-            apply_percent_discount(bouquet.price_cents, discount.percent)
-            if discount
-            else bouquet.price_cents
-        )
-        has_flower_quantity = _is_flower_quantity_enabled_for_bouquet(bouquet)
-        raw_quantity = int(item.quantity or 0)
-        quantity = max(1, raw_quantity)
-        details = None
-        if has_flower_quantity:
-            if raw_quantity < FLOWER_QUANTITY_MIN or raw_quantity > FLOWER_QUANTITY_MAX:
-                log_critical_event(
-                    domain="cart",
-                    event="checkout_flower_quantity_out_of_range",
-                    message="Checkout flower quantity is outside the allowed range.",
-                    request=request,
-                    context={
-                        "user_id": user_id,
-                        "item_id": item.id,
-                        "flower_quantity": raw_quantity,
-                        "min_quantity": FLOWER_QUANTITY_MIN,
-                        "max_quantity": FLOWER_QUANTITY_MAX,
-                    },
-                    level=logging.WARNING,
-                )
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        "Flower quantity must be between "
-                        f"{FLOWER_QUANTITY_MIN} and {FLOWER_QUANTITY_MAX}."
-                    ),
-                )
-            quantity = raw_quantity
-            details = f"Flowers: {quantity}"
-        normalized_items.append(
-            {
-                "id": bouquet.id,
-                "name": bouquet.name,
-                "image": bouquet.image,
-                "quantity": quantity,
-                "unit_price": unit_price,
-                "details": details,
-            }
-        )
 
     # Only explicit final failures may reopen first-order discount eligibility.
     # Pending orders remain blocking so delayed provider updates cannot reopen
     # the discount and create a second discounted checkout.
-    expire_pending_orders(db)
+    await db.run_sync(expire_pending_orders)
 
     if user:
         # Serialize first-order-discount calculation for authenticated users.
-        db.execute(select(User.id).where(User.id == user.id).with_for_update()).first()
+        await db.execute(select(User.id).where(User.id == user.id).with_for_update())
 
-    has_blocking_order_history = (
-        db.execute(
-            select(Order.id)
-            .where(
-                Order.email == checkout_email,
-                Order.status.in_([OrderStatus.PENDING, OrderStatus.PAID]),
-            )
-            .limit(1)
-        )
-        .scalars()
-        .first()
-        is not None
+    has_blocking_order_history = await db.run_sync(
+        _has_blocking_order_history, checkout_email
     )
     first_order_discount_percent = _resolve_first_order_discount_percent(
         configured_percent=settings_row.first_order_discount_percent,
@@ -638,14 +794,9 @@ async def start_checkout(
         has_any_discount=has_any_discount,
     )
 
-    discounted_items = []
-    for item in normalized_items:
-        unit_price = (
-            apply_percent_discount(item["unit_price"], first_order_discount_percent)
-            if first_order_discount_percent > 0
-            else item["unit_price"]
-        )
-        discounted_items.append({**item, "unit_price": unit_price})
+    discounted_items = _apply_first_order_discount(
+        normalized_items, first_order_discount_percent
+    )
 
     discounted_subtotal = sum(
         item["unit_price"] * item["quantity"] for item in discounted_items
@@ -685,6 +836,7 @@ async def start_checkout(
             country=country,
         )
 
+    schedule_values = delivery_schedule_values(delivery_date_time)
     order = Order(
         email=checkout_email,
         phone=normalized_phone or None,
@@ -699,18 +851,48 @@ async def start_checkout(
         delivery_country=country or None,
         delivery_floor=floor or None,
         delivery_date_time=delivery_date_time or None,
+        **schedule_values,
         order_comment=order_comment or None,
         delivery_miles=f"{delivery.miles:.1f}" if delivery.miles is not None else None,
         delivery_fee_cents=delivery.fee_cents,
         first_order_discount_percent=first_order_discount_percent,
     )
+    # The slot is taken in the same transaction as the order insert, so a
+    # failed commit never leaves a reservation without an order behind it.
+    if schedule_values["delivery_date"] and schedule_values["delivery_window"]:
+        if not await db.run_sync(
+            reserve_delivery_slot,
+            schedule_values["delivery_date"],
+            schedule_values["delivery_window"],
+        ):
+            await db.rollback()
+            log_critical_event(
+                domain="cart",
+                event="checkout_delivery_slot_full",
+                message="Checkout request targets a fully booked delivery window.",
+                request=request,
+                context={
+                    "user_id": user_id,
+                    "delivery_date": schedule_values["delivery_date"].isoformat(),
+                    "delivery_window": schedule_values["delivery_window"],
+                },
+                level=logging.WARNING,
+            )
+            raise HTTPException(
+                status_code=409,
+                detail="This delivery window is fully booked. Please choose another time.",
+            )
+        order.delivery_slot_reserved = True
     db.add(order)
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await db.refresh(order)
 
     if user and normalized_phone and user.phone != normalized_phone:
-        user.phone = normalized_phone
-        db.commit()
+        # ``user`` was loaded by the auth dependency's own session.
+        await db.execute(
+            update(User).where(User.id == user.id).values(phone=normalized_phone)
+        )
+        await db.commit()
 
     origin = settings.resolved_site_url()
     checkout_cancel_token = create_checkout_cancel_token(
@@ -719,8 +901,8 @@ async def start_checkout(
     encoded_cancel_token = quote_plus(checkout_cancel_token)
     encoded_order_id = quote_plus(order.id)
 
-    record_payment_event_best_effort(
-        db,
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="checkout_order_created",
         provider=payment_method,
@@ -739,7 +921,9 @@ async def start_checkout(
 
     if payment_method == "paypal":
         try:
-            paypal_order = paypal_create_order(
+            paypal_order = await paypal_gateway.acall(
+                "create_order",
+                paypal_create_order,
                 order_id=order.id,
                 total_cents=computed_total,
                 currency=order.currency,
@@ -767,7 +951,7 @@ async def start_checkout(
                 },
                 exc=exc,
             )
-            _set_order_failed_safely(
+            await _set_order_failed_safely(
                 db,
                 order,
                 diagnostics=build_exception_failure_diagnostics(
@@ -778,8 +962,8 @@ async def start_checkout(
                     provider="paypal",
                 ),
             )
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="paypal_order_create_failed",
                 provider="paypal",
@@ -791,9 +975,9 @@ async def start_checkout(
             raise HTTPException(status_code=502, detail="Unable to start checkout.")
 
         order.paypal_order_id = paypal_order.order_id
-        db.commit()
-        record_payment_event_best_effort(
-            db,
+        await db.commit()
+        await db.run_sync(
+            record_payment_event_best_effort,
             order_id=order.id,
             event="paypal_order_created",
             provider="paypal",
@@ -815,17 +999,13 @@ async def start_checkout(
         + STRIPE_CHECKOUT_SESSION_EXPIRATION_SECONDS
     )
 
-    image_url = item["image"]
-    if image_url and not image_url.startswith(("http://", "https://")):
-        image_url = f"{origin}{image_url}"
-
     line_items = [
         {
             "price_data": {
                 "currency": "usd",
                 "product_data": {
                     "name": item["name"],
-                    "images": [image_url] if image_url else [],
+                    "images": _stripe_product_images(item["image"], origin),
                 },
                 "unit_amount": item["unit_price"],
             },
@@ -846,8 +1026,8 @@ async def start_checkout(
             }
         )
 
-    record_payment_event_best_effort(
-        db,
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="stripe_checkout_create_started",
         provider="stripe",
@@ -863,7 +1043,9 @@ async def start_checkout(
     )
 
     try:
-        session = stripe.checkout.Session.create(
+        session = await stripe_gateway.acall(
+            "checkout.Session.create",
+            stripe.checkout.Session.create,
             mode="payment",
             line_items=line_items,
             success_url=(
@@ -912,7 +1094,7 @@ async def start_checkout(
             },
             exc=exc,
         )
-        _set_order_failed_safely(
+        await _set_order_failed_safely(
             db,
             order,
             diagnostics=build_exception_failure_diagnostics(
@@ -923,8 +1105,8 @@ async def start_checkout(
                 provider="stripe",
             ),
         )
-        record_payment_event_best_effort(
-            db,
+        await db.run_sync(
+            record_payment_event_best_effort,
             order_id=order.id,
             event="stripe_checkout_create_failed",
             provider="stripe",
@@ -936,9 +1118,9 @@ async def start_checkout(
         raise HTTPException(status_code=502, detail="Unable to start checkout.")
 
     order.stripe_session_id = session.id
-    db.commit()
-    record_payment_event_best_effort(
-        db,
+    await db.commit()
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="stripe_checkout_session_created",
         provider="stripe",
@@ -962,7 +1144,7 @@ async def start_checkout(
             request=request,
             context={"order_id": order.id, "user_id": user_id},
         )
-        _set_order_failed_safely(
+        await _set_order_failed_safely(
             db,
             order,
             diagnostics=build_exception_failure_diagnostics(
@@ -973,8 +1155,8 @@ async def start_checkout(
                 extra_details={"Session ID": session.id},
             ),
         )
-        record_payment_event_best_effort(
-            db,
+        await db.run_sync(
+            record_payment_event_best_effort,
             order_id=order.id,
             event="stripe_checkout_redirect_url_missing",
             provider="stripe",
@@ -1062,19 +1244,18 @@ async def cancel_checkout(
     payload: CheckoutCancelRequest,
     request: Request,
     user=Depends(get_optional_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user_id = user.id if user else None
 
     order_id = (payload.order_id or "").strip()
     paypal_order_id = (payload.paypal_order_id or "").strip()
-    order = db.get(Order, order_id) if order_id else None
+    order = await db.get(Order, order_id) if order_id else None
     if not order and paypal_order_id:
-        order = (
-            db.execute(select(Order).where(Order.paypal_order_id == paypal_order_id))
-            .scalars()
-            .first()
+        result = await db.execute(
+            select(Order).where(Order.paypal_order_id == paypal_order_id)
         )
+        order = result.scalars().first()
     if not order:
         log_critical_event(
             domain="payment",
@@ -1114,8 +1295,8 @@ async def cancel_checkout(
         raise HTTPException(status_code=404, detail="Not found")
 
     provider = _payment_provider_for_order(order, "paypal" if paypal_order_id else None)
-    record_payment_event_best_effort(
-        db,
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="checkout_cancel_returned",
         provider=provider,
@@ -1131,8 +1312,8 @@ async def cancel_checkout(
     )
 
     if order.status == OrderStatus.PAID:
-        record_payment_event_best_effort(
-            db,
+        await db.run_sync(
+            record_payment_event_best_effort,
             order_id=order.id,
             event="checkout_cancel_observed_paid",
             provider=provider,
@@ -1145,8 +1326,8 @@ async def cancel_checkout(
         return CheckoutCancelResponse(canceled=False, status=order.status.value)
 
     if order.status in {OrderStatus.CANCELED, OrderStatus.FAILED}:
-        record_payment_event_best_effort(
-            db,
+        await db.run_sync(
+            record_payment_event_best_effort,
             order_id=order.id,
             event="checkout_cancel_observed_closed",
             provider=provider,
@@ -1161,7 +1342,13 @@ async def cancel_checkout(
     if order.stripe_session_id and settings.stripe_secret_key:
         stripe.api_key = settings.stripe_secret_key
         try:
-            session = stripe.checkout.Session.retrieve(order.stripe_session_id)
+            session = await stripe_gateway.acall(
+                "checkout.Session.retrieve",
+                retrieve_stripe_session,
+                order.stripe_session_id,
+            )
+            # The PaymentIntent comes embedded, so resolving makes no provider call.
+            resolved_status = resolve_order_status_from_session(order, session)
         except Exception as exc:
             log_critical_event(
                 domain="payment",
@@ -1172,8 +1359,8 @@ async def cancel_checkout(
                 exc=exc,
                 level=logging.WARNING,
             )
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_session_fetch_failed_during_cancel",
                 provider="stripe",
@@ -1186,18 +1373,17 @@ async def cancel_checkout(
             session = None
 
         if session:
-            resolved_status = resolve_order_status_from_session(order, session)
             if resolved_status == OrderStatus.PAID:
-                _set_order_status_safely(db, order, OrderStatus.PAID)
-                record_payment_event_best_effort(
-                    db,
+                await _set_order_status_safely(db, order, OrderStatus.PAID)
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="checkout_cancel_resolved_paid",
                     provider="stripe",
                     source="server",
                     message="Cancel flow synced Stripe session and resolved the order as paid.",
                     stripe_session_id=order.stripe_session_id,
-                    payment_intent_id=getattr(session, "payment_intent", None),
+                    payment_intent_id=stripe_session_payment_intent_id(session),
                     context={
                         "session_status": getattr(session, "status", None),
                         "payment_status": getattr(session, "payment_status", None),
@@ -1208,20 +1394,20 @@ async def cancel_checkout(
                     canceled=False, status=OrderStatus.PAID.value
                 )
             if resolved_status == OrderStatus.FAILED:
-                _set_order_failed_safely(
+                await _set_order_failed_safely(
                     db,
                     order,
                     diagnostics=build_stripe_session_failure_diagnostics(session),
                 )
-                record_payment_event_best_effort(
-                    db,
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="checkout_cancel_resolved_failed",
                     provider="stripe",
                     source="server",
                     message="Cancel flow synced Stripe session and resolved the order as failed.",
                     stripe_session_id=order.stripe_session_id,
-                    payment_intent_id=getattr(session, "payment_intent", None),
+                    payment_intent_id=stripe_session_payment_intent_id(session),
                     context={
                         "session_status": getattr(session, "status", None),
                         "payment_status": getattr(session, "payment_status", None),
@@ -1235,9 +1421,13 @@ async def cancel_checkout(
             session_status = (getattr(session, "status", None) or "").lower()
             if session_status == "open":
                 try:
-                    stripe.checkout.Session.expire(order.stripe_session_id)
-                    record_payment_event_best_effort(
-                        db,
+                    await stripe_gateway.acall(
+                        "checkout.Session.expire",
+                        stripe.checkout.Session.expire,
+                        order.stripe_session_id,
+                    )
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="stripe_session_expired_by_cancel",
                         provider="stripe",
@@ -1257,8 +1447,8 @@ async def cancel_checkout(
                         exc=exc,
                         level=logging.WARNING,
                     )
-                    record_payment_event_best_effort(
-                        db,
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="stripe_session_expire_failed",
                         provider="stripe",
@@ -1272,7 +1462,9 @@ async def cancel_checkout(
     if order.paypal_order_id and paypal_is_configured():
         paypal_order_payload = None
         try:
-            paypal_order_payload = paypal_get_order(order.paypal_order_id)
+            paypal_order_payload = await paypal_gateway.acall(
+                "get_order", paypal_get_order, order.paypal_order_id
+            )
         except PayPalApiError as exc:
             log_critical_event(
                 domain="payment",
@@ -1283,8 +1475,8 @@ async def cancel_checkout(
                 exc=exc,
                 level=logging.WARNING,
             )
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="paypal_order_fetch_failed_during_cancel",
                 provider="paypal",
@@ -1298,9 +1490,9 @@ async def cancel_checkout(
                 order, paypal_order_payload
             )
             if resolved_status == OrderStatus.PAID:
-                _set_order_status_safely(db, order, OrderStatus.PAID)
-                record_payment_event_best_effort(
-                    db,
+                await _set_order_status_safely(db, order, OrderStatus.PAID)
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="checkout_cancel_resolved_paid",
                     provider="paypal",
@@ -1316,13 +1508,13 @@ async def cancel_checkout(
                     canceled=False, status=OrderStatus.PAID.value
                 )
             if resolved_status == OrderStatus.FAILED:
-                _set_order_failed_safely(
+                await _set_order_failed_safely(
                     db,
                     order,
                     diagnostics=build_paypal_failure_diagnostics(paypal_order_payload),
                 )
-                record_payment_event_best_effort(
-                    db,
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="checkout_cancel_resolved_failed",
                     provider="paypal",
@@ -1350,9 +1542,11 @@ async def cancel_checkout(
                 "PAYER_ACTION_REQUIRED",
             }:
                 try:
-                    paypal_void_order(order.paypal_order_id)
-                    record_payment_event_best_effort(
-                        db,
+                    await paypal_gateway.acall(
+                        "void_order", paypal_void_order, order.paypal_order_id
+                    )
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="paypal_order_voided_by_cancel",
                         provider="paypal",
@@ -1374,8 +1568,8 @@ async def cancel_checkout(
                         exc=exc,
                         level=logging.WARNING,
                     )
-                    record_payment_event_best_effort(
-                        db,
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="paypal_order_void_failed",
                         provider="paypal",
@@ -1388,9 +1582,9 @@ async def cancel_checkout(
                         request=request,
                     )
 
-    _set_order_status_safely(db, order, OrderStatus.CANCELED)
-    record_payment_event_best_effort(
-        db,
+    await _set_order_status_safely(db, order, OrderStatus.CANCELED)
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="checkout_marked_canceled",
         provider=provider,
@@ -1408,10 +1602,10 @@ async def checkout_status(
     payload: CheckoutStatusRequest,
     request: Request,
     user=Depends(get_optional_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     user_id = user.id if user else None
-    order = db.get(Order, payload.order_id)
+    order = await db.get(Order, payload.order_id)
     if not order:
         log_critical_event(
             domain="payment",
@@ -1437,8 +1631,8 @@ async def checkout_status(
 
     provider = _payment_provider_for_order(order)
     status_before = order.status.value
-    record_payment_event_best_effort(
-        db,
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="checkout_status_requested",
         provider=provider,
@@ -1452,14 +1646,21 @@ async def checkout_status(
     stripe_sync_status = None
     paypal_sync_status = None
     if order.status == OrderStatus.PENDING:
+        # Provider reads go through the gateways; only the DB writes run here.
         if order.stripe_session_id and settings.stripe_secret_key:
-            stripe_sync_status = sync_order_with_stripe(db, order)
+            session = await fetch_stripe_session_for_sync(order)
+            if session is not None:
+                stripe_sync_status = await db.run_sync(sync_order_with_stripe, order, session)
         if order.paypal_order_id and paypal_is_configured():
-            paypal_sync_status = sync_order_with_paypal(db, order)
-        db.refresh(order)
+            paypal_payload = await fetch_paypal_order_for_sync(order)
+            if paypal_payload is not None:
+                paypal_sync_status = await db.run_sync(
+                    sync_order_with_paypal, order, paypal_payload
+                )
+        await db.refresh(order)
 
-    record_payment_event_best_effort(
-        db,
+    await db.run_sync(
+        record_payment_event_best_effort,
         order_id=order.id,
         event="checkout_status_resolved",
         provider=_payment_provider_for_order(order),
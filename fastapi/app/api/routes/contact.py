@@ -9,6 +9,7 @@ from app.core.config import settings
 from app.core.critical_logging import log_critical_event
 from app.schemas.contact import ContactRequest
 from app.services.email import send_contact_email
+from app.utils.client_keys import get_client_key
 
 router = APIRouter(prefix="/api/contact", tags=["contact"])
 
@@ -18,19 +19,6 @@ RATE_LIMIT = 5
 rate_limit: dict[str, dict[str, object]] = {}
 
 
-def _get_client_key(request: Request) -> str:
-    if settings.trust_proxy_headers:
-        forwarded = request.headers.get("x-forwarded-for")
-        if forwarded:
-            first = forwarded.split(",")[0].strip()
-            if first:
-                return first
-        real_ip = (request.headers.get("x-real-ip") or "").strip()
-        if real_ip:
-            return real_ip
-    return request.client.host if request.client and request.client.host else "unknown"
-
-
 def _allow_request(key: str) -> bool:
     now = datetime.utcnow()
     entry = rate_limit.get(key)
@@ -45,7 +33,7 @@ def _allow_request(key: str) -> bool:
 
 @router.post("")
 async def contact(request: Request, payload: ContactRequest):
-    key = _get_client_key(request)
+    key = get_client_key(request)
     honeypot = (payload.website or "").strip()
     if honeypot:
         log_critical_event(
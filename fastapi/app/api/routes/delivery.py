@@ -1,20 +1,133 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, require_admin
 from app.core.critical_logging import log_critical_event
-from app.schemas.delivery import DeliveryQuoteOut, DeliveryQuoteRequest
+from app.schemas.delivery import (
+    DeliveryBatchQuoteLine,
+    DeliveryBatchQuoteRequest,
+    DeliveryEstimateOut,
+    DeliveryQuoteOut,
+    DeliveryQuoteRequest,
+    DeliverySlotAdminOut,
+    DeliverySlotCapacityRequest,
+    DeliverySlotOut,
+    DeliverySlotsOut,
+)
 from app.services.delivery import (
     build_delivery_quote_log_context,
     delivery_quote_failure_level,
+    estimate_delivery_for_postal_code,
     get_delivery_quote,
+    issue_delivery_quote_token,
+    quote_delivery_batch,
+)
+from app.services.delivery_cache import normalize_delivery_address
+from app.services.delivery_schedule import DELIVERY_TIME_WINDOWS
+from app.services.delivery_slots import (
+    DELIVERY_SLOT_AVAILABILITY_MAX_DAYS,
+    DELIVERY_SLOT_AVAILABILITY_TTL_SECONDS,
+    get_delivery_slot_availability,
+    set_delivery_slot_capacity,
 )
+from app.utils.admin_orders import ADMIN_TIMEZONE
+from app.utils.client_keys import get_forwarded_client_ip
+from app.utils.http_cache import build_etag, not_modified_or_tag
+
+router = APIRouter(prefix="/api", tags=["delivery"])
+
+
+QUOTE_RATE_WINDOW_SECONDS = 60.0
+QUOTE_RATE_LIMIT = 30
+# A request arriving this soon after the previous one from the same client for
+# the same address is a repeated click: it waits out the interval and is
+# dropped if an even newer one shows up meanwhile. Keying on the address too
+# keeps shoppers behind one NAT or carrier gateway from cancelling each other.
+QUOTE_DEBOUNCE_SECONDS = 0.35
+QUOTE_CLIENTS_MAX_ENTRIES = 10_000
+DELIVERY_BATCH_MAX_ADDRESSES = 500
+# Slot counts change with every checkout, so shared caches may only hold a
+# copy for as long as the in-process availability cache does.
+SLOT_CACHE_CONTROL = f"public, max-age={int(DELIVERY_SLOT_AVAILABILITY_TTL_SECONDS)}"
+quote_clients: dict[str, dict[str, float]] = {}
+quote_bursts: dict[tuple[str, str], dict[str, float]] = {}
+
+
+def _prune_quote_clients(now: float) -> None:
+    if len(quote_clients) >= QUOTE_CLIENTS_MAX_ENTRIES:
+        for key, entry in list(quote_clients.items()):
+            if entry["reset_at"] <= now:
+                del quote_clients[key]
+    if len(quote_bursts) >= QUOTE_CLIENTS_MAX_ENTRIES:
+        for burst_key, burst in list(quote_bursts.items()):
+            if now - burst["last_at"] >= QUOTE_DEBOUNCE_SECONDS:
+                del quote_bursts[burst_key]
+
 
-router = APIRouter(prefix="/api/delivery", tags=["delivery"])
+async def _admit_quote_request(client_ip: str, address_key: str) -> str | None:
+    """Apply per-client limits; returns a rejection reason or None to proceed."""
+    now = time.monotonic()
+    _prune_quote_clients(now)
+    entry = quote_clients.get(client_ip)
+    if entry is None or entry["reset_at"] <= now:
+        quote_clients[client_ip] = {"count": 1, "reset_at": now + QUOTE_RATE_WINDOW_SECONDS}
+    elif entry["count"] >= QUOTE_RATE_LIMIT:
+        return "rate_limited"
+    else:
+        entry["count"] += 1
 
+    burst_key = (client_ip, address_key)
+    burst = quote_bursts.get(burst_key)
+    if burst is None:
+        quote_bursts[burst_key] = {"seq": 1, "last_at": now}
+        return None
+    burst["seq"] += 1
+    sequence = burst["seq"]
+    in_burst = now - burst["last_at"] < QUOTE_DEBOUNCE_SECONDS
+    burst["last_at"] = now
+    if not in_burst:
+        return None
+    await asyncio.sleep(QUOTE_DEBOUNCE_SECONDS)
+    if burst["seq"] != sequence:
+        return "superseded"
+    return None
 
-@router.post("/quote", response_model=DeliveryQuoteOut)
+
+@router.post("/delivery/quote", response_model=DeliveryQuoteOut)
 async def quote_delivery(payload: DeliveryQuoteRequest, request: Request):
+    # Behind the untrusted Next.js rewrite every shopper shares the proxy's
+    # address, so per-client limits would pit customers against each other.
+    client_ip = get_forwarded_client_ip(request)
+    rejection = (
+        await _admit_quote_request(client_ip, normalize_delivery_address(payload.address))
+        if client_ip
+        else None
+    )
+    if rejection == "rate_limited":
+        log_critical_event(
+            domain="cart",
+            event="delivery_quote_rate_limited",
+            message="Delivery quote request blocked by rate limit.",
+            request=request,
+            level=logging.WARNING,
+        )
+        raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
+    if rejection == "superseded":
+        # The cart only renders the latest response, so no log entry here.
+        raise HTTPException(
+            status_code=429, detail="Superseded by a newer delivery quote request."
+        )
+
     result = await get_delivery_quote(payload.address)
     if not result.ok:
         log_critical_event(
@@ -30,4 +143,118 @@ async def quote_delivery(payload: DeliveryQuoteRequest, request: Request):
         fee_cents=result.fee_cents or 0,
         miles=result.miles or 0,
         distance_text=result.distance_text or "",
+        quote_token=issue_delivery_quote_token(payload.address, result),
+    )
+
+
+@router.get("/delivery/estimate", response_model=DeliveryEstimateOut)
+async def estimate_delivery(postal_code: str = Query(alias="postalCode", max_length=10)):
+    """Instant fee range from the ZIP-centroid table; /quote stays authoritative."""
+    estimate = await estimate_delivery_for_postal_code(postal_code)
+    if estimate is None:
+        raise HTTPException(status_code=404, detail="No estimate for this ZIP code.")
+    if estimate.min_fee_cents is None:
+        deliverable: bool | None = False
+    elif estimate.max_fee_cents is not None:
+        deliverable = True
+    else:
+        deliverable = None
+    return DeliveryEstimateOut(
+        postal_code=estimate.postal_code,
+        min_miles=estimate.min_miles,
+        max_miles=estimate.max_miles,
+        min_fee_cents=estimate.min_fee_cents,
+        max_fee_cents=estimate.max_fee_cents,
+        deliverable=deliverable,
+    )
+
+
+async def _stream_batch_quotes(addresses: list[str]) -> AsyncIterator[str]:
+    async for index, result in quote_delivery_batch(addresses):
+        line = DeliveryBatchQuoteLine(
+            index=index,
+            address=addresses[index],
+            ok=result.ok,
+            fee_cents=result.fee_cents,
+            miles=result.miles,
+            distance_text=result.distance_text,
+            formatted_address=result.formatted_address,
+            provider=result.provider,
+            code=result.code,
+            error=result.error,
+        )
+        yield line.model_dump_json(by_alias=True) + "\n"
+
+
+@router.post("/admin/delivery/quote-batch")
+async def quote_delivery_batch_admin(
+    payload: DeliveryBatchQuoteRequest,
+    _admin=Depends(require_admin),
+):
+    """Quote many addresses at once, one NDJSON line per address as it resolves.
+
+    Lines arrive out of order; ``index`` points back into the request list.
+    """
+    if not payload.addresses:
+        raise HTTPException(status_code=400, detail="No addresses provided.")
+    if len(payload.addresses) > DELIVERY_BATCH_MAX_ADDRESSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {DELIVERY_BATCH_MAX_ADDRESSES} addresses per batch.",
+        )
+    return StreamingResponse(
+        _stream_batch_quotes(payload.addresses),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/delivery/slots", response_model=DeliverySlotsOut)
+def delivery_slots(
+    request: Request,
+    response: Response,
+    start_date: date | None = Query(default=None, alias="startDate"),
+    days: int = Query(default=31, ge=1, le=DELIVERY_SLOT_AVAILABILITY_MAX_DAYS),
+    db: Session = Depends(get_db),
+):
+    """Per-window availability for the checkout date picker."""
+    first_day = start_date or datetime.now(ZoneInfo(ADMIN_TIMEZONE)).date()
+    slots = get_delivery_slot_availability(db, first_day, days)
+    etag = build_etag(
+        *(f"{slot.delivery_date}|{slot.window}|{slot.capacity}|{slot.reserved}" for slot in slots)
+    )
+    not_modified = not_modified_or_tag(request, response, etag, cache_control=SLOT_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return DeliverySlotsOut(
+        slots=[
+            DeliverySlotOut(
+                date=slot.delivery_date,
+                window=slot.window,
+                capacity=slot.capacity,
+                remaining=slot.remaining,
+                available=slot.available,
+            )
+            for slot in slots
+        ]
+    )
+
+
+@router.put("/admin/delivery/slots", response_model=DeliverySlotAdminOut)
+def update_delivery_slot_capacity(
+    payload: DeliverySlotCapacityRequest,
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    if payload.window not in DELIVERY_TIME_WINDOWS:
+        raise HTTPException(status_code=400, detail="Invalid delivery window.")
+    if payload.capacity is not None and payload.capacity < 0:
+        raise HTTPException(status_code=400, detail="Capacity cannot be negative.")
+    slot = set_delivery_slot_capacity(db, payload.date, payload.window, payload.capacity)
+    return DeliverySlotAdminOut(
+        date=slot.delivery_date,
+        window=slot.window,
+        capacity=slot.capacity,
+        remaining=slot.remaining,
+        reserved=slot.reserved,
+        available=slot.available,
     )
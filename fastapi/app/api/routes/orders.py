@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date as date_type, datetime, timezone
 
 import stripe
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -10,7 +10,6 @@ from sqlalchemy.orm import Session, joinedload
 from app.api.deps import get_db, get_current_user, require_admin
 from app.core.config import settings
 from app.core.critical_logging import log_critical_event
-from app.models.enums import OrderStatus
 from app.models.order import Order
 from app.models.payment_event import PaymentEvent
 from app.schemas.order import (
@@ -27,14 +26,15 @@ from app.schemas.order import (
     StripeShippingOut,
 )
 from app.services.payment_diagnostics import resolve_stripe_payment_intent
+from app.services.provider_gateway import stripe_gateway
 from app.services.orders import (
-    expire_pending_orders,
+    enqueue_order_reconciliation,
     get_admin_orders,
     get_admin_orders_by_day,
+    get_admin_orders_by_delivery_day,
     get_admin_orders_by_week,
     get_orders_by_email,
-    sync_order_with_paypal,
-    sync_order_with_stripe,
+    stale_pending_order_ids,
 )
 from app.utils.admin_orders import parse_day_key
 
@@ -73,7 +73,6 @@ def list_my_orders(user=Depends(get_current_user), db: Session = Depends(get_db)
 
 @router.get("/orders/{order_id}", response_model=OrderOut)
 def get_order(order_id: str, db: Session = Depends(get_db), _admin=Depends(require_admin)):
-    expire_pending_orders(db)
     order = (
         db.execute(select(Order).where(Order.id == order_id).options(joinedload(Order.items)))
         .unique()
@@ -82,9 +81,7 @@ def get_order(order_id: str, db: Session = Depends(get_db), _admin=Depends(requi
     )
     if not order:
         raise HTTPException(status_code=404, detail="Not found")
-    if order.status == OrderStatus.PENDING:
-        sync_order_with_stripe(db, order)
-        sync_order_with_paypal(db, order)
+    enqueue_order_reconciliation(stale_pending_order_ids([order]))
     return order
 
 
@@ -118,6 +115,25 @@ def orders_by_day(
     return OrdersByDayOut(day_key=date, orders=orders)
 
 
+@router.get("/admin/orders/by-delivery-day", response_model=OrdersByDayOut)
+def orders_by_delivery_day(
+    date: str = Query(..., alias="date"),
+    scope: str = Query("active"),
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    try:
+        delivery_date = date_type.fromisoformat(date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date")
+    if scope not in {"active", "deleted"}:
+        raise HTTPException(status_code=400, detail="Invalid scope")
+    orders = get_admin_orders_by_delivery_day(
+        db, delivery_date, only_deleted=scope == "deleted"
+    )
+    return OrdersByDayOut(day_key=date, orders=orders)
+
+
 @router.get("/admin/orders/by-week", response_model=OrdersByWeekOut)
 def orders_by_week(
     start_date: str = Query(..., alias="startDate"),
@@ -228,7 +244,9 @@ def get_order_stripe_session(
 
     stripe.api_key = settings.stripe_secret_key
     try:
-        session = stripe.checkout.Session.retrieve(
+        session = stripe_gateway.call(
+            "checkout.Session.retrieve",
+            stripe.checkout.Session.retrieve,
             order.stripe_session_id,
             expand=["payment_intent", "payment_intent.latest_charge"],
         )
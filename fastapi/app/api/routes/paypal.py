@@ -6,14 +6,16 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select, update
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.api.deps import get_db, get_optional_user
+from app.api.deps import get_async_db, get_optional_user
 from app.core.critical_logging import log_critical_event
 from app.core.security import decode_checkout_cancel_token
 from app.models.enums import OrderStatus
 from app.models.order import Order
 from app.schemas.paypal import PayPalCaptureRequest, PayPalCaptureResponse
+from app.services.delivery_slots import reclaim_delivery_slots, release_delivery_slots
 from app.services.email import send_admin_order_email, send_customer_order_email
 from app.services.orders import resolve_order_status_from_paypal_order
 from app.services.payment_diagnostics import (
@@ -31,6 +33,7 @@ from app.services.paypal import (
     paypal_verify_webhook_signature,
     paypal_webhook_is_configured,
 )
+from app.services.provider_gateway import paypal_gateway
 from app.services.webhook_events import (
     is_webhook_event_processed,
     mark_webhook_event_processed,
@@ -39,17 +42,13 @@ from app.services.webhook_events import (
 router = APIRouter(prefix="/api/paypal", tags=["paypal"])
 
 
-def _load_order_by_id(db: Session, order_id: str | None) -> Order | None:
+async def _load_order_by_id(db: AsyncSession, order_id: str | None) -> Order | None:
     if not order_id:
         return None
-    return (
-        db.execute(
-            select(Order).where(Order.id == order_id).options(joinedload(Order.items))
-        )
-        .unique()
-        .scalars()
-        .first()
+    result = await db.execute(
+        select(Order).where(Order.id == order_id).options(joinedload(Order.items))
     )
+    return result.unique().scalars().first()
 
 
 def _build_email_payload(order: Order) -> dict:
@@ -111,15 +110,15 @@ def _is_order_access_allowed(order: Order, *, user, cancel_token: str | None) ->
     return token_order_id == order.id and token_email == order_email
 
 
-def _set_order_failed(
-    db: Session,
+async def _set_order_failed(
+    db: AsyncSession,
     *,
     order: Order,
     paypal_order_id: str,
     capture_id: str | None,
     diagnostics,
 ) -> None:
-    db.execute(
+    await db.execute(
         update(Order)
         .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
         .values(
@@ -130,27 +129,24 @@ def _set_order_failed(
             )
         )
     )
-    db.commit()
+    await db.commit()
+    await db.run_sync(release_delivery_slots, [order.id])
 
 
-def _find_order_for_paypal(
-    db: Session, *, order_id: str | None, paypal_order_id: str | None
+async def _find_order_for_paypal(
+    db: AsyncSession, *, order_id: str | None, paypal_order_id: str | None
 ) -> Order | None:
-    order = _load_order_by_id(db, order_id)
+    order = await _load_order_by_id(db, order_id)
     if order:
         return order
     if not paypal_order_id:
         return None
-    return (
-        db.execute(
-            select(Order)
-            .where(Order.paypal_order_id == paypal_order_id)
-            .options(joinedload(Order.items))
-        )
-        .unique()
-        .scalars()
-        .first()
+    result = await db.execute(
+        select(Order)
+        .where(Order.paypal_order_id == paypal_order_id)
+        .options(joinedload(Order.items))
     )
+    return result.unique().scalars().first()
 
 
 def _resolve_paypal_order_id_from_event(
@@ -192,7 +188,7 @@ async def capture_paypal_order(
     payload: PayPalCaptureRequest,
     request: Request,
     user=Depends(get_optional_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if not paypal_is_configured():
         log_critical_event(
@@ -208,7 +204,7 @@ async def capture_paypal_order(
         raise HTTPException(status_code=400, detail="Missing PayPal order id.")
 
     try:
-        order_payload = paypal_get_order(paypal_order_id)
+        order_payload = await paypal_gateway.acall("get_order", paypal_get_order, paypal_order_id)
     except PayPalApiError as exc:
         log_critical_event(
             domain="payment",
@@ -222,7 +218,7 @@ async def capture_paypal_order(
 
     metadata = paypal_extract_order_metadata(order_payload)
     order_id = metadata.get("custom_id")
-    order = _find_order_for_paypal(
+    order = await _find_order_for_paypal(
         db,
         order_id=order_id if isinstance(order_id, str) else None,
         paypal_order_id=paypal_order_id,
@@ -301,7 +297,9 @@ async def capture_paypal_order(
     status = metadata.get("status") or ""
     if status == "APPROVED":
         try:
-            order_payload = paypal_capture_order(paypal_order_id)
+            order_payload = await paypal_gateway.acall(
+                "capture_order", paypal_capture_order, paypal_order_id
+            )
         except PayPalApiError as exc:
             log_critical_event(
                 domain="payment",
@@ -313,9 +311,11 @@ async def capture_paypal_order(
             )
             if exc.status_code is not None and 400 <= exc.status_code < 500:
                 try:
-                    order_payload = paypal_get_order(paypal_order_id)
+                    order_payload = await paypal_gateway.acall(
+                        "get_order", paypal_get_order, paypal_order_id
+                    )
                 except PayPalApiError:
-                    _set_order_failed(
+                    await _set_order_failed(
                         db,
                         order=order,
                         paypal_order_id=paypal_order_id,
@@ -385,11 +385,11 @@ async def capture_paypal_order(
         if not order.paypal_order_id:
             order.paypal_order_id = paypal_order_id
             order.paypal_capture_id = capture_id or order.paypal_capture_id
-            db.commit()
+            await db.commit()
         return PayPalCaptureResponse(status=order.status.value)
 
     if resolved_status == OrderStatus.PAID:
-        updated = db.execute(
+        updated = await db.execute(
             update(Order)
             .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
             .values(
@@ -399,7 +399,7 @@ async def capture_paypal_order(
                 )
             )
         )
-        db.commit()
+        await db.commit()
         if updated.rowcount:
             email_payload = _build_email_payload(order)
             try:
@@ -417,7 +417,7 @@ async def capture_paypal_order(
         return PayPalCaptureResponse(status=OrderStatus.PAID.value)
 
     if resolved_status == OrderStatus.FAILED:
-        _set_order_failed(
+        await _set_order_failed(
             db,
             order=order,
             paypal_order_id=paypal_order_id,
@@ -427,7 +427,7 @@ async def capture_paypal_order(
         return PayPalCaptureResponse(status=OrderStatus.FAILED.value)
 
     if status in {"CREATED", "SAVED", "PAYER_ACTION_REQUIRED"}:
-        _set_order_failed(
+        await _set_order_failed(
             db,
             order=order,
             paypal_order_id=paypal_order_id,
@@ -439,13 +439,13 @@ async def capture_paypal_order(
     if not order.paypal_order_id:
         order.paypal_order_id = paypal_order_id
         order.paypal_capture_id = capture_id or order.paypal_capture_id
-        db.commit()
+        await db.commit()
 
     return PayPalCaptureResponse(status=order.status.value)
 
 
 @router.post("/webhook")
-async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
+async def paypal_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     if not paypal_webhook_is_configured():
         log_critical_event(
             domain="payment",
@@ -472,7 +472,9 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Invalid payload.")
 
     try:
-        signature_ok = paypal_verify_webhook_signature(
+        signature_ok = await paypal_gateway.acall(
+            "verify_webhook_signature",
+            paypal_verify_webhook_signature,
             event_payload=event,
             headers=request.headers,
         )
@@ -508,12 +510,12 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
         )
         raise HTTPException(status_code=400, detail="Invalid PayPal event.")
 
-    if is_webhook_event_processed(db, provider="paypal", event_id=event_id):
+    if await db.run_sync(is_webhook_event_processed, provider="paypal", event_id=event_id):
         return {"received": True}
 
     event_type = str(event.get("event_type") or "")
     if not _is_paypal_event_type_supported(event_type):
-        mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+        await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
         return {"received": True}
 
     paypal_order_id = _resolve_paypal_order_id_from_event(event, event_type)
@@ -526,14 +528,18 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
             context={"event_type": event_type, "event_id": event_id},
             level=logging.WARNING,
         )
-        mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+        await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
         return {"received": True}
 
     try:
         if event_type == "CHECKOUT.ORDER.APPROVED":
-            order_payload = paypal_capture_order(paypal_order_id)
+            order_payload = await paypal_gateway.acall(
+                "capture_order", paypal_capture_order, paypal_order_id
+            )
         else:
-            order_payload = paypal_get_order(paypal_order_id)
+            order_payload = await paypal_gateway.acall(
+                "get_order", paypal_get_order, paypal_order_id
+            )
     except PayPalApiError as exc:
         if (
             event_type == "CHECKOUT.ORDER.APPROVED"
@@ -541,7 +547,9 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
             and 400 <= exc.status_code < 500
         ):
             try:
-                order_payload = paypal_get_order(paypal_order_id)
+                order_payload = await paypal_gateway.acall(
+                    "get_order", paypal_get_order, paypal_order_id
+                )
             except PayPalApiError as fetch_exc:
                 log_critical_event(
                     domain="payment",
@@ -577,7 +585,7 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
 
     metadata = paypal_extract_order_metadata(order_payload)
     custom_id = metadata.get("custom_id")
-    order = _find_order_for_paypal(
+    order = await _find_order_for_paypal(
         db,
         order_id=custom_id if isinstance(custom_id, str) else None,
         paypal_order_id=paypal_order_id,
@@ -597,7 +605,7 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
             },
             level=logging.WARNING,
         )
-        mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+        await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
         return {"received": True}
 
     amount_cents = metadata.get("amount_cents")
@@ -617,7 +625,7 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
                 "expected_total": order.total_cents,
             },
         )
-        mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+        await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
         return {"received": True}
     if currency and currency.upper() != order.currency.upper():
         log_critical_event(
@@ -634,14 +642,14 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
                 "expected_currency": order.currency,
             },
         )
-        mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+        await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
         return {"received": True}
 
     resolved_status, capture_id = resolve_order_status_from_paypal_order(
         order, order_payload
     )
     if resolved_status == OrderStatus.PAID:
-        updated = db.execute(
+        updated = await db.execute(
             update(Order)
             .where(Order.id == order.id, Order.status != OrderStatus.PAID)
             .values(
@@ -651,8 +659,9 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
                 )
             )
         )
-        db.commit()
+        await db.commit()
         if updated.rowcount:
+            await db.run_sync(reclaim_delivery_slots, [order.id])
             email_payload = _build_email_payload(order)
             try:
                 await send_admin_order_email(email_payload)
@@ -667,7 +676,7 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
                     exc=exc,
                 )
     elif resolved_status == OrderStatus.FAILED:
-        db.execute(
+        await db.execute(
             update(Order)
             .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
             .values(
@@ -681,12 +690,13 @@ async def paypal_webhook(request: Request, db: Session = Depends(get_db)):
                 )
             )
         )
-        db.commit()
+        await db.commit()
+        await db.run_sync(release_delivery_slots, [order.id])
     else:
         if not order.paypal_order_id:
             order.paypal_order_id = paypal_order_id
             order.paypal_capture_id = capture_id or order.paypal_capture_id
-            db.commit()
+            await db.commit()
 
-    mark_webhook_event_processed(db, provider="paypal", event_id=event_id)
+    await db.run_sync(mark_webhook_event_processed, provider="paypal", event_id=event_id)
     return {"received": True}
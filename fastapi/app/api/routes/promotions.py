@@ -1,24 +1,32 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, require_admin
 from app.models.promo_slide import PromoSlide
 from app.schemas.promo_slide import PromoSlideCreate, PromoSlideOut, PromoSlideUpdate
+from app.utils.http_cache import build_etag, not_modified_or_tag, table_content_version
 
 router = APIRouter(prefix="/api/promotions", tags=["promotions"])
 
 
 @router.get("", response_model=list[PromoSlideOut])
 def list_promotions(
+    request: Request,
+    response: Response,
     include_inactive: bool = Query(default=False),
     db: Session = Depends(get_db),
 ):
-    query = select(PromoSlide)
-    if not include_inactive:
-        query = query.where(PromoSlide.is_active.is_(True))
+    criteria = [] if include_inactive else [PromoSlide.is_active.is_(True)]
+    etag = build_etag(
+        "promotions", include_inactive, table_content_version(db, PromoSlide, *criteria)
+    )
+    not_modified = not_modified_or_tag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    query = select(PromoSlide).where(*criteria)
     query = query.order_by(PromoSlide.position.asc(), PromoSlide.updated_at.desc())
     return db.execute(query).scalars().all()
 
@@ -5,14 +5,15 @@ import logging
 import re
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, require_admin
-from app.core.config import settings
 from app.core.critical_logging import log_critical_event
 from app.models.review import Review
+from app.utils.client_keys import get_client_key
+from app.utils.http_cache import build_etag, not_modified_or_tag, table_content_version
 from app.schemas.review import (
     ReviewAdminOut,
     ReviewCountOut,
@@ -39,19 +40,6 @@ rate_limit: dict[str, dict[str, object]] = {}
 EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
-def _get_client_key(request: Request) -> str:
-    if settings.trust_proxy_headers:
-        forwarded = request.headers.get("x-forwarded-for")
-        if forwarded:
-            first = forwarded.split(",")[0].strip()
-            if first:
-                return first
-        real_ip = (request.headers.get("x-real-ip") or "").strip()
-        if real_ip:
-            return real_ip
-    return request.client.host if request.client and request.client.host else "unknown"
-
-
 def _allow_public_create(key: str) -> bool:
     now = datetime.utcnow()
     entry = rate_limit.get(key)
@@ -118,7 +106,13 @@ def _normalize_created_at(value: datetime | None) -> datetime | None:
 
 
 @router.get("/reviews", response_model=list[ReviewPublicOut])
-def list_reviews(db: Session = Depends(get_db)):
+def list_reviews(request: Request, response: Response, db: Session = Depends(get_db)):
+    etag = build_etag(
+        "reviews", table_content_version(db, Review, Review.is_active.is_(True))
+    )
+    not_modified = not_modified_or_tag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     return (
         db.execute(
             select(Review)
@@ -140,7 +134,7 @@ def create_review(
     request: Request,
     db: Session = Depends(get_db),
 ):
-    key = _get_client_key(request)
+    key = get_client_key(request)
     if not _allow_public_create(key):
         log_critical_event(
             domain="messaging",
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, require_admin
 from app.schemas.settings import StoreSettingsOut, StoreSettingsUpdate
+from app.services.catalog_snapshot import refresh_catalog_snapshot
 from app.services.settings import get_store_settings, update_store_settings
+from app.utils.http_cache import build_etag, not_modified_or_tag
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
 @router.get("", response_model=StoreSettingsOut)
-def get_settings(db: Session = Depends(get_db)):
-    return get_store_settings(db)
+def get_settings(request: Request, response: Response, db: Session = Depends(get_db)):
+    store_settings = get_store_settings(db)
+    not_modified = not_modified_or_tag(request, response, build_etag("settings", store_settings))
+    if not_modified is not None:
+        return not_modified
+    return store_settings
 
 
 @router.patch("", response_model=StoreSettingsOut)
@@ -22,4 +28,6 @@ def patch_settings(
     _admin=Depends(require_admin),
 ):
     data = payload.model_dump(exclude_unset=True)
-    return update_store_settings(db, data)
+    store_settings = update_store_settings(db, data)
+    refresh_catalog_snapshot(db)
+    return store_settings
@@ -5,13 +5,15 @@ import logging
 import stripe
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select, update
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db
 from app.core.config import settings
 from app.core.critical_logging import log_critical_event
 from app.models.order import Order
 from app.models.enums import OrderStatus
+from app.services.delivery_slots import reclaim_delivery_slots, release_delivery_slots
 from app.services.email import send_admin_order_email, send_customer_order_email
 from app.services.payment_diagnostics import (
     build_stripe_payment_intent_failure_diagnostics,
@@ -21,6 +23,7 @@ from app.services.payment_diagnostics import (
 )
 from app.services.payment_events import record_payment_event_best_effort
 from app.services.orders import resolve_order_status_from_session
+from app.services.provider_gateway import stripe_gateway
 from app.services.webhook_events import (
     is_webhook_event_processed,
     mark_webhook_event_processed,
@@ -29,32 +32,26 @@ from app.services.webhook_events import (
 router = APIRouter(prefix="/api/stripe", tags=["stripe"])
 
 
-def _load_order_for_session(
-    db: Session, order_id: str | None, session_id: str | None
+async def _load_order_for_session(
+    db: AsyncSession, order_id: str | None, session_id: str | None
 ) -> Order | None:
+    # Items are loaded eagerly: the confirmation email reads them and async
+    # sessions cannot lazy-load.
     if order_id:
-        order = (
-            db.execute(
-                select(Order).where(Order.id == order_id).options(joinedload(Order.items))
-            )
-            .unique()
-            .scalars()
-            .first()
+        result = await db.execute(
+            select(Order).where(Order.id == order_id).options(joinedload(Order.items))
         )
+        order = result.unique().scalars().first()
         if order:
             return order
 
     if session_id:
-        return (
-            db.execute(
-                select(Order)
-                .where(Order.stripe_session_id == session_id)
-                .options(joinedload(Order.items))
-            )
-            .unique()
-            .scalars()
-            .first()
+        result = await db.execute(
+            select(Order)
+            .where(Order.stripe_session_id == session_id)
+            .options(joinedload(Order.items))
         )
+        return result.unique().scalars().first()
 
     return None
 
@@ -107,7 +104,7 @@ def _stripe_payment_intent_context(
 
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     if not settings.stripe_secret_key or not settings.stripe_webhook_secret:
         log_critical_event(
             domain="payment",
@@ -156,7 +153,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         )
         raise HTTPException(status_code=400, detail="Invalid Stripe event.")
 
-    if is_webhook_event_processed(db, provider="stripe", event_id=event_id):
+    if await db.run_sync(is_webhook_event_processed, provider="stripe", event_id=event_id):
         return {"received": True}
 
     event_type = str(event.get("type") or "")
@@ -167,7 +164,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         order_id = metadata.get("orderId")
         session_id = session.get("id")
         payment_intent_id = _provider_id(session.get("payment_intent"))
-        order = _load_order_for_session(db, order_id=order_id, session_id=session_id)
+        order = await _load_order_for_session(db, order_id=order_id, session_id=session_id)
 
         if not order:
             log_critical_event(
@@ -190,8 +187,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 },
             )
         else:
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_webhook_received",
                 provider="stripe",
@@ -203,9 +200,13 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 context=_stripe_session_context(session, event_type=event_type),
                 request=request,
             )
-            resolved_status = resolve_order_status_from_session(order, session)
+            # Resolving an unpaid-but-complete session and building failure
+            # diagnostics may retrieve the PaymentIntent from Stripe.
+            resolved_status = await stripe_gateway.acall(
+                "resolve_session_status", resolve_order_status_from_session, order, session
+            )
             if resolved_status == OrderStatus.PAID:
-                updated = db.execute(
+                updated = await db.execute(
                     update(Order)
                     .where(Order.id == order.id, Order.status != OrderStatus.PAID)
                     .values(
@@ -214,9 +215,11 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                         )
                     )
                 )
-                db.commit()
-                record_payment_event_best_effort(
-                    db,
+                await db.commit()
+                if updated.rowcount:
+                    await db.run_sync(reclaim_delivery_slots, [order.id])
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="stripe_payment_marked_paid"
                     if updated.rowcount
@@ -286,12 +289,14 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                             exc=exc,
                         )
             elif resolved_status == OrderStatus.FAILED:
-                db.execute(
+                await db.execute(
                     update(Order)
                     .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
                     .values(
                         **payment_failure_values(
-                            build_stripe_session_failure_diagnostics(
+                            await stripe_gateway.acall(
+                                "session_failure_diagnostics",
+                                build_stripe_session_failure_diagnostics,
                                 session,
                                 event_type=event_type,
                             ),
@@ -299,9 +304,10 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                         )
                     )
                 )
-                db.commit()
-                record_payment_event_best_effort(
-                    db,
+                await db.commit()
+                await db.run_sync(release_delivery_slots, [order.id])
+                await db.run_sync(
+                    record_payment_event_best_effort,
                     order_id=order.id,
                     event="stripe_checkout_marked_failed",
                     provider="stripe",
@@ -334,8 +340,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                             "expected_currency": order.currency.lower(),
                         },
                     )
-                    record_payment_event_best_effort(
-                        db,
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="stripe_payment_data_mismatch",
                         provider="stripe",
@@ -352,8 +358,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                         request=request,
                     )
                 else:
-                    record_payment_event_best_effort(
-                        db,
+                    await db.run_sync(
+                        record_payment_event_best_effort,
                         order_id=order.id,
                         event="stripe_checkout_webhook_unresolved",
                         provider="stripe",
@@ -372,10 +378,10 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         order_id = metadata.get("orderId")
         session_id = session.get("id")
         payment_intent_id = _provider_id(session.get("payment_intent"))
-        order = _load_order_for_session(db, order_id=order_id, session_id=session_id)
+        order = await _load_order_for_session(db, order_id=order_id, session_id=session_id)
         if order:
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_webhook_received",
                 provider="stripe",
@@ -391,12 +397,14 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 request=request,
             )
         if order and _can_record_payment_failure(order):
-            db.execute(
+            await db.execute(
                 update(Order)
                 .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
                 .values(
                     **payment_failure_values(
-                        build_stripe_session_failure_diagnostics(
+                        await stripe_gateway.acall(
+                            "session_failure_diagnostics",
+                            build_stripe_session_failure_diagnostics,
                             session,
                             event_type=event_type,
                         ),
@@ -404,9 +412,10 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                     )
                 )
             )
-            db.commit()
-            record_payment_event_best_effort(
-                db,
+            await db.commit()
+            await db.run_sync(release_delivery_slots, [order.id])
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_checkout_marked_failed",
                 provider="stripe",
@@ -422,8 +431,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 request=request,
             )
         elif order:
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_failure_webhook_ignored",
                 provider="stripe",
@@ -451,7 +460,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         payment_intent = event["data"]["object"]
         metadata = payment_intent.get("metadata") or {}
         order_id = metadata.get("orderId")
-        order = _load_order_for_session(db, order_id=order_id, session_id=None)
+        order = await _load_order_for_session(db, order_id=order_id, session_id=None)
         payment_intent_id = payment_intent.get("id")
         if not order:
             log_critical_event(
@@ -462,8 +471,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 context={"order_id": order_id, "payment_intent_id": payment_intent_id},
             )
         else:
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_webhook_received",
                 provider="stripe",
@@ -481,7 +490,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 request=request,
             )
         if order and order.status == OrderStatus.PENDING:
-            db.execute(
+            await db.execute(
                 update(Order)
                 .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
                 .values(
@@ -493,9 +502,10 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                     )
                 )
             )
-            db.commit()
-            record_payment_event_best_effort(
-                db,
+            await db.commit()
+            await db.run_sync(release_delivery_slots, [order.id])
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_payment_intent_marked_failed",
                 provider="stripe",
@@ -513,8 +523,8 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 request=request,
             )
         elif order:
-            record_payment_event_best_effort(
-                db,
+            await db.run_sync(
+                record_payment_event_best_effort,
                 order_id=order.id,
                 event="stripe_payment_intent_failure_ignored",
                 provider="stripe",
@@ -532,5 +542,5 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 request=request,
             )
 
-    mark_webhook_event_processed(db, provider="stripe", event_id=event_id)
+    await db.run_sync(mark_webhook_event_processed, provider="stripe", event_id=event_id)
     return {"received": True}
@@ -10,6 +10,7 @@ from app.api.deps import require_admin
 from app.core.config import settings
 from app.core.critical_logging import log_critical_event
 from app.schemas.upload import UploadResponse
+from app.utils.client_keys import get_client_key
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
@@ -20,19 +21,6 @@ REVIEW_UPLOAD_LIMIT = 20
 review_upload_rate_limit: dict[str, dict[str, object]] = {}
 
 
-def _get_client_key(request: Request) -> str:
-    if settings.trust_proxy_headers:
-        forwarded = request.headers.get("x-forwarded-for")
-        if forwarded:
-            first = forwarded.split(",")[0].strip()
-            if first:
-                return first
-        real_ip = (request.headers.get("x-real-ip") or "").strip()
-        if real_ip:
-            return real_ip
-    return request.client.host if request.client and request.client.host else "unknown"
-
-
 def _allow_review_upload(key: str) -> bool:
     now = datetime.utcnow()
     entry = review_upload_rate_limit.get(key)
@@ -108,7 +96,7 @@ async def upload_review_image(
     max_height: int | None = Form(None),
     format: str | None = Form(None),
 ):
-    key = _get_client_key(request)
+    key = get_client_key(request)
     if not _allow_review_upload(key):
         log_critical_event(
             domain="personal_data",
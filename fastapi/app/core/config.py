@@ -46,6 +46,29 @@ class Settings(BaseSettings):
     paypal_client_secret: str | None = Field(default=None, alias="PAYPAL_CLIENT_SECRET")
     paypal_webhook_id: str | None = Field(default=None, alias="PAYPAL_WEBHOOK_ID")
     paypal_env: str = Field(default="sandbox", alias="PAYPAL_ENV")
+    stripe_max_concurrency: int = Field(default=8, alias="STRIPE_MAX_CONCURRENCY")
+    stripe_call_deadline_seconds: float = Field(
+        default=20.0, alias="STRIPE_CALL_DEADLINE_SECONDS"
+    )
+    paypal_max_concurrency: int = Field(default=8, alias="PAYPAL_MAX_CONCURRENCY")
+    paypal_call_deadline_seconds: float = Field(
+        default=20.0, alias="PAYPAL_CALL_DEADLINE_SECONDS"
+    )
+    order_sync_concurrency: int = Field(default=8, alias="ORDER_SYNC_CONCURRENCY")
+    order_sync_call_deadline_seconds: float = Field(
+        default=2.0, alias="ORDER_SYNC_CALL_DEADLINE_SECONDS"
+    )
+    stripe_bulk_sync_min_orders: int = Field(default=20, alias="STRIPE_BULK_SYNC_MIN_ORDERS")
+    stripe_bulk_sync_max_pages: int = Field(default=10, alias="STRIPE_BULK_SYNC_MAX_PAGES")
+    order_sync_backoff_base_seconds: int = Field(
+        default=30, alias="ORDER_SYNC_BACKOFF_BASE_SECONDS"
+    )
+    order_sync_backoff_max_seconds: int = Field(
+        default=1800, alias="ORDER_SYNC_BACKOFF_MAX_SECONDS"
+    )
+    order_reconcile_stale_seconds: int = Field(default=60, alias="ORDER_RECONCILE_STALE_SECONDS")
+    order_reconcile_queue_size: int = Field(default=1000, alias="ORDER_RECONCILE_QUEUE_SIZE")
+    order_reconcile_batch_size: int = Field(default=50, alias="ORDER_RECONCILE_BATCH_SIZE")
 
     site_url: str = Field(default="http://localhost:3000", alias="SITE_URL")
 
@@ -57,6 +80,24 @@ class Settings(BaseSettings):
         default="1995 Hicks Rd, Rolling Meadows, IL 60008, USA",
         alias="DELIVERY_BASE_ADDRESS",
     )
+    delivery_base_lat: float | None = Field(default=None, alias="DELIVERY_BASE_LAT")
+    delivery_base_lng: float | None = Field(default=None, alias="DELIVERY_BASE_LNG")
+    delivery_zip_centroids_path: str | None = Field(
+        default=None, alias="DELIVERY_ZIP_CENTROIDS_PATH"
+    )
+    delivery_degraded_mode: str = Field(default="estimate", alias="DELIVERY_DEGRADED_MODE")
+    delivery_cache_ttl_seconds: int = Field(
+        default=60 * 60 * 24 * 30, alias="DELIVERY_CACHE_TTL_SECONDS"
+    )
+    delivery_cache_negative_ttl_seconds: int = Field(
+        default=60 * 60, alias="DELIVERY_CACHE_NEGATIVE_TTL_SECONDS"
+    )
+    delivery_cache_stale_retention_seconds: int = Field(
+        default=60 * 60 * 24 * 30, alias="DELIVERY_CACHE_STALE_RETENTION_SECONDS"
+    )
+    delivery_slot_capacity: int | None = Field(
+        default=None, alias="DELIVERY_SLOT_CAPACITY"
+    )
 
     cloudinary_cloud_name: str | None = Field(
         default=None, alias="CLOUDINARY_CLOUD_NAME"
@@ -71,6 +112,14 @@ class Settings(BaseSettings):
             return value.replace("postgresql://", "postgresql+psycopg://", 1)
         return value
 
+    def normalized_async_database_url(self) -> str:
+        # psycopg 3 serves both engines; SQLite (tests, local runs) needs aiosqlite.
+        value = self.normalized_database_url()
+        for prefix in ("sqlite+pysqlite://", "sqlite://"):
+            if value.startswith(prefix):
+                return value.replace(prefix, "sqlite+aiosqlite://", 1)
+        return value
+
     def resolved_auth_secret(self) -> str:
         value = (self.auth_secret or "").strip()
         if value:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import threading
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
@@ -12,3 +15,24 @@ class Base(DeclarativeBase):
 
 engine = create_engine(settings.normalized_database_url(), pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# Checkout and payment webhooks run on the event loop through an AsyncSession.
+# Objects stay loaded after commit so handlers can keep reading them without
+# an implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+_async_engine: AsyncEngine | None = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    # Created on first use so importing the app does not require an async
+    # driver for the configured database.
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    settings.normalized_async_database_url(), pool_pre_ping=True
+                )
+    return _async_engine
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, timedelta, timezone
+import hmac
 from hmac import compare_digest
 from hashlib import sha256
+import json
 from secrets import randbelow, token_hex
 from typing import Any
 
@@ -14,6 +17,7 @@ from app.core.config import settings
 ALGORITHM = "HS256"
 OTP_TTL_MINUTES = 10
 CHECKOUT_CANCEL_TOKEN_TTL_HOURS = 24
+DELIVERY_QUOTE_TOKEN_TTL_MINUTES = 30
 
 
 def _encode_token(subject: dict[str, Any], expires_delta: timedelta, token_type: str) -> str:
@@ -75,6 +79,86 @@ def decode_checkout_cancel_token(token: str) -> dict[str, Any]:
     return {"order_id": order_id.strip(), "email": email.strip().lower()}
 
 
+def create_delivery_quote_token(
+    *,
+    address_key: str,
+    miles: float,
+    fee_cents: int,
+    distance_text: str,
+    expires_minutes: int | None = None,
+) -> str:
+    ttl_minutes = expires_minutes or DELIVERY_QUOTE_TOKEN_TTL_MINUTES
+    subject = {
+        "address": address_key,
+        "miles": miles,
+        "fee_cents": fee_cents,
+        "distance_text": distance_text,
+    }
+    return _encode_token(subject, timedelta(minutes=ttl_minutes), "delivery_quote")
+
+
+def decode_delivery_quote_token(token: str) -> dict[str, Any]:
+    payload = _decode_token(token, "delivery_quote")
+    address_key = payload.get("address")
+    miles = payload.get("miles")
+    fee_cents = payload.get("fee_cents")
+    distance_text = payload.get("distance_text")
+    if not isinstance(address_key, str) or not address_key:
+        raise ValueError("Invalid delivery quote token: missing address")
+    if not isinstance(miles, (int, float)) or isinstance(miles, bool) or miles < 0:
+        raise ValueError("Invalid delivery quote token: missing miles")
+    if not isinstance(fee_cents, int) or isinstance(fee_cents, bool) or fee_cents < 0:
+        raise ValueError("Invalid delivery quote token: missing fee")
+    return {
+        "address": address_key,
+        "miles": float(miles),
+        "fee_cents": fee_cents,
+        "distance_text": distance_text if isinstance(distance_text, str) else "",
+        "exp": payload.get("exp"),
+    }
+
+
+def _b64encode(value: bytes) -> str:
+    return urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(value: str) -> bytes:
+    return urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _opaque_signature(body: str, purpose: str) -> str:
+    secret = settings.resolved_auth_secret()
+    if not secret:
+        raise RuntimeError("AUTH_SECRET is not configured")
+    digest = hmac.new(secret.encode("utf-8"), f"{purpose}.{body}".encode("ascii"), sha256)
+    return _b64encode(digest.digest()[:16])
+
+
+def sign_opaque_payload(payload: dict[str, Any], purpose: str) -> str:
+    """Compact, deterministic HMAC-signed token (no expiry), e.g. for cursors."""
+    body = _b64encode(
+        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    )
+    return f"{body}.{_opaque_signature(body, purpose)}"
+
+
+def load_opaque_payload(token: str, purpose: str) -> dict[str, Any]:
+    body, separator, signature = (token or "").partition(".")
+    if not body or not separator or not signature:
+        raise ValueError("Malformed token")
+    # Bytes, because compare_digest raises TypeError on non-ASCII str input.
+    expected = _opaque_signature(body, purpose).encode("ascii")
+    if not compare_digest(signature.encode("utf-8"), expected):
+        raise ValueError("Invalid token signature")
+    try:
+        payload = json.loads(_b64decode(body))
+    except ValueError as exc:
+        raise ValueError("Malformed token") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Malformed token")
+    return payload
+
+
 def generate_otp() -> dict[str, str | datetime]:
     code = str(randbelow(900000) + 100000)
     salt = token_hex(16)
@@ -21,6 +21,7 @@ from app.api.routes import (
 )
 from app.core.config import settings
 from app.core.critical_logging import infer_domain_from_path, log_critical_event, setup_critical_logging
+from app.services.orders import order_reconciliation_queue
 
 setup_critical_logging()
 
@@ -77,6 +78,16 @@ def validate_runtime_config() -> None:
         raise RuntimeError("AUTH_SECRET must be configured for non-development environments.")
 
 
+@app.on_event("startup")
+def start_order_reconciliation() -> None:
+    order_reconciliation_queue.start()
+
+
+@app.on_event("shutdown")
+def stop_order_reconciliation() -> None:
+    order_reconciliation_queue.stop()
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
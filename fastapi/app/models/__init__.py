@@ -1,4 +1,6 @@
 from app.models.bouquet import Bouquet
+from app.models.delivery_geocode_cache import DeliveryGeocodeCache
+from app.models.delivery_slot import DeliverySlot
 from app.models.enums import BouquetType, FlowerType, OrderStatus, Role
 from app.models.order import Order
 from app.models.order_item import OrderItem
@@ -13,6 +15,8 @@ from app.models.webhook_event import WebhookEvent
 __all__ = [
     "Bouquet",
     "BouquetType",
+    "DeliveryGeocodeCache",
+    "DeliverySlot",
     "FlowerType",
     "Order",
     "OrderItem",
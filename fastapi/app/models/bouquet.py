@@ -5,6 +5,7 @@ from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 from app.models.enums import BouquetType, FlowerType
+from app.models.types import TextArray
 from app.utils.ids import generate_cuid
 
 
@@ -21,6 +22,9 @@ class Bouquet(Base):
     style = Column(String, nullable=False)
     bouquet_type = Column("bouquetType", String, default=BouquetType.MONO.value, nullable=False)
     colors = Column(String, nullable=False)
+    # Normalized copies of flowerType/style and colors for GIN-indexed filters.
+    flower_types = Column("flowerTypes", TextArray, default=list, nullable=False)
+    color_tokens = Column("colorTokens", TextArray, default=list, nullable=False)
     is_mixed = Column("isMixed", Boolean, default=False, nullable=False)
     is_featured = Column("isFeatured", Boolean, default=False, nullable=False)
     is_active = Column("isActive", Boolean, default=True, nullable=False)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, Index, String, func
+
+from app.core.database import Base
+
+
+class DeliveryGeocodeCache(Base):
+    __tablename__ = "DeliveryGeocodeCache"
+    __table_args__ = (Index("ix_DeliveryGeocodeCache_expiresAt", "expiresAt"),)
+
+    address_key = Column("addressKey", String, primary_key=True)
+    base_address = Column("baseAddress", String, nullable=False)
+    formatted_address = Column("formattedAddress", String, nullable=True)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    miles = Column(Float, nullable=True)
+    distance_text = Column("distanceText", String, nullable=True)
+    provider_status = Column("providerStatus", String, nullable=True)
+    error_stage = Column("errorStage", String, nullable=True)
+    error_code = Column("errorCode", String, nullable=True)
+    error_message = Column("errorMessage", String, nullable=True)
+    expires_at = Column("expiresAt", DateTime(timezone=True), nullable=False)
+    updated_at = Column(
+        "updatedAt",
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
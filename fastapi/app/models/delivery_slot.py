@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from sqlalchemy import CheckConstraint, Column, Date, DateTime, Integer, String, func
+
+from app.core.database import Base
+
+
+class DeliverySlot(Base):
+    __tablename__ = "DeliverySlot"
+    __table_args__ = (CheckConstraint('"reserved" >= 0', name="ck_DeliverySlot_reserved"),)
+
+    delivery_date = Column("deliveryDate", Date, primary_key=True)
+    window = Column(String, primary_key=True)
+    # NULL capacity means unlimited; reservations are still counted.
+    capacity = Column(Integer, nullable=True)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(
+        "updatedAt",
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
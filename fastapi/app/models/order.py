@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, String, func
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum, Index, Integer, String, Time, false, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -10,6 +10,21 @@ from app.utils.ids import generate_cuid
 
 class Order(Base):
     __tablename__ = "Order"
+    __table_args__ = (
+        Index(
+            "ix_Order_isDeleted_deliveryDate_idealTime",
+            "isDeleted",
+            "deliveryDate",
+            "deliveryIdealTime",
+        ),
+        Index(
+            "ix_Order_deliveryDate_window_status",
+            "deliveryDate",
+            "deliveryWindow",
+            "status",
+        ),
+        Index("ix_Order_status_nextSyncAt", "status", "nextSyncAt"),
+    )
 
     id = Column(String, primary_key=True, default=generate_cuid)
     email = Column(String, nullable=True, index=True)
@@ -28,6 +43,12 @@ class Order(Base):
     delivery_country = Column("deliveryCountry", String, nullable=True)
     delivery_floor = Column("deliveryFloor", String, nullable=True)
     delivery_date_time = Column("deliveryDateTime", String, nullable=True)
+    delivery_date = Column("deliveryDate", Date, nullable=True)
+    delivery_window = Column("deliveryWindow", String, nullable=True)
+    delivery_ideal_time = Column("deliveryIdealTime", Time, nullable=True)
+    delivery_slot_reserved = Column(
+        "deliverySlotReserved", Boolean, default=False, server_default=false(), nullable=False
+    )
     order_comment = Column("orderComment", String, nullable=True)
     delivery_miles = Column("deliveryMiles", String, nullable=True)
     delivery_fee_cents = Column("deliveryFeeCents", Integer, nullable=True)
@@ -37,6 +58,11 @@ class Order(Base):
     payment_failure_message = Column("paymentFailureMessage", String, nullable=True)
     payment_failure_details = Column("paymentFailureDetails", String, nullable=True)
     payment_failed_at = Column("paymentFailedAt", DateTime(timezone=True), nullable=True)
+    synced_at = Column("syncedAt", DateTime(timezone=True), nullable=True)
+    next_sync_at = Column("nextSyncAt", DateTime(timezone=True), nullable=True)
+    sync_attempts = Column(
+        "syncAttempts", Integer, default=0, server_default="0", nullable=False
+    )
     status = Column(Enum(OrderStatus, name="OrderStatus"), default=OrderStatus.PENDING, nullable=False)
     is_read = Column("isRead", Boolean, default=False, nullable=False)
     is_deleted = Column("isDeleted", Boolean, default=False, nullable=False)
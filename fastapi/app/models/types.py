@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, Boolean, Text, cast
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, literal
+from sqlalchemy.types import TypeDecorator
+
+
+class TextArray(TypeDecorator):
+    """TEXT[] on Postgres, JSON list elsewhere (SQLite in tests)."""
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.ARRAY(Text))
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return list(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return []
+        return list(value)
+
+
+class array_overlaps(ColumnElement):
+    """True when ``column`` shares at least one element with ``values``.
+
+    Compiles to the GIN-indexable ``&&`` operator on Postgres.
+    """
+
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, column, values):
+        self.column = column
+        self.values = [str(value) for value in values]
+
+
+@compiles(array_overlaps, "postgresql")
+def _compile_array_overlaps_postgresql(element, compiler, **kw):
+    values = cast(postgresql.array(element.values), postgresql.ARRAY(Text))
+    return f"{compiler.process(element.column, **kw)} && {compiler.process(values, **kw)}"
+
+
+@compiles(array_overlaps)
+def _compile_array_overlaps_default(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    values = ", ".join(compiler.process(literal(value), **kw) for value in element.values)
+    return f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value IN ({values}))"
@@ -26,3 +26,32 @@ class CatalogItem(SchemaBase):
 class CatalogResponse(SchemaBase):
     items: list[CatalogItem]
     next_cursor: Optional[str] = None
+
+
+class BouquetBatchRequest(SchemaBase):
+    ids: list[str]
+
+
+class BouquetBatchResponse(SchemaBase):
+    items: list[CatalogItem]
+    missing: list[str]
+    inactive: list[str]
+
+
+class FacetCount(SchemaBase):
+    value: str
+    count: int
+
+
+class PriceBucket(SchemaBase):
+    min_cents: int
+    max_cents: int
+    count: int
+
+
+class CatalogFacetsResponse(SchemaBase):
+    total: int
+    flowers: list[FacetCount]
+    colors: list[FacetCount]
+    bouquet_types: list[FacetCount]
+    price_histogram: list[PriceBucket]
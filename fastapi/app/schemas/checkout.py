@@ -30,6 +30,27 @@ class CheckoutRequest(SchemaBase):
     phone: Optional[str] = None
     email: Optional[str] = None
     payment_method: Optional[str] = None
+    delivery_quote_token: Optional[str] = None
+
+
+class CheckoutQuoteRequest(SchemaBase):
+    items: list[CheckoutItemIn]
+
+
+class CheckoutQuoteItem(SchemaBase):
+    id: str
+    name: str
+    quantity: int
+    unit_price_cents: int
+    line_total_cents: int
+    details: Optional[str] = None
+
+
+class CheckoutQuoteResponse(SchemaBase):
+    items: list[CheckoutQuoteItem]
+    has_item_discount: bool
+    first_order_discount_percent: int
+    subtotal_cents: int
 
 
 class CheckoutResponse(SchemaBase):
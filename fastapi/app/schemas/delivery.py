@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from datetime import date
+from typing import Optional
+
 from app.schemas.base import SchemaBase
 
 
@@ -11,3 +14,52 @@ class DeliveryQuoteOut(SchemaBase):
     fee_cents: int
     miles: float
     distance_text: str
+    quote_token: Optional[str] = None
+
+
+class DeliveryEstimateOut(SchemaBase):
+    postal_code: str
+    min_miles: float
+    max_miles: float
+    min_fee_cents: Optional[int] = None
+    max_fee_cents: Optional[int] = None
+    deliverable: Optional[bool] = None
+
+
+class DeliveryBatchQuoteRequest(SchemaBase):
+    addresses: list[str]
+
+
+class DeliveryBatchQuoteLine(SchemaBase):
+    index: int
+    address: str
+    ok: bool
+    fee_cents: Optional[int] = None
+    miles: Optional[float] = None
+    distance_text: Optional[str] = None
+    formatted_address: Optional[str] = None
+    provider: Optional[str] = None
+    code: Optional[str] = None
+    error: Optional[str] = None
+
+
+class DeliverySlotOut(SchemaBase):
+    date: date
+    window: str
+    capacity: Optional[int] = None
+    remaining: Optional[int] = None
+    available: bool
+
+
+class DeliverySlotsOut(SchemaBase):
+    slots: list[DeliverySlotOut]
+
+
+class DeliverySlotCapacityRequest(SchemaBase):
+    date: date
+    window: str
+    capacity: Optional[int] = None
+
+
+class DeliverySlotAdminOut(DeliverySlotOut):
+    reserved: int
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time
 from typing import Any, Optional
 
 from app.models.enums import OrderStatus
@@ -38,6 +38,9 @@ class OrderOut(SchemaBase):
     delivery_country: Optional[str] = None
     delivery_floor: Optional[str] = None
     delivery_date_time: Optional[str] = None
+    delivery_date: Optional[date] = None
+    delivery_window: Optional[str] = None
+    delivery_ideal_time: Optional[time] = None
     order_comment: Optional[str] = None
     delivery_miles: Optional[str] = None
     delivery_fee_cents: Optional[int] = None
@@ -47,6 +50,7 @@ class OrderOut(SchemaBase):
     payment_failure_message: Optional[str] = None
     payment_failure_details: Optional[str] = None
     payment_failed_at: Optional[datetime] = None
+    synced_at: Optional[datetime] = None
     created_at: datetime
     items: list[OrderItemOut]
 
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from app.services.colors import normalize_color_value
+
+
+def flower_type_tokens(style: str | None, flower_type: object = None) -> list[str]:
+    tokens: list[str] = []
+    primary = str(getattr(flower_type, "value", flower_type) or "").strip().upper()
+    if primary:
+        tokens.append(primary)
+    for part in (style or "").split(","):
+        token = part.strip().upper()
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def color_tokens(colors: str | None) -> list[str]:
+    tokens: list[str] = []
+    for part in (colors or "").split(","):
+        token = part.strip().lower()
+        if not token:
+            continue
+        mapped = normalize_color_value(token) or token
+        if mapped not in tokens:
+            tokens.append(mapped)
+    return tokens
+
+
+def apply_search_tokens(bouquet) -> None:
+    """Keep the indexed flowerTypes/colorTokens arrays in step with the CSVs."""
+    bouquet.flower_types = flower_type_tokens(bouquet.style, bouquet.flower_type)
+    bouquet.color_tokens = color_tokens(bouquet.colors)
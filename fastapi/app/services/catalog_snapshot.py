@@ -0,0 +1,445 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+import hashlib
+from itertools import count
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.security import load_opaque_payload, sign_opaque_payload
+from app.models.bouquet import Bouquet
+from app.models.enums import BouquetType, FlowerType
+from app.schemas.bouquet import BouquetOut
+from app.schemas.catalog import CatalogItem
+from app.services.colors import COLOR_VALUES, color_filter_candidates, normalize_color_value
+from app.services.pricing import get_bouquet_pricing_batch
+from app.services.settings import get_store_settings
+
+
+# Safety net for multi-worker deployments: writes rebuild the snapshot of the
+# worker that handled them, other workers pick the change up after this TTL.
+CATALOG_SNAPSHOT_TTL_SECONDS = 60
+CATALOG_SORTS = ("created_desc", "name_asc", "name_desc", "price_asc", "price_desc")
+CATALOG_BOUQUET_TYPES = ("mono", "mixed", "season")
+FACET_FLOWER_TYPES = tuple(flower for flower in FlowerType if flower != FlowerType.MIXED)
+FACET_COLORS = tuple(
+    sorted(color for color in COLOR_VALUES if normalize_color_value(color) == color)
+)
+PRICE_BUCKET_CENTS = 2500
+FACETS_CACHE_MAX_ENTRIES = 512
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogFilters:
+    featured: bool = False
+    flowers: tuple[FlowerType, ...] = ()
+    bouquet_type: str | None = None
+    min_cents: int | None = None
+    max_cents: int | None = None
+    color_candidates: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogCursor:
+    """Decoded keyset cursor: sort mode, sort key of the anchor row and its id."""
+
+    sort: str
+    key: datetime | int | str
+    id: str
+
+
+_CURSOR_PURPOSE = "catalog_cursor"
+
+
+def _cursor_key(sort: str, anchor) -> datetime | int | str:
+    if sort in {"name_asc", "name_desc"}:
+        return (anchor.name or "").lower()
+    if sort in {"price_asc", "price_desc"}:
+        return anchor.price_cents or 0
+    return anchor.created_at
+
+
+def encode_catalog_cursor(sort: str, anchor) -> str:
+    key = _cursor_key(sort, anchor)
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    return sign_opaque_payload({"s": sort, "k": key, "id": anchor.id}, _CURSOR_PURPOSE)
+
+
+def decode_catalog_cursor(token: str) -> CatalogCursor:
+    payload = load_opaque_payload(token, _CURSOR_PURPOSE)
+    sort = payload.get("s")
+    key = payload.get("k")
+    anchor_id = payload.get("id")
+    if sort not in CATALOG_SORTS or not isinstance(anchor_id, str) or not anchor_id:
+        raise ValueError("Invalid catalog cursor")
+    if sort in {"name_asc", "name_desc"}:
+        if not isinstance(key, str):
+            raise ValueError("Invalid catalog cursor")
+    elif sort in {"price_asc", "price_desc"}:
+        if not isinstance(key, int) or isinstance(key, bool):
+            raise ValueError("Invalid catalog cursor")
+    else:
+        if not isinstance(key, str):
+            raise ValueError("Invalid catalog cursor")
+        key = datetime.fromisoformat(key)
+    return CatalogCursor(sort=sort, key=key, id=anchor_id)
+
+
+@dataclass(frozen=True, slots=True)
+class PriceBucket:
+    min_cents: int
+    max_cents: int
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogFacets:
+    """Counts for each facet value, computed without that facet's own filter."""
+
+    total: int
+    flowers: tuple[tuple[str, int], ...]
+    colors: tuple[tuple[str, int], ...]
+    bouquet_types: tuple[tuple[str, int], ...]
+    price_histogram: tuple[PriceBucket, ...]
+
+
+@dataclass(slots=True)
+class CatalogPage:
+    items: list[CatalogItem]
+    next_cursor: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class _SnapshotRow:
+    id: str
+    name: str
+    created_at: datetime
+    style: str
+    flower_tokens: frozenset[str]
+    color_tokens: frozenset[str]
+    bouquet_type: str | None
+    is_mixed: bool
+    is_featured: bool
+    price_cents: int
+    item: CatalogItem
+
+
+@dataclass(slots=True)
+class CatalogSnapshot:
+    version: int
+    # Content hash of the rows and settings the snapshot was built from; equal
+    # across workers for equal data, so it can back HTTP ETags.
+    fingerprint: str
+    built_at: float
+    rows: list[_SnapshotRow]
+    orders: dict[str, list[int]]
+    positions: dict[str, dict[str, int]]
+    sorted_prices: list[int]
+    featured_mask: int
+    flower_masks: dict[FlowerType, int]
+    bouquet_type_masks: dict[str, int]
+    color_masks: dict[str, int] = field(default_factory=dict)
+    facets_cache: dict[CatalogFilters, CatalogFacets] = field(default_factory=dict)
+
+    @property
+    def all_mask(self) -> int:
+        return (1 << len(self.rows)) - 1
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        current = time.monotonic() if now is None else now
+        return current - self.built_at < CATALOG_SNAPSHOT_TTL_SECONDS
+
+    def has_anchor(self, cursor: CatalogCursor) -> bool:
+        # Positions are only usable while the anchor row still sits at the
+        # sort key the cursor was issued for.
+        position = self.positions[cursor.sort].get(cursor.id)
+        if position is None:
+            return False
+        row = self.rows[self.orders[cursor.sort][position]]
+        return _cursor_key(cursor.sort, row) == cursor.key
+
+    def _mask_from_rows(self, predicate) -> int:
+        mask = 0
+        for index, row in enumerate(self.rows):
+            if predicate(row):
+                mask |= 1 << index
+        return mask
+
+    def color_mask(self, token: str) -> int:
+        # Same exact-token semantics as the colorTokens && overlap filter. Masks
+        # exist only for tokens present in the rows, so arbitrary query values
+        # cannot grow the map.
+        return self.color_masks.get(token, 0)
+
+    def price_mask(self, min_cents: int | None, max_cents: int | None) -> int:
+        order = self.orders["price_asc"]
+        start = 0 if min_cents is None else bisect_left(self.sorted_prices, min_cents)
+        end = (
+            len(order)
+            if max_cents is None
+            else bisect_right(self.sorted_prices, max_cents)
+        )
+        mask = 0
+        for index in order[start:end]:
+            mask |= 1 << index
+        return mask
+
+    def match_mask(self, filters: CatalogFilters) -> int:
+        mask = self.all_mask
+        if filters.featured:
+            mask &= self.featured_mask
+        if filters.flowers:
+            flower_mask = 0
+            for flower in filters.flowers:
+                flower_mask |= self.flower_masks.get(flower, 0)
+            mask &= flower_mask
+        if filters.bouquet_type:
+            mask &= self.bouquet_type_masks.get(filters.bouquet_type, 0)
+        if filters.min_cents is not None or filters.max_cents is not None:
+            mask &= self.price_mask(filters.min_cents, filters.max_cents)
+        if filters.color_candidates:
+            color_mask = 0
+            for candidate in filters.color_candidates:
+                color_mask |= self.color_mask(candidate)
+            mask &= color_mask
+        return mask
+
+    def facets(self, filters: CatalogFilters) -> CatalogFacets:
+        cached = self.facets_cache.get(filters)
+        if cached is not None:
+            return cached
+
+        flower_base = self.match_mask(replace(filters, flowers=()))
+        color_base = self.match_mask(replace(filters, color_candidates=()))
+        type_base = self.match_mask(replace(filters, bouquet_type=None))
+        price_base = self.match_mask(replace(filters, min_cents=None, max_cents=None))
+
+        colors = []
+        for color in FACET_COLORS:
+            mask = 0
+            for candidate in color_filter_candidates(color):
+                mask |= self.color_mask(candidate)
+            colors.append((color, (color_base & mask).bit_count()))
+
+        histogram: list[PriceBucket] = []
+        if price_base:
+            counts: dict[int, int] = {}
+            for index in self.orders["price_asc"]:
+                if (price_base >> index) & 1:
+                    bucket = self.rows[index].price_cents // PRICE_BUCKET_CENTS
+                    counts[bucket] = counts.get(bucket, 0) + 1
+            for bucket in range(min(counts), max(counts) + 1):
+                histogram.append(
+                    PriceBucket(
+                        min_cents=bucket * PRICE_BUCKET_CENTS,
+                        max_cents=(bucket + 1) * PRICE_BUCKET_CENTS - 1,
+                        count=counts.get(bucket, 0),
+                    )
+                )
+
+        facets = CatalogFacets(
+            total=self.match_mask(filters).bit_count(),
+            flowers=tuple(
+                (flower.value, (flower_base & self.flower_masks.get(flower, 0)).bit_count())
+                for flower in FACET_FLOWER_TYPES
+            ),
+            colors=tuple(colors),
+            bouquet_types=tuple(
+                (
+                    bouquet_type,
+                    (type_base & self.bouquet_type_masks.get(bouquet_type, 0)).bit_count(),
+                )
+                for bouquet_type in CATALOG_BOUQUET_TYPES
+            ),
+            price_histogram=tuple(histogram),
+        )
+        if len(self.facets_cache) >= FACETS_CACHE_MAX_ENTRIES:
+            self.facets_cache.clear()
+        self.facets_cache[filters] = facets
+        return facets
+
+    def query(
+        self,
+        filters: CatalogFilters,
+        *,
+        sort: str,
+        cursor: CatalogCursor | None,
+        take: int,
+    ) -> CatalogPage:
+        mask = self.match_mask(filters)
+        order = self.orders[sort]
+        start = self.positions[sort][cursor.id] + 1 if cursor else 0
+
+        page: list[_SnapshotRow] = []
+        has_more = False
+        if mask:
+            for index in order[start:]:
+                if not (mask >> index) & 1:
+                    continue
+                if len(page) == take:
+                    has_more = True
+                    break
+                page.append(self.rows[index])
+
+        next_cursor = encode_catalog_cursor(sort, page[-1]) if has_more and page else None
+        return CatalogPage(items=[row.item for row in page], next_cursor=next_cursor)
+
+
+_version_counter = count(1)
+_snapshot: CatalogSnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def _matches_bouquet_type(row: _SnapshotRow, bouquet_type: str) -> bool:
+    style = row.style
+    if bouquet_type == "mono":
+        return row.bouquet_type == BouquetType.MONO.value or (
+            row.bouquet_type is None and not row.is_mixed and style != "season"
+        )
+    if bouquet_type == "mixed":
+        return row.bouquet_type == BouquetType.MIXED.value or (
+            row.bouquet_type is None and row.is_mixed
+        )
+    if bouquet_type == "season":
+        return row.bouquet_type == BouquetType.SEASON.value or (
+            row.bouquet_type is None and style == "season"
+        )
+    return False
+
+
+def catalog_sort_columns(sort: str):
+    name_sort_expr = func.lower(func.coalesce(Bouquet.name, ""))
+    if sort == "name_asc":
+        return name_sort_expr.asc(), Bouquet.id.asc()
+    if sort == "name_desc":
+        return name_sort_expr.desc(), Bouquet.id.desc()
+    if sort == "price_asc":
+        return Bouquet.price_cents.asc(), Bouquet.id.asc()
+    if sort == "price_desc":
+        return Bouquet.price_cents.desc(), Bouquet.id.desc()
+    return Bouquet.created_at.desc(), Bouquet.id.desc()
+
+
+def _enum_value(value: object) -> str | None:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+
+def build_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    bouquets = (
+        db.execute(
+            select(Bouquet).where(Bouquet.is_active.is_(True)).order_by(Bouquet.id.asc())
+        )
+        .scalars()
+        .all()
+    )
+    settings = get_store_settings(db)
+
+    rows: list[_SnapshotRow] = []
+    index_by_id: dict[str, int] = {}
+    digest = hashlib.sha256(repr(settings).encode("utf-8"))
+    for bouquet, pricing in zip(bouquets, get_bouquet_pricing_batch(bouquets, settings)):
+        index_by_id[bouquet.id] = len(rows)
+        digest.update(f"|{bouquet.id}:{bouquet.updated_at}".encode("utf-8"))
+        rows.append(
+            _SnapshotRow(
+                id=bouquet.id,
+                name=bouquet.name,
+                created_at=bouquet.created_at,
+                style=(bouquet.style or "").lower(),
+                flower_tokens=frozenset(bouquet.flower_types or ()),
+                color_tokens=frozenset(bouquet.color_tokens or ()),
+                bouquet_type=_enum_value(bouquet.bouquet_type),
+                is_mixed=bool(bouquet.is_mixed),
+                is_featured=bool(bouquet.is_featured),
+                price_cents=bouquet.price_cents or 0,
+                item=CatalogItem(
+                    bouquet=BouquetOut.model_validate(bouquet),
+                    pricing=pricing,
+                ),
+            )
+        )
+
+    # Sort orders come from the database itself so collation and tie-breaking
+    # are identical to the keyset queries of the SQL catalog path.
+    orders: dict[str, list[int]] = {}
+    positions: dict[str, dict[str, int]] = {}
+    for sort in CATALOG_SORTS:
+        ordered_ids = (
+            db.execute(
+                select(Bouquet.id)
+                .where(Bouquet.is_active.is_(True))
+                .order_by(*catalog_sort_columns(sort))
+            )
+            .scalars()
+            .all()
+        )
+        order = [index_by_id[bouquet_id] for bouquet_id in ordered_ids if bouquet_id in index_by_id]
+        orders[sort] = order
+        positions[sort] = {rows[index].id: position for position, index in enumerate(order)}
+
+    snapshot = CatalogSnapshot(
+        version=next(_version_counter),
+        fingerprint=digest.hexdigest()[:32],
+        built_at=time.monotonic(),
+        rows=rows,
+        orders=orders,
+        positions=positions,
+        sorted_prices=[rows[index].price_cents for index in orders["price_asc"]],
+        featured_mask=0,
+        flower_masks={},
+        bouquet_type_masks={},
+    )
+    snapshot.featured_mask = snapshot._mask_from_rows(lambda row: row.is_featured)
+    for flower in FlowerType:
+        if flower == FlowerType.MIXED:
+            continue
+        snapshot.flower_masks[flower] = snapshot._mask_from_rows(
+            lambda row, token=flower.value: token in row.flower_tokens
+        )
+    for bouquet_type in CATALOG_BOUQUET_TYPES:
+        snapshot.bouquet_type_masks[bouquet_type] = snapshot._mask_from_rows(
+            lambda row, bouquet_type=bouquet_type: _matches_bouquet_type(row, bouquet_type)
+        )
+    for index, row in enumerate(rows):
+        for token in row.color_tokens:
+            snapshot.color_masks[token] = snapshot.color_masks.get(token, 0) | (1 << index)
+    return snapshot
+
+
+def get_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.is_fresh():
+            return snapshot
+        snapshot = build_catalog_snapshot(db)
+        _snapshot = snapshot
+        return snapshot
+
+
+def refresh_catalog_snapshot(db: Session) -> None:
+    global _snapshot
+    with _snapshot_lock:
+        try:
+            _snapshot = build_catalog_snapshot(db)
+        except Exception:
+            # Never fail the write that triggered the refresh; the next catalog
+            # read rebuilds from scratch.
+            _snapshot = None
+
+
+def clear_catalog_snapshot() -> None:
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
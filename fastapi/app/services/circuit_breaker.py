@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Optional
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitSnapshot:
+    name: str
+    state: str
+    calls: int
+    failures: int
+    slow_calls: int
+    rejected: int
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.calls if self.calls else 0.0
+
+    @property
+    def slow_call_rate(self) -> float:
+        return self.slow_calls / self.calls if self.calls else 0.0
+
+    def as_context(self) -> dict[str, object]:
+        return {
+            "circuit": self.name,
+            "circuit_state": self.state,
+            "window_calls": self.calls,
+            "window_failures": self.failures,
+            "window_slow_calls": self.slow_calls,
+            "rejected_calls": self.rejected,
+        }
+
+
+TransitionHandler = Callable[[str, str, CircuitSnapshot], None]
+
+
+class CircuitBreaker:
+    """Rolling-window breaker over upstream calls.
+
+    Opens when, over the last ``window_seconds`` and at least ``minimum_calls``
+    calls, the error rate or the rate of calls slower than
+    ``slow_call_seconds`` crosses its threshold. After ``open_seconds`` a
+    single probe is let through (half-open); its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_seconds: float = 60.0,
+        minimum_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 4.0,
+        slow_call_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        on_transition: Optional[TransitionHandler] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.on_transition = on_transition
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: deque[tuple[float, bool, bool]] = deque()
+        self._state = CIRCUIT_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may go upstream; rejected calls fail fast."""
+        transition = None
+        with self._lock:
+            if self._state == CIRCUIT_OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    self._rejected += 1
+                    return False
+                transition = self._move_to(CIRCUIT_HALF_OPEN)
+            if self._state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    self._rejected += 1
+                    allowed = False
+                else:
+                    self._probe_in_flight = True
+                    allowed = True
+            else:
+                allowed = True
+        self._notify(transition)
+        return allowed
+
+    def record(self, *, success: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_seconds
+        transition = None
+        with self._lock:
+            now = self._clock()
+            if self._state == CIRCUIT_HALF_OPEN:
+                self._probe_in_flight = False
+                if success and not slow:
+                    self._calls.clear()
+                    transition = self._move_to(CIRCUIT_CLOSED)
+                else:
+                    transition = self._move_to(CIRCUIT_OPEN)
+            elif self._state == CIRCUIT_CLOSED:
+                self._calls.append((now, success, slow))
+                self._prune(now)
+                if self._should_open():
+                    transition = self._move_to(CIRCUIT_OPEN)
+        self._notify(transition)
+
+    def snapshot(self) -> CircuitSnapshot:
+        with self._lock:
+            self._prune(self._clock())
+            return self._snapshot()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._state = CIRCUIT_CLOSED
+            self._probe_in_flight = False
+            self._rejected = 0
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def _should_open(self) -> bool:
+        snapshot = self._snapshot()
+        if snapshot.calls < self.minimum_calls:
+            return False
+        return (
+            snapshot.failure_rate >= self.failure_rate_threshold
+            or snapshot.slow_call_rate >= self.slow_call_rate_threshold
+        )
+
+    def _snapshot(self) -> CircuitSnapshot:
+        return CircuitSnapshot(
+            name=self.name,
+            state=self._state,
+            calls=len(self._calls),
+            failures=sum(1 for _at, success, _slow in self._calls if not success),
+            slow_calls=sum(1 for _at, _success, slow in self._calls if slow),
+            rejected=self._rejected,
+        )
+
+    def _move_to(self, state: str) -> tuple[str, str, CircuitSnapshot] | None:
+        previous = self._state
+        if previous == state:
+            return None
+        self._state = state
+        if state == CIRCUIT_OPEN:
+            self._opened_at = self._clock()
+        return previous, state, self._snapshot()
+
+    def _notify(self, transition: tuple[str, str, CircuitSnapshot] | None) -> None:
+        if transition is None or self.on_transition is None:
+            return
+        previous, state, snapshot = transition
+        self.on_transition(previous, state, snapshot)
@@ -1,12 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 import logging
+import time
 from typing import Any, Optional
 
 import httpx
+from jose import JWTError
 
 from app.core.config import settings
+from app.core.critical_logging import log_critical_event
+from app.core.security import create_delivery_quote_token, decode_delivery_quote_token
+from app.services.delivery_cache import (
+    CACHEABLE_FAILURE_CODES,
+    CachedDeliveryLookup,
+    delivery_cache_expiry,
+    get_cached_delivery_lookup,
+    normalize_delivery_address,
+    store_delivery_lookup,
+)
+from app.services.circuit_breaker import (
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    CircuitSnapshot,
+)
+from app.services.delivery_geo import (
+    ZIP_CENTROID_SLACK_MILES,
+    RoadDistanceEstimate,
+    estimate_road_distance,
+    extract_postal_code,
+    haversine_miles,
+    load_zip_centroids,
+    normalize_postal_code,
+)
+from app.utils.single_flight import SingleFlight
 
 
 DELIVERY_TIERS = [
@@ -15,6 +45,44 @@ DELIVERY_TIERS = [
     {"max_miles": 30, "fee_cents": 3000},
 ]
 
+# Provider status recorded for quotes decided from straight-line bounds.
+LOCAL_ESTIMATE_STATUS = "LOCAL_ESTIMATE"
+# Provider statuses for quotes served while Google Maps is unavailable.
+DEGRADED_CACHE_STATUS = "DEGRADED_CACHE"
+DEGRADED_ESTIMATE_STATUS = "DEGRADED_ESTIMATE"
+DELIVERY_DEGRADED_MODES = {"off", "cache", "estimate"}
+_QUOTE_PROVIDERS = {
+    LOCAL_ESTIMATE_STATUS: "local_estimate",
+    DEGRADED_CACHE_STATUS: "degraded_cache",
+    DEGRADED_ESTIMATE_STATUS: "degraded_estimate",
+}
+STUDIO_GEOCODE_RETRY_SECONDS = 300
+# Google's per-request destination cap for a single-origin distance matrix.
+DISTANCE_MATRIX_MAX_DESTINATIONS = 25
+DELIVERY_BATCH_GEOCODE_CONCURRENCY = 8
+
+# Failures that say Google Maps itself is unhealthy; these feed the circuit
+# breaker and may fall back to degraded quoting. Address problems do neither.
+GEOCODE_UPSTREAM_FAILURE_CODES = frozenset(
+    {
+        "geocode_request_failed",
+        "geocode_http_error",
+        "geocode_invalid_payload",
+        "geocode_status_invalid",
+        "geocode_circuit_open",
+    }
+)
+DISTANCE_UPSTREAM_FAILURE_CODES = frozenset(
+    {
+        "distance_matrix_request_failed",
+        "distance_matrix_http_error",
+        "distance_matrix_invalid_payload",
+        "distance_matrix_status_invalid",
+        "distance_matrix_distance_missing",
+        "distance_matrix_circuit_open",
+    }
+)
+
 
 @dataclass
 class DeliveryQuote:
@@ -37,6 +105,8 @@ class DeliveryQuote:
 class DeliveryValidationResult:
     ok: bool
     formatted_address: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
     error: Optional[str] = None
     code: Optional[str] = None
     provider_status: Optional[str] = None
@@ -44,6 +114,13 @@ class DeliveryValidationResult:
     details: dict[str, Any] | None = None
 
 
+@dataclass
+class DistanceMeasurement:
+    miles: float
+    distance_text: Optional[str] = None
+    provider_status: Optional[str] = None
+
+
 def summarize_delivery_address_input(raw_address: str) -> dict[str, Any]:
     trimmed = raw_address.strip()
     segments = [segment.strip() for segment in trimmed.split(",") if segment.strip()]
@@ -88,6 +165,7 @@ def delivery_quote_failure_level(quote: DeliveryQuote) -> int:
         "distance_matrix_invalid_payload",
         "distance_matrix_status_invalid",
         "distance_matrix_distance_missing",
+        "delivery_batch_failed",
     }
     if (quote.code or "") in technical_failure_codes:
         return logging.ERROR
@@ -214,9 +292,14 @@ async def _validate_and_geocode(address: str, api_key: str) -> DeliveryValidatio
             provider_status=str(status or "OK"),
         )
 
+    location = (result.get("geometry") or {}).get("location") or {}
+    lat = location.get("lat")
+    lng = location.get("lng")
     return DeliveryValidationResult(
         ok=True,
         formatted_address=result.get("formatted_address"),
+        lat=float(lat) if isinstance(lat, (int, float)) else None,
+        lng=float(lng) if isinstance(lng, (int, float)) else None,
         provider_status=str(status or "OK"),
     )
 
@@ -228,70 +311,84 @@ def get_delivery_fee_cents(miles: float) -> Optional[int]:
     return None
 
 
-async def get_delivery_quote(raw_address: str) -> DeliveryQuote:
-    address = raw_address.strip()
-    if not address:
+def _build_distance_quote(
+    *,
+    miles: float,
+    distance_text: str | None,
+    formatted_address: str | None,
+    base_address: str,
+    provider_status: str | None,
+) -> DeliveryQuote:
+    provider = _QUOTE_PROVIDERS.get(provider_status or "", "google_maps")
+    fee_cents = get_delivery_fee_cents(miles)
+    if fee_cents is None:
+        max_miles = DELIVERY_TIERS[-1]["max_miles"]
         return _build_failed_quote(
-            error="Delivery address is required.",
-            stage="input_validation",
-            code="delivery_address_missing",
+            error=(
+                f"Delivery is available within {max_miles} miles of our studio. "
+                f"Your address is {miles:.1f} miles away."
+            ),
+            stage="delivery_radius",
+            code="delivery_out_of_range",
+            provider=provider,
+            provider_status=provider_status,
+            details={"max_miles": max_miles, "calculated_miles": miles},
         )
 
-    api_key = settings.google_maps_api_key
-    if not api_key:
-        return _build_failed_quote(
-            error="Delivery is not configured.",
-            stage="configuration",
-            code="delivery_not_configured",
-            provider="google_maps",
-        )
+    return DeliveryQuote(
+        ok=True,
+        miles=miles,
+        distance_text=distance_text or f"{miles:.1f} mi",
+        fee_cents=fee_cents,
+        base_address=base_address,
+        formatted_address=formatted_address,
+        stage="complete",
+        code="delivery_quote_ok",
+        provider=provider,
+        provider_status=provider_status or "OK",
+    )
 
-    format_error, format_code = _validate_address_format_details(address)
-    if format_error:
-        return _build_failed_quote(
-            error=format_error,
-            stage="input_validation",
-            code=format_code or "delivery_address_invalid",
-        )
 
-    validation = await _validate_and_geocode(address, api_key)
-    if not validation.ok or not validation.formatted_address:
-        return _build_failed_quote(
-            error=validation.error or "Unable to validate address.",
-            stage="geocode_validation",
-            code=validation.code or "delivery_address_invalid",
-            provider="google_maps",
-            provider_status=validation.provider_status,
-            provider_http_status=validation.provider_http_status,
-            details=validation.details,
-        )
+async def _fetch_distance(
+    base_address: str, formatted_address: str, api_key: str
+) -> DistanceMeasurement | DeliveryQuote:
+    return (await _fetch_distances(base_address, [formatted_address], api_key))[0]
 
-    formatted_address = validation.formatted_address
 
-    base_address = settings.delivery_base_address
+async def _fetch_distances(
+    base_address: str, destinations: list[str], api_key: str
+) -> list[DistanceMeasurement | DeliveryQuote]:
+    """One distance matrix request for up to DISTANCE_MATRIX_MAX_DESTINATIONS
+    destinations; returns one result per destination, in order."""
     params = {
         "origins": base_address,
-        "destinations": formatted_address,
+        "destinations": "|".join(
+            destination.replace("|", " ") for destination in destinations
+        ),
         "units": "imperial",
         "key": api_key,
     }
 
+    def failed_for_all(**kwargs: Any) -> list[DistanceMeasurement | DeliveryQuote]:
+        return [
+            _build_failed_quote(error="Unable to calculate delivery distance.", **kwargs)
+            for _ in destinations
+        ]
+
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             response = await client.get(
                 "https://maps.googleapis.com/maps/api/distancematrix/json", params=params
             )
     except httpx.HTTPError:
-        return _build_failed_quote(
-            error="Unable to calculate delivery distance.",
+        return failed_for_all(
             stage="distance_matrix_request",
             code="distance_matrix_request_failed",
             provider="google_maps",
         )
 
     if response.status_code != 200:
-        return _build_failed_quote(
-            error="Unable to calculate delivery distance.",
+        return failed_for_all(
             stage="distance_matrix_request",
             code="distance_matrix_http_error",
             provider="google_maps",
@@ -300,23 +397,32 @@ async def get_delivery_quote(raw_address: str) -> DeliveryQuote:
     try:
         data = response.json()
     except ValueError:
-        return _build_failed_quote(
-            error="Unable to calculate delivery distance.",
+        return failed_for_all(
             stage="distance_matrix_request",
             code="distance_matrix_invalid_payload",
             provider="google_maps",
         )
     matrix_status = data.get("status")
     if matrix_status != "OK":
-        return _build_failed_quote(
-            error="Unable to calculate delivery distance.",
+        return failed_for_all(
             stage="distance_matrix_response",
             code="distance_matrix_status_invalid",
             provider="google_maps",
             provider_status=str(matrix_status or "unknown"),
         )
 
-    element = (data.get("rows") or [{}])[0].get("elements", [{}])[0]
+    elements = (data.get("rows") or [{}])[0].get("elements") or []
+    return [
+        _parse_distance_element(
+            elements[index] if index < len(elements) else {}, str(matrix_status or "OK")
+        )
+        for index in range(len(destinations))
+    ]
+
+
+def _parse_distance_element(
+    element: dict[str, Any], matrix_status: str
+) -> DistanceMeasurement | DeliveryQuote:
     element_status = element.get("status")
     if element_status != "OK":
         return _build_failed_quote(
@@ -324,7 +430,7 @@ async def get_delivery_quote(raw_address: str) -> DeliveryQuote:
             stage="distance_matrix_response",
             code="distance_matrix_element_invalid",
             provider="google_maps",
-            provider_status=str(matrix_status or "OK"),
+            provider_status=matrix_status,
             details={"element_status": str(element_status or "unknown")},
         )
 
@@ -335,35 +441,664 @@ async def get_delivery_quote(raw_address: str) -> DeliveryQuote:
             stage="distance_matrix_response",
             code="distance_matrix_distance_missing",
             provider="google_maps",
-            provider_status=str(matrix_status or "OK"),
+            provider_status=matrix_status,
         )
 
-    miles = round((meters / 1609.344) * 100) / 100
-    fee_cents = get_delivery_fee_cents(miles)
-    if fee_cents is None:
-        max_miles = DELIVERY_TIERS[-1]["max_miles"]
+    return DistanceMeasurement(
+        miles=round((meters / 1609.344) * 100) / 100,
+        distance_text=(element.get("distance") or {}).get("text"),
+        provider_status=matrix_status,
+    )
+
+
+def _report_google_maps_transition(
+    previous: str, state: str, snapshot: CircuitSnapshot
+) -> None:
+    if state == CIRCUIT_OPEN:
+        level = logging.ERROR
+        message = "Google Maps circuit opened; delivery quotes fail fast or degrade."
+    elif state == CIRCUIT_HALF_OPEN:
+        level = logging.WARNING
+        message = "Google Maps circuit half-open; probing with one request."
+    else:
+        level = logging.INFO
+        message = "Google Maps circuit closed; delivery quotes use live lookups again."
+    log_critical_event(
+        domain="cart",
+        event=f"google_maps_circuit_{state}",
+        message=message,
+        context={
+            **snapshot.as_context(),
+            "previous_state": previous,
+            "degraded_mode": _degraded_mode(),
+        },
+        level=level,
+    )
+
+
+google_maps_breaker = CircuitBreaker("google_maps", on_transition=_report_google_maps_transition)
+
+
+async def _geocode_with_breaker(address: str, api_key: str) -> DeliveryValidationResult:
+    if not google_maps_breaker.allow():
+        return DeliveryValidationResult(
+            ok=False,
+            error="Unable to validate address.",
+            code="geocode_circuit_open",
+        )
+    started = time.monotonic()
+    result: DeliveryValidationResult | None = None
+    try:
+        result = await _validate_and_geocode(address, api_key)
+        return result
+    finally:
+        google_maps_breaker.record(
+            success=result is not None and result.code not in GEOCODE_UPSTREAM_FAILURE_CODES,
+            duration=time.monotonic() - started,
+        )
+
+
+async def _distance_with_breaker(
+    base_address: str, formatted_address: str, api_key: str
+) -> DistanceMeasurement | DeliveryQuote:
+    if not google_maps_breaker.allow():
         return _build_failed_quote(
-            error=(
-                f"Delivery is available within {max_miles} miles of our studio. "
-                f"Your address is {miles:.1f} miles away."
-            ),
-            stage="delivery_radius",
-            code="delivery_out_of_range",
+            error="Unable to calculate delivery distance.",
+            stage="distance_matrix_request",
+            code="distance_matrix_circuit_open",
             provider="google_maps",
-            details={"max_miles": max_miles, "calculated_miles": miles},
+        )
+    started = time.monotonic()
+    result: DistanceMeasurement | DeliveryQuote | None = None
+    try:
+        result = await _fetch_distance(base_address, formatted_address, api_key)
+        return result
+    finally:
+        failed = result is None or (
+            isinstance(result, DeliveryQuote)
+            and result.code in DISTANCE_UPSTREAM_FAILURE_CODES
+        )
+        google_maps_breaker.record(success=not failed, duration=time.monotonic() - started)
+
+
+async def _distances_with_breaker(
+    base_address: str, destinations: list[str], api_key: str
+) -> list[DistanceMeasurement | DeliveryQuote]:
+    if not google_maps_breaker.allow():
+        return [
+            _build_failed_quote(
+                error="Unable to calculate delivery distance.",
+                stage="distance_matrix_request",
+                code="distance_matrix_circuit_open",
+                provider="google_maps",
+            )
+            for _ in destinations
+        ]
+    started = time.monotonic()
+    results: list[DistanceMeasurement | DeliveryQuote] | None = None
+    try:
+        results = await _fetch_distances(base_address, destinations, api_key)
+        return results
+    finally:
+        # Per-element failures are about the address; only a request-wide
+        # failure (every element failing the same way) counts against Google.
+        failed = results is None or all(
+            isinstance(result, DeliveryQuote)
+            and result.code in DISTANCE_UPSTREAM_FAILURE_CODES
+            for result in results
+        )
+        google_maps_breaker.record(success=not failed, duration=time.monotonic() - started)
+
+
+def _quote_from_cache(entry: CachedDeliveryLookup) -> DeliveryQuote:
+    if entry.is_negative:
+        return _build_failed_quote(
+            error=entry.error_message or "Unable to validate address.",
+            stage=entry.error_stage or "geocode_validation",
+            code=entry.error_code or "delivery_address_invalid",
+            provider="google_maps",
+            provider_status=entry.provider_status,
+        )
+    return _build_distance_quote(
+        miles=entry.miles or 0.0,
+        distance_text=entry.distance_text,
+        formatted_address=entry.formatted_address,
+        base_address=entry.base_address,
+        provider_status=entry.provider_status,
+    )
+
+
+async def _remember_failure(address_key: str, base_address: str, quote: DeliveryQuote) -> None:
+    if quote.code not in CACHEABLE_FAILURE_CODES:
+        return
+    await store_delivery_lookup(
+        CachedDeliveryLookup(
+            address_key=address_key,
+            base_address=base_address,
+            expires_at=delivery_cache_expiry(negative=True),
+            provider_status=quote.provider_status,
+            error_stage=quote.stage,
+            error_code=quote.code,
+            error_message=quote.error,
+        )
+    )
+
+
+# Overlapping quotes for the same normalized address (typing bursts, the cart
+# re-quoting at checkout) share one upstream lookup per process.
+delivery_lookups = SingleFlight()
+_studio_coordinates: dict[str, tuple[float, float]] = {}
+_studio_geocode_failed_at: dict[str, float] = {}
+
+
+async def _get_studio_coordinates(base_address: str, api_key: str) -> tuple[float, float] | None:
+    if settings.delivery_base_lat is not None and settings.delivery_base_lng is not None:
+        return settings.delivery_base_lat, settings.delivery_base_lng
+    known = _studio_coordinates.get(base_address)
+    if known is not None:
+        return known
+    failed_at = _studio_geocode_failed_at.get(base_address)
+    if failed_at is not None and time.monotonic() - failed_at < STUDIO_GEOCODE_RETRY_SECONDS:
+        return None
+
+    return await delivery_lookups.run(
+        ("studio", base_address), lambda: _lookup_studio_coordinates(base_address, api_key)
+    )
+
+
+async def _lookup_studio_coordinates(
+    base_address: str, api_key: str
+) -> tuple[float, float] | None:
+    address_key = normalize_delivery_address(base_address)
+    entry = await get_cached_delivery_lookup(address_key, base_address)
+    if entry is not None and entry.lat is not None and entry.lng is not None:
+        coordinates = (entry.lat, entry.lng)
+    else:
+        validation = await _geocode_with_breaker(base_address, api_key)
+        if not validation.ok or validation.lat is None or validation.lng is None:
+            _studio_geocode_failed_at[base_address] = time.monotonic()
+            return None
+        coordinates = (validation.lat, validation.lng)
+        # The studio is its own zero-mile quote, so cache it like any address.
+        await store_delivery_lookup(
+            CachedDeliveryLookup(
+                address_key=address_key,
+                base_address=base_address,
+                expires_at=delivery_cache_expiry(negative=False),
+                formatted_address=validation.formatted_address,
+                lat=validation.lat,
+                lng=validation.lng,
+                miles=0.0,
+                provider_status=validation.provider_status,
+            )
+        )
+    _studio_coordinates[base_address] = coordinates
+    return coordinates
+
+
+async def _estimate_from_coordinates(
+    base_address: str, api_key: str, lat: float | None, lng: float | None
+) -> RoadDistanceEstimate | None:
+    if lat is None or lng is None:
+        return None
+    studio = await _get_studio_coordinates(base_address, api_key)
+    if studio is None:
+        return None
+    straight_miles = haversine_miles(studio[0], studio[1], lat, lng)
+    return estimate_road_distance(straight_miles, get_delivery_fee_cents)
+
+
+async def _estimate_from_postal_code(
+    postal_code: str, api_key: str
+) -> tuple[str, RoadDistanceEstimate] | None:
+    normalized = normalize_postal_code(postal_code)
+    path = settings.delivery_zip_centroids_path
+    if not normalized or not path:
+        return None
+    centroid = load_zip_centroids(path).get(normalized)
+    if centroid is None:
+        return None
+    studio = await _get_studio_coordinates(settings.delivery_base_address, api_key)
+    if studio is None:
+        return None
+    straight_miles = haversine_miles(studio[0], studio[1], centroid[0], centroid[1])
+    estimate = estimate_road_distance(
+        straight_miles, get_delivery_fee_cents, slack_miles=ZIP_CENTROID_SLACK_MILES
+    )
+    return normalized, estimate
+
+
+def _degraded_mode() -> str:
+    mode = (settings.delivery_degraded_mode or "").strip().lower()
+    return mode if mode in DELIVERY_DEGRADED_MODES else "off"
+
+
+async def _degraded_quote(
+    address: str,
+    address_key: str,
+    base_address: str,
+    api_key: str,
+    *,
+    lat: float | None = None,
+    lng: float | None = None,
+    formatted_address: str | None = None,
+) -> DeliveryQuote | None:
+    """Best-effort quote while Google Maps is failing or its circuit is open.
+
+    ``cache`` serves expired cache rows; ``estimate`` additionally falls back
+    to straight-line bounds (geocode, else ZIP centroid) and charges the upper
+    fee of the plausible range so degraded quotes never undercharge.
+    """
+    mode = _degraded_mode()
+    if mode == "off":
+        return None
+    quote: DeliveryQuote | None = None
+    stale = await get_cached_delivery_lookup(address_key, base_address, allow_stale=True)
+    if stale is not None and not stale.is_negative:
+        if stale.miles is not None:
+            quote = _build_distance_quote(
+                miles=stale.miles,
+                distance_text=stale.distance_text,
+                formatted_address=stale.formatted_address,
+                base_address=base_address,
+                provider_status=DEGRADED_CACHE_STATUS,
+            )
+        elif lat is None or lng is None:
+            lat, lng = stale.lat, stale.lng
+            formatted_address = formatted_address or stale.formatted_address
+
+    if quote is None and mode == "estimate":
+        estimate = await _estimate_from_coordinates(base_address, api_key, lat, lng)
+        if estimate is None:
+            by_postal_code = await _estimate_from_postal_code(
+                extract_postal_code(address), api_key
+            )
+            estimate = by_postal_code[1] if by_postal_code else None
+        if estimate is not None and estimate.min_fee_cents is None:
+            quote = _build_distance_quote(
+                miles=estimate.estimated_miles,
+                distance_text=None,
+                formatted_address=formatted_address,
+                base_address=base_address,
+                provider_status=DEGRADED_ESTIMATE_STATUS,
+            )
+        elif estimate is not None and estimate.max_fee_cents is not None:
+            miles = estimate.estimated_miles
+            quote = DeliveryQuote(
+                ok=True,
+                miles=miles,
+                distance_text=f"~{miles:.1f} mi",
+                fee_cents=estimate.max_fee_cents,
+                base_address=base_address,
+                formatted_address=formatted_address,
+                stage="complete",
+                code="delivery_quote_ok",
+                provider=_QUOTE_PROVIDERS[DEGRADED_ESTIMATE_STATUS],
+                provider_status=DEGRADED_ESTIMATE_STATUS,
+                details={
+                    "min_fee_cents": estimate.min_fee_cents,
+                    "max_fee_cents": estimate.max_fee_cents,
+                },
+            )
+
+    if quote is not None:
+        log_critical_event(
+            domain="cart",
+            event="delivery_quote_degraded",
+            message="Delivery quote served in degraded mode.",
+            context={
+                "degraded_mode": mode,
+                "delivery_provider": quote.provider,
+                "delivery_fee_cents": quote.fee_cents,
+                "circuit_state": google_maps_breaker.state,
+            },
+            level=logging.WARNING,
+        )
+    return quote
+
+
+def _check_quote_input(address: str, api_key: str | None) -> DeliveryQuote | None:
+    if not address:
+        return _build_failed_quote(
+            error="Delivery address is required.",
+            stage="input_validation",
+            code="delivery_address_missing",
         )
 
-    distance_text = (element.get("distance") or {}).get("text") or f"{miles:.1f} mi"
+    if not api_key:
+        return _build_failed_quote(
+            error="Delivery is not configured.",
+            stage="configuration",
+            code="delivery_not_configured",
+            provider="google_maps",
+        )
 
+    format_error, format_code = _validate_address_format_details(address)
+    if format_error:
+        return _build_failed_quote(
+            error=format_error,
+            stage="input_validation",
+            code=format_code or "delivery_address_invalid",
+        )
+    return None
+
+
+async def get_delivery_quote(raw_address: str) -> DeliveryQuote:
+    address = raw_address.strip()
+    api_key = settings.google_maps_api_key
+    rejected = _check_quote_input(address, api_key)
+    if rejected is not None or not api_key:
+        return rejected
+
+    base_address = settings.delivery_base_address
+    address_key = normalize_delivery_address(address)
+    return await delivery_lookups.run(
+        ("quote", address_key, base_address),
+        lambda: _quote_delivery(address, address_key, base_address, api_key),
+    )
+
+
+@dataclass
+class _PendingDistance:
+    address: str
+    address_key: str
+    validation: DeliveryValidationResult
+    geocode_cached: bool
+    local_distance: DistanceMeasurement | None = None
+
+
+async def _prepare_quote(
+    address: str, address_key: str, base_address: str, api_key: str
+) -> DeliveryQuote | _PendingDistance:
+    """Resolve everything up to the distance matrix call for one address."""
+    cached = await get_cached_delivery_lookup(address_key, base_address)
+    if cached is not None and (cached.is_negative or cached.miles is not None):
+        return _quote_from_cache(cached)
+
+    if cached is not None:
+        validation = DeliveryValidationResult(
+            ok=True,
+            formatted_address=cached.formatted_address,
+            lat=cached.lat,
+            lng=cached.lng,
+            provider_status=cached.provider_status,
+        )
+    else:
+        validation = await _geocode_with_breaker(address, api_key)
+    if not validation.ok or not validation.formatted_address:
+        if validation.code in GEOCODE_UPSTREAM_FAILURE_CODES:
+            degraded = await _degraded_quote(address, address_key, base_address, api_key)
+            if degraded is not None:
+                return degraded
+        failed = _build_failed_quote(
+            error=validation.error or "Unable to validate address.",
+            stage="geocode_validation",
+            code=validation.code or "delivery_address_invalid",
+            provider="google_maps",
+            provider_status=validation.provider_status,
+            provider_http_status=validation.provider_http_status,
+            details=validation.details,
+        )
+        await _remember_failure(address_key, base_address, failed)
+        return failed
+
+    pending = _PendingDistance(
+        address=address,
+        address_key=address_key,
+        validation=validation,
+        geocode_cached=cached is not None,
+    )
+    # Straight-line bounds settle most quotes; only addresses whose plausible
+    # road distance straddles a tier boundary need the distance matrix.
+    estimate = await _estimate_from_coordinates(
+        base_address, api_key, validation.lat, validation.lng
+    )
+    if estimate is not None and estimate.decided:
+        miles = estimate.estimated_miles
+        pending.local_distance = DistanceMeasurement(
+            miles=miles,
+            distance_text=f"~{miles:.1f} mi",
+            provider_status=LOCAL_ESTIMATE_STATUS,
+        )
+    return pending
+
+
+async def _finish_quote(
+    pending: _PendingDistance,
+    distance: DistanceMeasurement | DeliveryQuote,
+    base_address: str,
+    api_key: str,
+) -> DeliveryQuote:
+    validation = pending.validation
+    formatted_address = validation.formatted_address
+    if isinstance(distance, DeliveryQuote):
+        if distance.code in CACHEABLE_FAILURE_CODES:
+            await _remember_failure(pending.address_key, base_address, distance)
+        elif not pending.geocode_cached:
+            # Keep the geocode so the retry only repeats the distance call.
+            await store_delivery_lookup(
+                CachedDeliveryLookup(
+                    address_key=pending.address_key,
+                    base_address=base_address,
+                    expires_at=delivery_cache_expiry(negative=False),
+                    formatted_address=formatted_address,
+                    lat=validation.lat,
+                    lng=validation.lng,
+                    provider_status=validation.provider_status,
+                )
+            )
+        if distance.code in DISTANCE_UPSTREAM_FAILURE_CODES:
+            degraded = await _degraded_quote(
+                pending.address,
+                pending.address_key,
+                base_address,
+                api_key,
+                lat=validation.lat,
+                lng=validation.lng,
+                formatted_address=formatted_address,
+            )
+            if degraded is not None:
+                return degraded
+        return distance
+
+    await store_delivery_lookup(
+        CachedDeliveryLookup(
+            address_key=pending.address_key,
+            base_address=base_address,
+            expires_at=delivery_cache_expiry(negative=False),
+            formatted_address=formatted_address,
+            lat=validation.lat,
+            lng=validation.lng,
+            miles=distance.miles,
+            distance_text=distance.distance_text,
+            provider_status=distance.provider_status,
+        )
+    )
+    return _build_distance_quote(
+        miles=distance.miles,
+        distance_text=distance.distance_text,
+        formatted_address=formatted_address,
+        base_address=base_address,
+        provider_status=distance.provider_status,
+    )
+
+
+async def _quote_delivery(
+    address: str, address_key: str, base_address: str, api_key: str
+) -> DeliveryQuote:
+    prepared = await _prepare_quote(address, address_key, base_address, api_key)
+    if isinstance(prepared, DeliveryQuote):
+        return prepared
+    distance = prepared.local_distance or await _distance_with_breaker(
+        base_address, prepared.validation.formatted_address or "", api_key
+    )
+    return await _finish_quote(prepared, distance, base_address, api_key)
+
+
+def _batch_failed_quote(exc: Exception, *, stage: str) -> DeliveryQuote:
+    log_critical_event(
+        domain="cart",
+        event="delivery_batch_quote_failed",
+        message="Delivery batch quote failed for an address.",
+        context={"delivery_stage": stage},
+        exc=exc,
+    )
+    return _build_failed_quote(
+        error="Unable to calculate delivery.",
+        stage=stage,
+        code="delivery_batch_failed",
+        details={"exception": type(exc).__name__},
+    )
+
+
+async def quote_delivery_batch(
+    addresses: list[str], *, concurrency: int = DELIVERY_BATCH_GEOCODE_CONCURRENCY
+) -> AsyncIterator[tuple[int, DeliveryQuote]]:
+    """Quote many addresses, yielding ``(index, quote)`` as each resolves.
+
+    Geocoding runs concurrently under a semaphore and goes through the
+    geocode cache; addresses that still need road distance are packed into
+    distance matrix requests of up to DISTANCE_MATRIX_MAX_DESTINATIONS.
+    Duplicate addresses are looked up once.
+    """
+    api_key = settings.google_maps_api_key or ""
+    base_address = settings.delivery_base_address
+    groups: dict[str, list[int]] = {}
+    originals: dict[str, str] = {}
+    for index, raw_address in enumerate(addresses):
+        address = raw_address.strip()
+        rejected = _check_quote_input(address, api_key)
+        if rejected is not None:
+            yield index, rejected
+            continue
+        address_key = normalize_delivery_address(address)
+        groups.setdefault(address_key, []).append(index)
+        originals.setdefault(address_key, address)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def prepare(
+        address_key: str,
+    ) -> tuple[str, DeliveryQuote | _PendingDistance]:
+        try:
+            async with semaphore:
+                prepared = await _prepare_quote(
+                    originals[address_key], address_key, base_address, api_key
+                )
+        except Exception as exc:
+            prepared = _batch_failed_quote(exc, stage="geocode_validation")
+        return address_key, prepared
+
+    async def finish(
+        item: _PendingDistance, distance: DistanceMeasurement | DeliveryQuote
+    ) -> DeliveryQuote:
+        try:
+            return await _finish_quote(item, distance, base_address, api_key)
+        except Exception as exc:
+            return _batch_failed_quote(exc, stage="distance_matrix_response")
+
+    # The response is already streaming, so one address failing must become
+    # its own error line rather than cut the stream short for the rest.
+    pending: list[_PendingDistance] = []
+    tasks = [asyncio.ensure_future(prepare(key)) for key in groups]
+    try:
+        for next_prepared in asyncio.as_completed(tasks):
+            address_key, prepared = await next_prepared
+            if isinstance(prepared, _PendingDistance):
+                if prepared.local_distance is None:
+                    pending.append(prepared)
+                    continue
+                prepared = await finish(prepared, prepared.local_distance)
+            for index in groups[address_key]:
+                yield index, prepared
+    finally:
+        # A client that disconnects closes the generator; stop the lookups too.
+        for task in tasks:
+            task.cancel()
+
+    for start in range(0, len(pending), DISTANCE_MATRIX_MAX_DESTINATIONS):
+        chunk = pending[start : start + DISTANCE_MATRIX_MAX_DESTINATIONS]
+        try:
+            distances = await _distances_with_breaker(
+                base_address,
+                [item.validation.formatted_address or "" for item in chunk],
+                api_key,
+            )
+        except Exception as exc:
+            failed = _batch_failed_quote(exc, stage="distance_matrix_request")
+            for item in chunk:
+                for index in groups[item.address_key]:
+                    yield index, failed
+            continue
+        for item, distance in zip(chunk, distances):
+            quote = await finish(item, distance)
+            for index in groups[item.address_key]:
+                yield index, quote
+
+
+def issue_delivery_quote_token(raw_address: str, quote: DeliveryQuote) -> str | None:
+    if not quote.ok or quote.miles is None or quote.fee_cents is None:
+        return None
+    try:
+        return create_delivery_quote_token(
+            address_key=normalize_delivery_address(raw_address),
+            miles=quote.miles,
+            fee_cents=quote.fee_cents,
+            distance_text=quote.distance_text or f"{quote.miles:.1f} mi",
+        )
+    except RuntimeError:
+        return None
+
+
+def delivery_quote_from_token(token: str | None, raw_address: str) -> DeliveryQuote | None:
+    """Rebuild a quote issued by /api/delivery/quote for the same address.
+
+    Returns None when the token is missing, expired, tampered with or was
+    issued for another address; callers then fall back to a live quote.
+    """
+    if not token:
+        return None
+    try:
+        payload = decode_delivery_quote_token(token)
+    except (JWTError, ValueError, RuntimeError):
+        return None
+    if payload["address"] != normalize_delivery_address(raw_address):
+        return None
     return DeliveryQuote(
         ok=True,
-        miles=miles,
-        distance_text=distance_text,
-        fee_cents=fee_cents,
-        base_address=base_address,
-        formatted_address=formatted_address,
+        miles=payload["miles"],
+        distance_text=payload["distance_text"] or f"{payload['miles']:.1f} mi",
+        fee_cents=payload["fee_cents"],
+        base_address=settings.delivery_base_address,
         stage="complete",
-        code="delivery_quote_ok",
-        provider="google_maps",
-        provider_status=str(matrix_status or "OK"),
+        code="delivery_quote_token",
+        provider="quote_token",
+    )
+
+
+@dataclass
+class DeliveryEstimate:
+    postal_code: str
+    min_miles: float
+    max_miles: float
+    min_fee_cents: Optional[int]
+    max_fee_cents: Optional[int]
+
+
+async def estimate_delivery_for_postal_code(postal_code: str) -> DeliveryEstimate | None:
+    """Fee range for a ZIP from the bundled centroid table, without Google calls
+    for the customer's address. None when the ZIP or table is unavailable."""
+    api_key = settings.google_maps_api_key
+    if not api_key:
+        return None
+    result = await _estimate_from_postal_code(postal_code, api_key)
+    if result is None:
+        return None
+    normalized, estimate = result
+    return DeliveryEstimate(
+        postal_code=normalized,
+        min_miles=round(estimate.min_miles * 10) / 10,
+        max_miles=round(estimate.max_miles * 10) / 10,
+        min_fee_cents=estimate.min_fee_cents,
+        max_fee_cents=estimate.max_fee_cents,
     )
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+import re
+import threading
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.delivery_geocode_cache import DeliveryGeocodeCache
+
+
+DELIVERY_CACHE_MEMORY_MAX_ENTRIES = 2048
+DELIVERY_CACHE_PURGE_BATCH_SIZE = 1000
+
+# Failures that depend only on the address itself. Transport and quota errors
+# are never cached so a Google outage cannot poison the cache.
+CACHEABLE_FAILURE_CODES = frozenset(
+    {
+        "address_not_found",
+        "address_too_vague",
+        "address_missing_street_number",
+        "address_missing_street_name",
+        "distance_matrix_element_invalid",
+    }
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_COMMA_RE = re.compile(r"\s*,\s*")
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDeliveryLookup:
+    address_key: str
+    base_address: str
+    expires_at: datetime
+    formatted_address: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    miles: Optional[float] = None
+    distance_text: Optional[str] = None
+    provider_status: Optional[str] = None
+    error_stage: Optional[str] = None
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+
+    @property
+    def is_negative(self) -> bool:
+        return self.error_code is not None
+
+    def is_fresh(self, now: datetime | None = None) -> bool:
+        return self.expires_at > (now or datetime.now(timezone.utc))
+
+
+_memory: OrderedDict[str, CachedDeliveryLookup] = OrderedDict()
+_memory_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "negative_hits": 0,
+    "stale_hits": 0,
+    "stores": 0,
+    "db_errors": 0,
+}
+
+
+def normalize_delivery_address(raw_address: str) -> str:
+    value = _WHITESPACE_RE.sub(" ", raw_address.strip().casefold())
+    value = _COMMA_RE.sub(", ", value.replace(".", ""))
+    return value.strip(" ,")
+
+
+def delivery_cache_expiry(*, negative: bool) -> datetime:
+    ttl = (
+        settings.delivery_cache_negative_ttl_seconds
+        if negative
+        else settings.delivery_cache_ttl_seconds
+    )
+    return datetime.now(timezone.utc) + timedelta(seconds=max(ttl, 0))
+
+
+def delivery_cache_stats() -> dict[str, int]:
+    with _memory_lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_memory)
+    return stats
+
+
+def clear_delivery_cache() -> None:
+    with _memory_lock:
+        _memory.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _count(name: str) -> None:
+    with _memory_lock:
+        _stats[name] += 1
+
+
+def _remember(entry: CachedDeliveryLookup) -> None:
+    with _memory_lock:
+        _memory[entry.address_key] = entry
+        _memory.move_to_end(entry.address_key)
+        while len(_memory) > DELIVERY_CACHE_MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _recall(address_key: str) -> CachedDeliveryLookup | None:
+    with _memory_lock:
+        entry = _memory.get(address_key)
+        if entry is None:
+            return None
+        if not entry.is_fresh():
+            del _memory[address_key]
+            return None
+        _memory.move_to_end(address_key)
+        return entry
+
+
+def _as_aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; Postgres keeps the zone.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _load_from_db(address_key: str) -> CachedDeliveryLookup | None:
+    db = SessionLocal()
+    try:
+        row = db.get(DeliveryGeocodeCache, address_key)
+        if row is None:
+            return None
+        return CachedDeliveryLookup(
+            address_key=row.address_key,
+            base_address=row.base_address,
+            expires_at=_as_aware(row.expires_at),
+            formatted_address=row.formatted_address,
+            lat=row.lat,
+            lng=row.lng,
+            miles=row.miles,
+            distance_text=row.distance_text,
+            provider_status=row.provider_status,
+            error_stage=row.error_stage,
+            error_code=row.error_code,
+            error_message=row.error_message,
+        )
+    finally:
+        db.close()
+
+
+def _save_to_db(entry: CachedDeliveryLookup) -> None:
+    db = SessionLocal()
+    try:
+        row = db.get(DeliveryGeocodeCache, entry.address_key)
+        if row is None:
+            row = DeliveryGeocodeCache(address_key=entry.address_key)
+            db.add(row)
+        row.base_address = entry.base_address
+        row.formatted_address = entry.formatted_address
+        row.lat = entry.lat
+        row.lng = entry.lng
+        row.miles = entry.miles
+        row.distance_text = entry.distance_text
+        row.provider_status = entry.provider_status
+        row.error_stage = entry.error_stage
+        row.error_code = entry.error_code
+        row.error_message = entry.error_message
+        row.expires_at = entry.expires_at
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_cached_delivery_lookup(
+    address_key: str, base_address: str, *, allow_stale: bool = False
+) -> CachedDeliveryLookup | None:
+    """Return a fresh cached lookup, checking memory first and then Postgres.
+
+    An entry computed from a different studio address keeps its geocode but
+    loses its miles, so only the distance matrix call is repeated.
+    ``allow_stale`` also returns expired rows, for degraded-mode quoting while
+    Google Maps is unavailable.
+    """
+    entry = _recall(address_key)
+    if entry is not None:
+        _count("memory_hits")
+    else:
+        try:
+            entry = await asyncio.to_thread(_load_from_db, address_key)
+        except SQLAlchemyError:
+            _count("db_errors")
+            entry = None
+        if entry is None:
+            _count("misses")
+            return None
+        if not entry.is_fresh():
+            if not allow_stale:
+                _count("misses")
+                return None
+            _count("stale_hits")
+        else:
+            _count("db_hits")
+            _remember(entry)
+
+    if entry.is_negative:
+        _count("negative_hits")
+    elif entry.base_address != base_address and entry.miles is not None:
+        entry = replace(entry, base_address=base_address, miles=None, distance_text=None)
+    return entry
+
+
+def purge_expired_delivery_lookups(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    limit: int = DELIVERY_CACHE_PURGE_BATCH_SIZE,
+) -> int:
+    """Delete up to ``limit`` rows that expired more than the stale retention ago.
+
+    Recently expired rows stay for degraded-mode quoting (``allow_stale``).
+    The batch is picked through the expiresAt index so each call stays cheap.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(
+        seconds=max(settings.delivery_cache_stale_retention_seconds, 0)
+    )
+    expired_keys = (
+        select(DeliveryGeocodeCache.address_key)
+        .where(DeliveryGeocodeCache.expires_at < cutoff)
+        .order_by(DeliveryGeocodeCache.expires_at)
+        .limit(max(1, limit))
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(DeliveryGeocodeCache)
+        .where(DeliveryGeocodeCache.address_key.in_(expired_keys))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+async def store_delivery_lookup(entry: CachedDeliveryLookup) -> None:
+    _remember(entry)
+    _count("stores")
+    try:
+        await asyncio.to_thread(_save_to_db, entry)
+    except SQLAlchemyError:
+        _count("db_errors")
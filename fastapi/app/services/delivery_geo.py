@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+import re
+from functools import lru_cache
+from math import asin, cos, radians, sin, sqrt
+from pathlib import Path
+from typing import Callable, Optional
+
+
+EARTH_RADIUS_MILES = 3958.7613
+
+# Driving distance is never shorter than the great-circle distance. Suburban
+# detour indexes sit around 1.2-1.4; 1.6 covers most river and highway detours
+# and bounds the fee ranges shown for estimates.
+ROAD_FACTOR_MIN = 1.0
+ROAD_FACTOR_MAX = 1.6
+ROAD_FACTOR_TYPICAL = 1.25
+
+# No fixed factor bounds every detour around water or hills, so skipping the
+# distance matrix uses wider bounds plus a margin: in practice only addresses
+# well inside the first tier or beyond the radius in a straight line qualify.
+LOCAL_DECISION_ROAD_FACTOR = 2.0
+LOCAL_DECISION_MARGIN_MILES = 1.0
+
+# A ZIP centroid can sit a few miles from any given street in that ZIP.
+ZIP_CENTROID_SLACK_MILES = 3.0
+
+_POSTAL_CODE_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+@dataclass(frozen=True, slots=True)
+class RoadDistanceEstimate:
+    straight_miles: float
+    min_miles: float
+    max_miles: float
+    min_fee_cents: Optional[int]
+    max_fee_cents: Optional[int]
+    # True when even the conservative decision bounds land in one tier.
+    decided: bool = False
+
+    @property
+    def estimated_miles(self) -> float:
+        typical = self.straight_miles * ROAD_FACTOR_TYPICAL
+        return round(min(max(typical, self.min_miles), self.max_miles) * 100) / 100
+
+
+def haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = radians(lat1), radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = radians(lng2 - lng1)
+    a = sin(d_phi / 2) ** 2 + cos(phi1) * cos(phi2) * sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * asin(min(1.0, sqrt(a)))
+
+
+def estimate_road_distance(
+    straight_miles: float,
+    fee_for_miles: Callable[[float], Optional[int]],
+    *,
+    slack_miles: float = 0.0,
+) -> RoadDistanceEstimate:
+    min_miles = max(0.0, straight_miles - slack_miles) * ROAD_FACTOR_MIN
+    max_miles = (straight_miles + slack_miles) * ROAD_FACTOR_MAX
+    decision_min = max(0.0, straight_miles - slack_miles - LOCAL_DECISION_MARGIN_MILES)
+    decision_max = (
+        straight_miles + slack_miles
+    ) * LOCAL_DECISION_ROAD_FACTOR + LOCAL_DECISION_MARGIN_MILES
+    return RoadDistanceEstimate(
+        straight_miles=straight_miles,
+        min_miles=min_miles,
+        max_miles=max_miles,
+        min_fee_cents=fee_for_miles(min_miles),
+        max_fee_cents=fee_for_miles(max_miles),
+        decided=fee_for_miles(decision_min) == fee_for_miles(decision_max),
+    )
+
+
+def normalize_postal_code(value: str) -> str:
+    digits = "".join(char for char in (value or "") if char.isdigit())
+    return digits[:5] if len(digits) >= 5 else ""
+
+
+def extract_postal_code(address: str) -> str:
+    """Last ZIP-looking token, so five-digit street numbers are skipped."""
+    matches = _POSTAL_CODE_RE.findall(address or "")
+    return matches[-1] if matches else ""
+
+
+@lru_cache(maxsize=4)
+def load_zip_centroids(path: str) -> dict[str, tuple[float, float]]:
+    """Read a ``zip,lat,lng`` CSV; a missing file yields an empty table."""
+    file_path = Path(path)
+    if not file_path.is_file():
+        return {}
+    centroids: dict[str, tuple[float, float]] = {}
+    with file_path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            postal_code = normalize_postal_code(row.get("zip") or "")
+            try:
+                lat = float(row.get("lat") or "")
+                lng = float(row.get("lng") or "")
+            except ValueError:
+                continue
+            if postal_code:
+                centroids[postal_code] = (lat, lng)
+    return centroids
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+import json
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+
+
+DELIVERY_TIME_WINDOWS = ("8:30 AM - 12 PM", "12 PM - 4 PM", "4 PM - 8 PM")
+DELIVERY_SCHEDULE_BACKFILL_BATCH_SIZE = 500
+
+_IDEAL_TIME_FORMATS = ("%I:%M%p", "%H:%M")
+
+
+@dataclass(frozen=True, slots=True)
+class DeliverySchedule:
+    date: date
+    window: Optional[str] = None
+    ideal_time: Optional[time] = None
+
+
+def parse_ideal_time(value: str) -> time | None:
+    normalized = value.strip().upper().replace(" ", "")
+    for time_format in _IDEAL_TIME_FORMATS:
+        try:
+            return datetime.strptime(normalized, time_format).time()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_delivery_date_time(value: str | None) -> DeliverySchedule | None:
+    """Parse the stored ``deliveryDateTime`` string.
+
+    Checkout sends ``{"date", "timeWindow", "idealTime"}`` JSON; older orders
+    hold a bare ISO datetime. Only the shape is checked here, not whether the
+    date is still bookable.
+    """
+    trimmed = (value or "").strip()
+    if not trimmed:
+        return None
+
+    try:
+        parsed: Any = json.loads(trimmed)
+    except json.JSONDecodeError:
+        if "T" not in trimmed:
+            return None
+        try:
+            moment = datetime.fromisoformat(trimmed)
+        except ValueError:
+            return None
+        return DeliverySchedule(date=moment.date(), ideal_time=moment.time())
+
+    if not isinstance(parsed, dict):
+        return None
+    raw_date = parsed.get("date")
+    raw_window = parsed.get("timeWindow")
+    raw_ideal_time = parsed.get("idealTime")
+    try:
+        delivery_date = date.fromisoformat(raw_date.strip() if isinstance(raw_date, str) else "")
+    except ValueError:
+        return None
+    window = raw_window.strip() if isinstance(raw_window, str) else ""
+    ideal_time = raw_ideal_time.strip() if isinstance(raw_ideal_time, str) else ""
+    return DeliverySchedule(
+        date=delivery_date,
+        window=window or None,
+        ideal_time=parse_ideal_time(ideal_time) if ideal_time else None,
+    )
+
+
+def delivery_schedule_values(value: str | None) -> dict[str, object]:
+    schedule = parse_delivery_date_time(value)
+    return {
+        "delivery_date": schedule.date if schedule else None,
+        "delivery_window": schedule.window if schedule else None,
+        "delivery_ideal_time": schedule.ideal_time if schedule else None,
+    }
+
+
+def backfill_delivery_schedule(
+    db: Session, *, batch_size: int = DELIVERY_SCHEDULE_BACKFILL_BATCH_SIZE
+) -> int:
+    """Fill the typed schedule columns for orders created before they existed.
+
+    Walks the table in primary-key order one batch at a time, committing each
+    batch, so it can run against a live database and be re-run safely.
+    Returns the number of orders updated.
+    """
+    safe_batch_size = max(batch_size, 1)
+    last_id = ""
+    updated = 0
+    while True:
+        rows = db.execute(
+            select(Order.id, Order.delivery_date_time)
+            .where(
+                Order.id > last_id,
+                Order.delivery_date.is_(None),
+                Order.delivery_date_time.is_not(None),
+            )
+            .order_by(Order.id.asc())
+            .limit(safe_batch_size)
+        ).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+        values = [
+            {"id": row.id, **delivery_schedule_values(row.delivery_date_time)}
+            for row in rows
+        ]
+        values = [item for item in values if item["delivery_date"] is not None]
+        if values:
+            db.execute(update(Order), values)
+            updated += len(values)
+        db.commit()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.critical_logging import log_critical_event
+from app.models.delivery_slot import DeliverySlot
+from app.models.enums import OrderStatus
+from app.models.order import Order
+from app.services.delivery_schedule import DELIVERY_TIME_WINDOWS
+
+
+DELIVERY_SLOT_AVAILABILITY_TTL_SECONDS = 5.0
+DELIVERY_SLOT_AVAILABILITY_MAX_DAYS = 35
+DELIVERY_SLOT_AVAILABILITY_CACHE_MAX_ENTRIES = 256
+SLOT_RELEASING_STATUSES = (OrderStatus.FAILED, OrderStatus.CANCELED)
+
+
+@dataclass(frozen=True, slots=True)
+class DeliverySlotAvailability:
+    delivery_date: date
+    window: str
+    capacity: Optional[int]
+    reserved: int
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.reserved, 0)
+
+    @property
+    def available(self) -> bool:
+        return self.capacity is None or self.reserved < self.capacity
+
+
+_availability_cache: dict[tuple[date, int], tuple[float, list[DeliverySlotAvailability]]] = {}
+_availability_lock = threading.Lock()
+
+
+def clear_delivery_slot_availability_cache() -> None:
+    with _availability_lock:
+        _availability_cache.clear()
+
+
+def _insert_slot_if_missing(db: Session, delivery_date: date, window: str) -> None:
+    db.execute(
+        postgresql.insert(DeliverySlot)
+        .values(
+            delivery_date=delivery_date,
+            window=window,
+            capacity=settings.delivery_slot_capacity,
+            reserved=0,
+        )
+        .on_conflict_do_nothing(index_elements=["deliveryDate", "window"])
+    )
+
+
+def reserve_delivery_slot(db: Session, delivery_date: date, window: str) -> bool:
+    """Take one place in a delivery window inside the caller's transaction.
+
+    A single conditional UPDATE does the check and the increment, so
+    concurrent checkouts only contend on the one slot row until they commit.
+    A missing row is created with the default capacity first; the UPDATE is
+    then retried so a checkout that lost the insert race still sees the row.
+    """
+    if window not in DELIVERY_TIME_WINDOWS:
+        return False
+    statement = (
+        update(DeliverySlot)
+        .where(
+            DeliverySlot.delivery_date == delivery_date,
+            DeliverySlot.window == window,
+            or_(DeliverySlot.capacity.is_(None), DeliverySlot.reserved < DeliverySlot.capacity),
+        )
+        .values(reserved=DeliverySlot.reserved + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(statement).rowcount:
+        return True
+    _insert_slot_if_missing(db, delivery_date, window)
+    return bool(db.execute(statement).rowcount)
+
+
+def _adjust_slot_counts(
+    db: Session, order_ids: Iterable[str], *, release: bool
+) -> int:
+    ids = sorted({order_id for order_id in order_ids if order_id})
+    if not ids:
+        return 0
+    statuses = SLOT_RELEASING_STATUSES if release else (OrderStatus.PAID,)
+    try:
+        changed = db.execute(
+            update(Order)
+            .where(
+                Order.id.in_(ids),
+                Order.delivery_slot_reserved.is_(release),
+                Order.status.in_(statuses),
+                Order.delivery_date.is_not(None),
+                Order.delivery_window.is_not(None),
+            )
+            .values(delivery_slot_reserved=not release)
+            .returning(Order.delivery_date, Order.delivery_window)
+            .execution_options(synchronize_session=False)
+        ).all()
+        counts = Counter((row.delivery_date, row.delivery_window) for row in changed)
+        for (delivery_date, window), count in sorted(counts.items()):
+            if release:
+                reserved = case(
+                    (DeliverySlot.reserved > count, DeliverySlot.reserved - count),
+                    else_=0,
+                )
+            else:
+                _insert_slot_if_missing(db, delivery_date, window)
+                reserved = DeliverySlot.reserved + count
+            db.execute(
+                update(DeliverySlot)
+                .where(
+                    DeliverySlot.delivery_date == delivery_date,
+                    DeliverySlot.window == window,
+                )
+                .values(reserved=reserved)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        log_critical_event(
+            domain="cart",
+            event="delivery_slot_release_failed" if release else "delivery_slot_reclaim_failed",
+            message="Failed to update delivery slot reservations.",
+            context={"order_count": len(ids)},
+            exc=exc,
+        )
+        return 0
+    return len(changed)
+
+
+def release_delivery_slots(db: Session, order_ids: Iterable[str]) -> int:
+    """Give back the slots held by FAILED/CANCELED orders among ``order_ids``.
+
+    Safe to call for any order, any number of times: the reservation flag is
+    cleared with a conditional UPDATE, and only the rows that flipped are
+    subtracted from their slot. Commits on its own; errors are logged and
+    swallowed so status changes never fail because of slot bookkeeping.
+    """
+    return _adjust_slot_counts(db, order_ids, release=True)
+
+
+def reclaim_delivery_slots(db: Session, order_ids: Iterable[str]) -> int:
+    """Count PAID orders that hold no slot, e.g. a late payment that revived
+    an order after its slot was released. Capacity is not checked: the
+    customer has already paid for that window."""
+    return _adjust_slot_counts(db, order_ids, release=False)
+
+
+def set_delivery_slot_capacity(
+    db: Session, delivery_date: date, window: str, capacity: Optional[int]
+) -> DeliverySlotAvailability:
+    _insert_slot_if_missing(db, delivery_date, window)
+    db.execute(
+        update(DeliverySlot)
+        .where(DeliverySlot.delivery_date == delivery_date, DeliverySlot.window == window)
+        .values(capacity=capacity)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    clear_delivery_slot_availability_cache()
+    reserved = db.execute(
+        select(DeliverySlot.reserved).where(
+            DeliverySlot.delivery_date == delivery_date, DeliverySlot.window == window
+        )
+    ).scalar_one()
+    return DeliverySlotAvailability(
+        delivery_date=delivery_date, window=window, capacity=capacity, reserved=reserved
+    )
+
+
+def get_delivery_slot_availability(
+    db: Session, start_date: date, days: int
+) -> list[DeliverySlotAvailability]:
+    """Availability for every window over ``days`` days, cached briefly.
+
+    The date picker polls this; a few seconds of staleness is fine because
+    checkout re-checks capacity atomically when it reserves.
+    """
+    safe_days = min(max(days, 1), DELIVERY_SLOT_AVAILABILITY_MAX_DAYS)
+    key = (start_date, safe_days)
+    now = time.monotonic()
+    with _availability_lock:
+        cached = _availability_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+    end_date = start_date + timedelta(days=safe_days)
+    rows = db.execute(
+        select(
+            DeliverySlot.delivery_date,
+            DeliverySlot.window,
+            DeliverySlot.capacity,
+            DeliverySlot.reserved,
+        ).where(DeliverySlot.delivery_date >= start_date, DeliverySlot.delivery_date < end_date)
+    ).all()
+    stored = {(row.delivery_date, row.window): row for row in rows}
+    default_capacity = settings.delivery_slot_capacity
+    slots: list[DeliverySlotAvailability] = []
+    for offset in range(safe_days):
+        delivery_date = start_date + timedelta(days=offset)
+        for window in DELIVERY_TIME_WINDOWS:
+            row = stored.get((delivery_date, window))
+            slots.append(
+                DeliverySlotAvailability(
+                    delivery_date=delivery_date,
+                    window=window,
+                    capacity=row.capacity if row is not None else default_capacity,
+                    reserved=row.reserved if row is not None else 0,
+                )
+            )
+
+    with _availability_lock:
+        if len(_availability_cache) >= DELIVERY_SLOT_AVAILABILITY_CACHE_MAX_ENTRIES:
+            _availability_cache.clear()
+        _availability_cache[key] = (now + DELIVERY_SLOT_AVAILABILITY_TTL_SECONDS, slots)
+    return slots
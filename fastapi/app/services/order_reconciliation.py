@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from collections import deque
+import threading
+from typing import Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.critical_logging import log_critical_event
+from app.core.database import SessionLocal
+from app.models.enums import OrderStatus
+
+_STAT_FIELDS = ("enqueued", "dropped", "processed", "updated", "errors")
+
+
+class OrderReconciliationQueue:
+    """Hands stale PENDING orders from read paths to a background worker.
+
+    ``enqueue`` only records order ids (deduplicated, bounded by
+    ``max_size``), so GET handlers never wait on Stripe or PayPal. A single
+    daemon thread, started with the app, drains the queue in batches of
+    ``batch_size`` and calls ``handler(db, order_ids)`` with its own session.
+    Without a running worker (scripts, tests) ids wait for ``run_once``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Session, list[str]], dict[str, OrderStatus]],
+        *,
+        max_size: int,
+        batch_size: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self._handler = handler
+        self.max_size = max(max_size, 1)
+        self.batch_size = max(batch_size, 1)
+        self._session_factory = session_factory
+        self._pending: deque[str] = deque()
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stats: dict[str, int] = dict.fromkeys(_STAT_FIELDS, 0)
+
+    def enqueue(self, order_ids: Iterable[str]) -> int:
+        added = 0
+        with self._lock:
+            for order_id in order_ids:
+                if order_id in self._queued:
+                    continue
+                if len(self._queued) >= self.max_size:
+                    self._stats["dropped"] += 1
+                    continue
+                self._queued.add(order_id)
+                self._pending.append(order_id)
+                added += 1
+            self._stats["enqueued"] += added
+        if added:
+            self._wake.set()
+        return added
+
+    def run_once(self) -> int:
+        """Reconcile one batch on the calling thread; returns its size."""
+        with self._lock:
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.batch_size, len(self._pending)))
+            ]
+        if not batch:
+            return 0
+        updated = 0
+        failed = False
+        try:
+            with self._session_factory() as db:
+                updated = len(self._handler(db, batch))
+        except Exception as exc:
+            failed = True
+            log_critical_event(
+                domain="payment",
+                event="order_reconcile_failed",
+                message="Background order reconciliation batch failed.",
+                context={"orders": len(batch)},
+                exc=exc,
+            )
+        finally:
+            # Ids stay "queued" while in flight so reads cannot enqueue them twice.
+            with self._lock:
+                self._queued.difference_update(batch)
+                self._stats["processed"] += len(batch)
+                self._stats["updated"] += updated
+                self._stats["errors"] += int(failed)
+        return len(batch)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="order-reconciliation", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "queued": len(self._queued)}
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while not self._stopping.is_set() and self.run_once():
+                pass
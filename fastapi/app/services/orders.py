@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from typing import Iterable
 
 import stripe
-from sqlalchemy import or_, select, update
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.config import settings
 from app.models.order import Order
 from app.models.enums import OrderStatus
+from app.services.order_reconciliation import OrderReconciliationQueue
 from app.services.payment_diagnostics import (
     apply_order_values,
     build_paypal_failure_diagnostics,
@@ -18,6 +21,7 @@ from app.services.payment_diagnostics import (
     payment_failure_values,
     payment_success_values,
 )
+from app.services.delivery_slots import release_delivery_slots
 from app.services.payment_events import record_payment_event_best_effort
 from app.services.paypal import (
     PayPalApiError,
@@ -26,12 +30,24 @@ from app.services.paypal import (
     paypal_get_order,
     paypal_is_configured,
 )
+from app.services.provider_gateway import (
+    paypal_gateway,
+    paypal_sync_gateway,
+    stripe_gateway,
+    stripe_sync_gateway,
+)
 from app.utils.admin_orders import get_day_range, get_week_range
 
 PENDING_EXPIRATION_HOURS = 24
 PENDING_WITHOUT_SESSION_EXPIRATION_MINUTES = 10
 STRIPE_CHECKOUT_SESSION_EXPIRATION_SECONDS = 30 * 60
 PAYPAL_CHECKOUT_EXPIRATION_SECONDS = 10 * 60
+# Embedding the PaymentIntent (and its charge, for failure diagnostics) lets a
+# complete-but-unpaid session resolve without a PaymentIntent.retrieve.
+STRIPE_SESSION_EXPAND = ["payment_intent", "payment_intent.latest_charge"]
+STRIPE_SESSION_LIST_PAGE_SIZE = 100
+# Sessions are created right after their order row; allow for clock skew.
+STRIPE_SESSION_LIST_SLACK_SECONDS = 5 * 60
 
 
 def _read_stripe_attr(obj: object, key: str) -> object:
@@ -49,13 +65,24 @@ def _provider_id(value: object) -> str | None:
     return str(nested_id) if nested_id else None
 
 
+def retrieve_stripe_session(session_id: str) -> object:
+    """Checkout Session with its PaymentIntent expanded; call via the gateway."""
+    return stripe.checkout.Session.retrieve(session_id, expand=STRIPE_SESSION_EXPAND)
+
+
+def stripe_session_payment_intent_id(session: object) -> str | None:
+    return _provider_id(_read_stripe_attr(session, "payment_intent"))
+
+
 def _extract_payment_intent_status(payment_intent: object) -> str | None:
     if not payment_intent:
         return None
 
     if isinstance(payment_intent, str):
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent)
+            intent = stripe_gateway.call(
+                "PaymentIntent.retrieve", stripe.PaymentIntent.retrieve, payment_intent
+            )
         except Exception:
             return None
         status = getattr(intent, "status", None)
@@ -164,6 +191,7 @@ def expire_pending_orders(db: Session) -> None:
         )
     )
     db.commit()
+    release_delivery_slots(db, expired_order_ids)
     for order_id in expired_order_ids:
         record_payment_event_best_effort(
             db,
@@ -179,21 +207,99 @@ def expire_pending_orders(db: Session) -> None:
         )
 
 
-def _sync_with_stripe(db: Session, orders: Iterable[Order]) -> dict[str, OrderStatus]:
-    if not settings.stripe_secret_key:
+def _mark_orders_synced(db: Session, orders: list[Order]) -> None:
+    synced_at = datetime.now(timezone.utc)
+    db.execute(
+        update(Order)
+        .where(Order.id.in_([order.id for order in orders]))
+        .values(synced_at=synced_at)
+    )
+    for order in orders:
+        order.synced_at = synced_at
+
+
+def _list_stripe_sessions(orders: list[Order]) -> dict[str, object]:
+    """Find the orders' Checkout Sessions by paging through Session.list.
+
+    The listing starts at the oldest order's creation time and stops once
+    every session is found, Stripe has no more pages, or
+    STRIPE_BULK_SYNC_MAX_PAGES pages were read.
+    """
+    wanted = {order.stripe_session_id for order in orders}
+    created = [order.created_at for order in orders if order.created_at]
+    if not created:
         return {}
+    oldest = min(
+        value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in created
+    )
+    params: dict[str, object] = {
+        "created": {"gte": int(oldest.timestamp()) - STRIPE_SESSION_LIST_SLACK_SECONDS},
+        "limit": STRIPE_SESSION_LIST_PAGE_SIZE,
+        "expand": [f"data.{path}" for path in STRIPE_SESSION_EXPAND],
+    }
+    found: dict[str, object] = {}
+    for _ in range(max(settings.stripe_bulk_sync_max_pages, 1)):
+        try:
+            page = stripe_sync_gateway.call(
+                "checkout.Session.list", stripe.checkout.Session.list, **params
+            )
+        except Exception:
+            break
+        data = _read_stripe_attr(page, "data") or []
+        for session in data:
+            session_id = _read_stripe_attr(session, "id")
+            if session_id in wanted:
+                found[session_id] = session
+        if len(found) == len(wanted) or not data or not _read_stripe_attr(page, "has_more"):
+            break
+        params["starting_after"] = _read_stripe_attr(data[-1], "id")
+    return found
+
+
+def _fetch_stripe_sessions(orders: list[Order]) -> dict[str, object]:
+    """Checkout Sessions for ``orders`` keyed by session id.
+
+    Large batches are listed in pages of 100 first; whatever the listing did
+    not cover (and every small batch) is retrieved one by one, concurrently.
+    """
+    sessions: dict[str, object] = {}
+    if len(orders) >= settings.stripe_bulk_sync_min_orders:
+        sessions = _list_stripe_sessions(orders)
+    remaining = [order for order in orders if order.stripe_session_id not in sessions]
+    retrieved = stripe_sync_gateway.call_many(
+        "checkout.Session.retrieve",
+        retrieve_stripe_session,
+        [(order.stripe_session_id,) for order in remaining],
+        max_parallel=settings.order_sync_concurrency,
+    )
+    for index, session in retrieved.items():
+        sessions[remaining[index].stripe_session_id] = session
+    return sessions
+
+
+def _sync_with_stripe(
+    db: Session, orders: Iterable[Order]
+) -> tuple[dict[str, OrderStatus], list[Order]]:
+    if not settings.stripe_secret_key:
+        return {}, []
     stripe.api_key = settings.stripe_secret_key
     updates: dict[str, OrderStatus] = {}
     sync_events: list[dict[str, object]] = []
     now_seconds = int(datetime.now(timezone.utc).timestamp())
 
-    for order in orders:
-        if order.status != OrderStatus.PENDING or not order.stripe_session_id:
-            continue
-        try:
-            session = stripe.checkout.Session.retrieve(order.stripe_session_id)
-        except Exception:
+    candidates = [
+        order
+        for order in orders
+        if order.status == OrderStatus.PENDING and order.stripe_session_id
+    ]
+    sessions = _fetch_stripe_sessions(candidates)
+    synced: list[Order] = []
+    rows: list[dict[str, object]] = []
+    for order in candidates:
+        session = sessions.get(order.stripe_session_id)
+        if session is None:
             continue
+        synced.append(order)
 
         next_status = resolve_order_status_from_session(
             order, session, now_seconds=now_seconds
@@ -206,29 +312,37 @@ def _sync_with_stripe(db: Session, orders: Iterable[Order]) -> dict[str, OrderSt
                     build_stripe_session_failure_diagnostics(session)
                 )
             )
-            db.execute(
-                update(Order)
-                .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
-                .values(**values)
-            )
-            apply_order_values(order, values)
+            rows.append({"id": order.id, **values})
+            # Already written by the batched UPDATE below; don't flush it again.
+            for key, value in values.items():
+                set_committed_value(order, key, value)
             updates[order.id] = next_status
             sync_events.append(
                 {
                     "order_id": order.id,
                     "next_status": next_status,
                     "stripe_session_id": order.stripe_session_id,
-                    "payment_intent_id": _provider_id(
-                        _read_stripe_attr(session, "payment_intent")
-                    ),
+                    "payment_intent_id": stripe_session_payment_intent_id(session),
                     "session_status": _read_stripe_attr(session, "status"),
                     "payment_status": _read_stripe_attr(session, "payment_status"),
                     "expires_at": _read_stripe_attr(session, "expires_at"),
                 }
             )
 
-    if updates:
+    if rows:
+        # One executemany UPDATE by primary key; the status guard keeps a
+        # webhook that already closed the order from being overwritten.
+        db.execute(
+            update(Order)
+            .where(Order.status == OrderStatus.PENDING)
+            .execution_options(synchronize_session=None),
+            rows,
+        )
+    if synced:
+        _mark_orders_synced(db, synced)
         db.commit()
+    if updates:
+        release_delivery_slots(db, updates)
         for item in sync_events:
             next_status = item["next_status"]
             assert isinstance(next_status, OrderStatus)
@@ -252,7 +366,7 @@ def _sync_with_stripe(db: Session, orders: Iterable[Order]) -> dict[str, OrderSt
                     "expires_at": item.get("expires_at"),
                 },
             )
-    return updates
+    return updates, synced
 
 
 def resolve_order_status_from_paypal_order(
@@ -292,32 +406,87 @@ def resolve_order_status_from_paypal_order(
     return None, None
 
 
-def _sync_with_paypal(db: Session, orders: Iterable[Order]) -> dict[str, OrderStatus]:
+def _load_paypal_order_for_sync(paypal_order_id: str) -> dict | None:
+    """Fetch a PayPal order, capturing it first if the buyer approved it.
+
+    Returns None when the order cannot be resolved right now; a 4xx capture
+    error (already captured, declined) falls back to a fresh read.
+    """
+    try:
+        payload = paypal_get_order(paypal_order_id)
+    except PayPalApiError:
+        return None
+
+    status = (payload.get("status") or "").upper()
+    if status == "APPROVED":
+        try:
+            payload = paypal_capture_order(paypal_order_id)
+        except PayPalApiError as exc:
+            if exc.status_code is None or exc.status_code >= 500:
+                return None
+            try:
+                payload = paypal_get_order(paypal_order_id)
+            except PayPalApiError:
+                return None
+    return payload
+
+
+def _fetch_paypal_order_for_sync(paypal_order_id: str) -> dict | None:
+    try:
+        return paypal_gateway.call("order_sync", _load_paypal_order_for_sync, paypal_order_id)
+    except PayPalApiError:
+        return None
+
+
+async def fetch_paypal_order_for_sync(order: Order) -> dict | None:
+    """Async counterpart of the PayPal read in ``sync_order_with_paypal``."""
+    try:
+        return await paypal_gateway.acall(
+            "order_sync", _load_paypal_order_for_sync, order.paypal_order_id
+        )
+    except PayPalApiError:
+        return None
+
+
+async def fetch_stripe_session_for_sync(order: Order) -> object | None:
+    """Async counterpart of the Stripe read in ``sync_order_with_stripe``."""
+    stripe.api_key = settings.stripe_secret_key
+    try:
+        return await stripe_gateway.acall(
+            "checkout.Session.retrieve",
+            retrieve_stripe_session,
+            order.stripe_session_id,
+        )
+    except Exception:
+        return None
+
+
+def _sync_with_paypal(
+    db: Session, orders: Iterable[Order]
+) -> tuple[dict[str, OrderStatus], list[Order]]:
     if not paypal_is_configured():
-        return {}
+        return {}, []
 
     updates: dict[str, OrderStatus] = {}
     sync_events: list[dict[str, object]] = []
 
-    for order in orders:
-        if order.status != OrderStatus.PENDING or not order.paypal_order_id:
-            continue
-        try:
-            payload = paypal_get_order(order.paypal_order_id)
-        except PayPalApiError:
+    candidates = [
+        order
+        for order in orders
+        if order.status == OrderStatus.PENDING and order.paypal_order_id
+    ]
+    payloads = paypal_sync_gateway.call_many(
+        "order_sync",
+        _load_paypal_order_for_sync,
+        [(order.paypal_order_id,) for order in candidates],
+        max_parallel=settings.order_sync_concurrency,
+    )
+    synced: list[Order] = []
+    for index, order in enumerate(candidates):
+        payload = payloads.get(index)
+        if payload is None:
             continue
-
-        status = (payload.get("status") or "").upper()
-        if status == "APPROVED":
-            try:
-                payload = paypal_capture_order(order.paypal_order_id)
-            except PayPalApiError as exc:
-                if exc.status_code is None or exc.status_code >= 500:
-                    continue
-                try:
-                    payload = paypal_get_order(order.paypal_order_id)
-                except PayPalApiError:
-                    continue
+        synced.append(order)
 
         next_status, capture_id = resolve_order_status_from_paypal_order(order, payload)
         if next_status and next_status != order.status:
@@ -348,8 +517,11 @@ def _sync_with_paypal(db: Session, orders: Iterable[Order]) -> dict[str, OrderSt
                 }
             )
 
-    if updates:
+    if synced:
+        _mark_orders_synced(db, synced)
         db.commit()
+    if updates:
+        release_delivery_slots(db, updates)
         for item in sync_events:
             next_status = item["next_status"]
             assert isinstance(next_status, OrderStatus)
@@ -371,10 +543,18 @@ def _sync_with_paypal(db: Session, orders: Iterable[Order]) -> dict[str, OrderSt
                     "paypal_status": item.get("paypal_status"),
                 },
             )
-    return updates
+    return updates, synced
 
 
-def sync_order_with_stripe(db: Session, order: Order) -> OrderStatus | None:
+def sync_order_with_stripe(
+    db: Session, order: Order, session: object | None = None
+) -> OrderStatus | None:
+    """Reconcile one PENDING order with its Checkout Session.
+
+    Async callers pass a ``session`` already fetched with
+    ``fetch_stripe_session_for_sync`` so the provider read stays off the
+    event loop; otherwise it is fetched here through the Stripe gateway.
+    """
     if (
         order.status != OrderStatus.PENDING
         or not order.stripe_session_id
@@ -382,20 +562,28 @@ def sync_order_with_stripe(db: Session, order: Order) -> OrderStatus | None:
     ):
         return None
 
-    stripe.api_key = settings.stripe_secret_key
-    try:
-        session = stripe.checkout.Session.retrieve(order.stripe_session_id)
-    except Exception:
-        return None
+    if session is None:
+        stripe.api_key = settings.stripe_secret_key
+        try:
+            session = stripe_gateway.call(
+                "checkout.Session.retrieve",
+                retrieve_stripe_session,
+                order.stripe_session_id,
+            )
+        except Exception:
+            return None
 
     next_status = resolve_order_status_from_session(order, session)
     if not next_status or next_status == order.status:
         return None
 
     values = (
-        payment_success_values()
+        payment_success_values(synced_at=datetime.now(timezone.utc))
         if next_status == OrderStatus.PAID
-        else payment_failure_values(build_stripe_session_failure_diagnostics(session))
+        else payment_failure_values(
+            build_stripe_session_failure_diagnostics(session),
+            synced_at=datetime.now(timezone.utc),
+        )
     )
     db.execute(
         update(Order)
@@ -404,6 +592,7 @@ def sync_order_with_stripe(db: Session, order: Order) -> OrderStatus | None:
     )
     db.commit()
     apply_order_values(order, values)
+    release_delivery_slots(db, [order.id])
     record_payment_event_best_effort(
         db,
         order_id=order.id,
@@ -416,7 +605,7 @@ def sync_order_with_stripe(db: Session, order: Order) -> OrderStatus | None:
         source="server_sync",
         message="Server-side Stripe sync resolved the order status.",
         stripe_session_id=order.stripe_session_id,
-        payment_intent_id=_provider_id(_read_stripe_attr(session, "payment_intent")),
+        payment_intent_id=stripe_session_payment_intent_id(session),
         context={
             "order_status_after": next_status.value,
             "session_status": _read_stripe_attr(session, "status"),
@@ -427,7 +616,11 @@ def sync_order_with_stripe(db: Session, order: Order) -> OrderStatus | None:
     return next_status
 
 
-def sync_order_with_paypal(db: Session, order: Order) -> OrderStatus | None:
+def sync_order_with_paypal(
+    db: Session, order: Order, payload: dict | None = None
+) -> OrderStatus | None:
+    """PayPal twin of ``sync_order_with_stripe``; ``payload`` comes from
+    ``fetch_paypal_order_for_sync`` on async paths."""
     if (
         order.status != OrderStatus.PENDING
         or not order.paypal_order_id
@@ -435,22 +628,10 @@ def sync_order_with_paypal(db: Session, order: Order) -> OrderStatus | None:
     ):
         return None
 
-    try:
-        payload = paypal_get_order(order.paypal_order_id)
-    except PayPalApiError:
-        return None
-
-    status = (payload.get("status") or "").upper()
-    if status == "APPROVED":
-        try:
-            payload = paypal_capture_order(order.paypal_order_id)
-        except PayPalApiError as exc:
-            if exc.status_code is None or exc.status_code >= 500:
-                return None
-            try:
-                payload = paypal_get_order(order.paypal_order_id)
-            except PayPalApiError:
-                return None
+    if payload is None:
+        payload = _fetch_paypal_order_for_sync(order.paypal_order_id)
+        if payload is None:
+            return None
 
     next_status, capture_id = resolve_order_status_from_paypal_order(order, payload)
     if not next_status or next_status == order.status:
@@ -459,11 +640,13 @@ def sync_order_with_paypal(db: Session, order: Order) -> OrderStatus | None:
     values = (
         payment_success_values(
             paypal_capture_id=capture_id or order.paypal_capture_id,
+            synced_at=datetime.now(timezone.utc),
         )
         if next_status == OrderStatus.PAID
         else payment_failure_values(
             build_paypal_failure_diagnostics(payload),
             paypal_capture_id=capture_id or order.paypal_capture_id,
+            synced_at=datetime.now(timezone.utc),
         )
     )
     db.execute(
@@ -473,6 +656,7 @@ def sync_order_with_paypal(db: Session, order: Order) -> OrderStatus | None:
     )
     db.commit()
     apply_order_values(order, values)
+    release_delivery_slots(db, [order.id])
     record_payment_event_best_effort(
         db,
         order_id=order.id,
@@ -494,41 +678,166 @@ def sync_order_with_paypal(db: Session, order: Order) -> OrderStatus | None:
     return next_status
 
 
-def sync_pending_orders(db: Session, *, limit: int = 200) -> dict[str, OrderStatus]:
+@dataclass(slots=True)
+class OrderSyncResult:
+    checked: int = 0
+    errors: int = 0
+    lag_seconds: float = 0.0
+    updates: dict[str, OrderStatus] = field(default_factory=dict)
+
+
+def _next_sync_delay(attempts: int) -> timedelta:
+    base = max(settings.order_sync_backoff_base_seconds, 1)
+    delay = base * 2 ** min(max(attempts - 1, 0), 16)
+    return timedelta(seconds=min(delay, max(settings.order_sync_backoff_max_seconds, base)))
+
+
+def _sync_lag_seconds(order: Order, now: datetime) -> float:
+    due_at = order.next_sync_at or order.created_at
+    if due_at is None:
+        return 0.0
+    if due_at.tzinfo is None:
+        due_at = due_at.replace(tzinfo=timezone.utc)
+    return max((now - due_at).total_seconds(), 0.0)
+
+
+def _sync_orders_with_providers(db: Session, orders: list[Order]) -> OrderSyncResult:
+    """Re-read ``orders`` from Stripe/PayPal and back off the ones still open.
+
+    Every PENDING order with a provider id counts as checked; one the provider
+    did not answer for counts as an error. Orders that stay PENDING get
+    ``syncAttempts`` bumped and ``nextSyncAt`` pushed out exponentially.
+    """
+    now = datetime.now(timezone.utc)
+    candidates = [
+        order
+        for order in orders
+        if order.status == OrderStatus.PENDING
+        and (order.stripe_session_id or order.paypal_order_id)
+    ]
+    result = OrderSyncResult(
+        checked=len(candidates),
+        lag_seconds=max((_sync_lag_seconds(order, now) for order in candidates), default=0.0),
+    )
+    if not candidates:
+        return result
+
+    # Read before the provider passes commit (and expire) the instances.
+    snapshot = [(order, order.id, order.sync_attempts or 0) for order in candidates]
+    stripe_updates, stripe_synced = _sync_with_stripe(db, candidates)
+    paypal_updates, paypal_synced = _sync_with_paypal(db, candidates)
+    result.updates = {**stripe_updates, **paypal_updates}
+    answered = {id(order) for order in (*stripe_synced, *paypal_synced)}
+    result.errors = sum(1 for order in candidates if id(order) not in answered)
+
+    for order, order_id, attempts in snapshot:
+        if order_id in result.updates:
+            continue
+        order.sync_attempts = attempts + 1
+        order.next_sync_at = now + _next_sync_delay(attempts + 1)
+    db.commit()
+    return result
+
+
+def stale_pending_order_ids(orders: Iterable[Order]) -> list[str]:
+    """PENDING orders whose status was not confirmed with a provider recently."""
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.order_reconcile_stale_seconds
+    )
+    stale: list[str] = []
+    for order in orders:
+        if order.status != OrderStatus.PENDING or order.is_deleted:
+            continue
+        synced_at = order.synced_at
+        if synced_at is not None and synced_at.tzinfo is None:
+            synced_at = synced_at.replace(tzinfo=timezone.utc)
+        if synced_at is None or synced_at < cutoff:
+            stale.append(order.id)
+    return stale
+
+
+def enqueue_order_reconciliation(order_ids: Iterable[str]) -> int:
+    return order_reconciliation_queue.enqueue(order_ids)
+
+
+def reconcile_orders(db: Session, order_ids: Iterable[str]) -> dict[str, OrderStatus]:
+    """Background reconciliation for the given orders (see order_reconciliation).
+
+    Times out sessionless checkouts, then re-reads every still-PENDING order
+    from its provider. Returns the new status of every order that changed.
+    """
     expire_pending_orders(db)
-    safe_limit = max(limit, 1)
+    ids = list(dict.fromkeys(order_ids))
+    if not ids:
+        return {}
     orders = (
         db.execute(
-            select(Order)
-            .where(
+            select(Order).where(
+                Order.id.in_(ids),
                 Order.status == OrderStatus.PENDING,
                 Order.is_deleted.is_(False),
-                or_(
-                    Order.stripe_session_id.is_not(None),
-                    Order.paypal_order_id.is_not(None),
-                ),
             )
-            .order_by(Order.created_at.asc())
-            .limit(safe_limit)
         )
         .scalars()
         .all()
     )
-    if not orders:
-        return {}
+    return _sync_orders_with_providers(db, orders).updates
 
-    stripe_updates = _sync_with_stripe(db, orders)
-    paypal_updates = _sync_with_paypal(db, orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if updates:
-        for order in orders:
-            if order.id in updates:
-                order.status = updates[order.id]
-    return updates
+
+def _syncable_pending_orders():
+    return (
+        Order.status == OrderStatus.PENDING,
+        Order.is_deleted.is_(False),
+        or_(
+            Order.stripe_session_id.is_not(None),
+            Order.paypal_order_id.is_not(None),
+        ),
+    )
 
 
-def get_admin_orders(db: Session) -> list[Order]:
+def sync_pending_orders(db: Session, *, limit: int = 200) -> OrderSyncResult:
+    """Reconcile up to ``limit`` PENDING orders whose ``nextSyncAt`` is due.
+
+    Orders never checked (fresh checkout sessions) go first, newest first;
+    the rest follow by how few attempts they have had and how overdue they are.
+    """
     expire_pending_orders(db)
+    now = datetime.now(timezone.utc)
+    orders = (
+        db.execute(
+            select(Order)
+            .where(
+                *_syncable_pending_orders(),
+                or_(Order.next_sync_at.is_(None), Order.next_sync_at <= now),
+            )
+            .order_by(
+                Order.sync_attempts.asc(),
+                Order.next_sync_at.asc(),
+                Order.created_at.desc(),
+            )
+            .limit(max(limit, 1))
+        )
+        .scalars()
+        .all()
+    )
+    return _sync_orders_with_providers(db, orders)
+
+
+def next_order_sync_at(db: Session) -> datetime | None:
+    """When the earliest PENDING order is due for its next provider check."""
+    if db.execute(
+        select(Order.id).where(*_syncable_pending_orders(), Order.next_sync_at.is_(None)).limit(1)
+    ).first():
+        return datetime.now(timezone.utc)
+    due_at = db.execute(
+        select(func.min(Order.next_sync_at)).where(*_syncable_pending_orders())
+    ).scalar()
+    if due_at is not None and due_at.tzinfo is None:
+        due_at = due_at.replace(tzinfo=timezone.utc)
+    return due_at
+
+
+def get_admin_orders(db: Session) -> list[Order]:
     orders = (
         db.execute(
             select(Order)
@@ -540,21 +849,13 @@ def get_admin_orders(db: Session) -> list[Order]:
         .scalars()
         .all()
     )
-    stripe_updates = _sync_with_stripe(db, orders)
-    paypal_updates = _sync_with_paypal(db, orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if not updates:
-        return orders
-    for order in orders:
-        if order.id in updates:
-            order.status = updates[order.id]
+    enqueue_order_reconciliation(stale_pending_order_ids(orders))
     return orders
 
 
 def get_admin_orders_by_day(
     db: Session, day_key: str, only_deleted: bool = False
 ) -> list[Order]:
-    expire_pending_orders(db)
     day_range = get_day_range(day_key)
     if not day_range:
         return []
@@ -573,21 +874,13 @@ def get_admin_orders_by_day(
         .scalars()
         .all()
     )
-    stripe_updates = _sync_with_stripe(db, orders)
-    paypal_updates = _sync_with_paypal(db, orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if not updates:
-        return orders
-    for order in orders:
-        if order.id in updates:
-            order.status = updates[order.id]
+    enqueue_order_reconciliation(stale_pending_order_ids(orders))
     return orders
 
 
 def get_admin_orders_by_week(
     db: Session, week_start_key: str, only_deleted: bool = False
 ) -> list[Order]:
-    expire_pending_orders(db)
     week_range = get_week_range(week_start_key)
     if not week_range:
         return []
@@ -606,24 +899,40 @@ def get_admin_orders_by_week(
         .scalars()
         .all()
     )
-    stripe_updates = _sync_with_stripe(db, orders)
-    paypal_updates = _sync_with_paypal(db, orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if not updates:
-        return orders
-    for order in orders:
-        if order.id in updates:
-            order.status = updates[order.id]
+    enqueue_order_reconciliation(stale_pending_order_ids(orders))
     return orders
 
 
+def get_admin_orders_by_delivery_day(
+    db: Session, delivery_date: date, only_deleted: bool = False
+) -> list[Order]:
+    """Orders scheduled for one delivery day, in delivery order.
+
+    Served by one range scan of ix_Order_isDeleted_deliveryDate_idealTime:
+    no provider sync and no per-row parsing of deliveryDateTime.
+    """
+    return (
+        db.execute(
+            select(Order)
+            .where(
+                Order.is_deleted.is_(only_deleted),
+                Order.delivery_date == delivery_date,
+            )
+            .options(joinedload(Order.items))
+            .order_by(Order.delivery_ideal_time.asc(), Order.id.asc())
+        )
+        .unique()
+        .scalars()
+        .all()
+    )
+
+
 def get_admin_orders_page(
     db: Session,
     only_deleted: bool = False,
     offset: int = 0,
     limit: int = 20,
 ) -> tuple[list[Order], bool, int | None]:
-    expire_pending_orders(db)
     safe_offset = max(offset, 0)
     safe_limit = max(limit, 1)
     order_ids = (
@@ -658,20 +967,13 @@ def get_admin_orders_page(
         for order_id in page_order_ids
         if order_id in orders_by_id
     ]
-    stripe_updates = _sync_with_stripe(db, sorted_orders)
-    paypal_updates = _sync_with_paypal(db, sorted_orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if updates:
-        for order in sorted_orders:
-            if order.id in updates:
-                order.status = updates[order.id]
+    enqueue_order_reconciliation(stale_pending_order_ids(sorted_orders))
 
     next_offset = safe_offset + safe_limit if has_more else None
     return sorted_orders, has_more, next_offset
 
 
 def get_orders_by_email(db: Session, email: str) -> list[Order]:
-    expire_pending_orders(db)
     orders = (
         db.execute(
             select(Order)
@@ -683,12 +985,12 @@ def get_orders_by_email(db: Session, email: str) -> list[Order]:
         .scalars()
         .all()
     )
-    stripe_updates = _sync_with_stripe(db, orders)
-    paypal_updates = _sync_with_paypal(db, orders)
-    updates = {**stripe_updates, **paypal_updates}
-    if not updates:
-        return orders
-    for order in orders:
-        if order.id in updates:
-            order.status = updates[order.id]
+    enqueue_order_reconciliation(stale_pending_order_ids(orders))
     return orders
+
+
+order_reconciliation_queue = OrderReconciliationQueue(
+    reconcile_orders,
+    max_size=settings.order_reconcile_queue_size,
+    batch_size=settings.order_reconcile_batch_size,
+)
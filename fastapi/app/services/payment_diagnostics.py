@@ -8,6 +8,7 @@ import stripe
 
 from app.models.enums import OrderStatus
 from app.services.paypal import paypal_extract_order_metadata
+from app.services.provider_gateway import stripe_gateway
 
 
 _CODE_MAX_LENGTH = 120
@@ -135,8 +136,11 @@ def resolve_stripe_payment_intent(payment_intent: object) -> object | None:
         return None
     if isinstance(payment_intent, str):
         try:
-            return stripe.PaymentIntent.retrieve(
-                payment_intent, expand=["latest_charge"]
+            return stripe_gateway.call(
+                "PaymentIntent.retrieve",
+                stripe.PaymentIntent.retrieve,
+                payment_intent,
+                expand=["latest_charge"],
             )
         except Exception:
             return None
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional
 
 from app.services.colors import normalize_color_value, normalize_palette_text
 
 
-@dataclass
+@dataclass(frozen=True)
 class DiscountInfo:
     percent: int
     note: str
@@ -34,104 +34,159 @@ def _has_category_filters(settings) -> bool:
     )
 
 
-def _matches_category(bouquet, settings) -> bool:
-    if settings.category_discount_percent <= 0:
-        return False
-    if not _has_category_filters(settings):
-        return False
+def get_bouquet_discount(bouquet, settings) -> Optional[DiscountInfo]:
+    return _compile_discount_rules(settings).discount_for(bouquet, {})
 
-    if settings.category_flower_type and settings.category_flower_type != bouquet.flower_type:
-        return False
-    bouquet_type = str(getattr(bouquet, "bouquet_type", "") or "").strip().lower()
-    if settings.category_mixed == "mixed":
-        if bouquet_type:
-            if bouquet_type != "mixed":
-                return False
-        elif not bouquet.is_mixed:
+
+def get_bouquet_pricing(bouquet, settings) -> dict:
+    return get_bouquet_pricing_batch([bouquet], settings)[0]
+
+
+@dataclass(slots=True)
+class _CartItemBouquet:
+    flower_type: object
+    is_mixed: bool
+    bouquet_type: object
+    colors: str
+    price_cents: int
+    discount_percent: int = 0
+    discount_note: Optional[str] = None
+
+
+def get_cart_item_discount(item, settings) -> Optional[DiscountInfo]:
+    if (item.get("bouquet_discount_percent") or 0) > 0:
+        return DiscountInfo(
+            percent=item.get("bouquet_discount_percent") or 0,
+            note=item.get("bouquet_discount_note") or "Discount",
+            source="bouquet",
+        )
+
+    bouquet = _CartItemBouquet(
+        flower_type=item.get("flower_type"),
+        is_mixed=bool(item.get("is_mixed")),
+        bouquet_type=item.get("bouquet_type"),
+        colors=item.get("colors") or "",
+        price_cents=item.get("base_price_cents") or 0,
+    )
+    return get_bouquet_discount(bouquet, settings)
+
+
+@dataclass(slots=True)
+class _CategoryRule:
+    """StoreSettings category filters compiled once for a batch of bouquets."""
+
+    discount: DiscountInfo
+    flower_type: object
+    mixed: Optional[str]
+    color_needle: Optional[str]
+    min_price_cents: Optional[int]
+    max_price_cents: Optional[int]
+
+    def matches(self, bouquet, palettes: dict[str, str]) -> bool:
+        if self.flower_type and self.flower_type != bouquet.flower_type:
             return False
-    if settings.category_mixed == "mono":
-        if bouquet_type:
-            if bouquet_type != "mono":
+        if self.mixed in {"mixed", "mono", "season"}:
+            bouquet_type = str(getattr(bouquet, "bouquet_type", "") or "").strip().lower()
+            if self.mixed == "season":
+                if bouquet_type != "season":
+                    return False
+            elif bouquet_type:
+                if bouquet_type != self.mixed:
+                    return False
+            elif bool(bouquet.is_mixed) != (self.mixed == "mixed"):
                 return False
-        elif bouquet.is_mixed:
-            return False
-    if settings.category_mixed == "season":
-        if bouquet_type != "season":
+        if self.color_needle is not None:
+            colors = bouquet.colors
+            palette = palettes.get(colors)
+            if palette is None:
+                palette = normalize_palette_text(colors)
+                palettes[colors] = palette
+            if self.color_needle not in palette:
+                return False
+        if self.min_price_cents is not None and bouquet.price_cents < self.min_price_cents:
             return False
-    if settings.category_color:
-        palette = normalize_palette_text(bouquet.colors)
-        needle = normalize_color_value(settings.category_color) or settings.category_color.lower()
-        if needle not in palette:
+        if self.max_price_cents is not None and bouquet.price_cents > self.max_price_cents:
             return False
-    if (
-        settings.category_min_price_cents is not None
-        and bouquet.price_cents < settings.category_min_price_cents
-    ):
-        return False
-    if (
-        settings.category_max_price_cents is not None
-        and bouquet.price_cents > settings.category_max_price_cents
-    ):
-        return False
-    return True
+        return True
 
 
-def get_bouquet_discount(bouquet, settings) -> Optional[DiscountInfo]:
-    if bouquet.discount_percent > 0:
-        return DiscountInfo(
-            percent=bouquet.discount_percent,
-            note=bouquet.discount_note or "Discount",
-            source="bouquet",
-        )
+@dataclass(slots=True)
+class _DiscountRules:
+    """Bouquet, category and global discounts in precedence order.
 
-    if _matches_category(bouquet, settings):
-        return DiscountInfo(
+    The only implementation of the discount rules: single-bouquet and batch
+    pricing both go through discount_for.
+    """
+
+    category: Optional[_CategoryRule]
+    global_discount: Optional[DiscountInfo]
+
+    def discount_for(self, bouquet, palettes: dict[str, str]) -> Optional[DiscountInfo]:
+        if bouquet.discount_percent > 0:
+            return DiscountInfo(
+                percent=bouquet.discount_percent,
+                note=bouquet.discount_note or "Discount",
+                source="bouquet",
+            )
+        if self.category is not None and self.category.matches(bouquet, palettes):
+            return self.category.discount
+        return self.global_discount
+
+
+def _compile_category_rule(settings) -> Optional[_CategoryRule]:
+    if settings.category_discount_percent <= 0 or not _has_category_filters(settings):
+        return None
+    color_needle = None
+    if settings.category_color:
+        color_needle = (
+            normalize_color_value(settings.category_color) or settings.category_color.lower()
+        )
+    return _CategoryRule(
+        discount=DiscountInfo(
             percent=settings.category_discount_percent,
             note=settings.category_discount_note or "Discount",
             source="category",
-        )
+        ),
+        flower_type=settings.category_flower_type,
+        mixed=settings.category_mixed,
+        color_needle=color_needle,
+        min_price_cents=settings.category_min_price_cents,
+        max_price_cents=settings.category_max_price_cents,
+    )
+
 
+def _compile_discount_rules(settings) -> _DiscountRules:
+    global_discount = None
     if settings.global_discount_percent > 0:
-        return DiscountInfo(
+        global_discount = DiscountInfo(
             percent=settings.global_discount_percent,
             note=settings.global_discount_note or "Discount",
             source="global",
         )
-
-    return None
-
-
-def get_bouquet_pricing(bouquet, settings) -> dict:
-    discount = get_bouquet_discount(bouquet, settings)
-    final_price = (
-        apply_percent_discount(bouquet.price_cents, discount.percent)
-        if discount
-        else bouquet.price_cents
+    return _DiscountRules(
+        category=_compile_category_rule(settings), global_discount=global_discount
     )
-    return {
-        "original_price_cents": bouquet.price_cents,
-        "final_price_cents": final_price,
-        "discount": discount,
-    }
 
 
-def get_cart_item_discount(item, settings) -> Optional[DiscountInfo]:
-    if (item.get("bouquet_discount_percent") or 0) > 0:
-        return DiscountInfo(
-            percent=item.get("bouquet_discount_percent") or 0,
-            note=item.get("bouquet_discount_note") or "Discount",
-            source="bouquet",
+def get_bouquet_pricing_batch(bouquets: Iterable, settings) -> list[dict]:
+    """Price many bouquets in one pass with rules compiled once."""
+    rules = _compile_discount_rules(settings)
+    palettes: dict[str, str] = {}
+    results: list[dict] = []
+    for bouquet in bouquets:
+        price_cents = bouquet.price_cents
+        # Category and global DiscountInfo instances are shared across the
+        # batch, which is safe because DiscountInfo is frozen.
+        discount = rules.discount_for(bouquet, palettes)
+        results.append(
+            {
+                "original_price_cents": price_cents,
+                "final_price_cents": (
+                    apply_percent_discount(price_cents, discount.percent)
+                    if discount
+                    else price_cents
+                ),
+                "discount": discount,
+            }
         )
-
-    class Obj:
-        pass
-
-    bouquet = Obj()
-    bouquet.flower_type = item.get("flower_type")
-    bouquet.is_mixed = bool(item.get("is_mixed"))
-    bouquet.bouquet_type = item.get("bouquet_type")
-    bouquet.colors = item.get("colors") or ""
-    bouquet.price_cents = item.get("base_price_cents") or 0
-    bouquet.discount_percent = 0
-    bouquet.discount_note = None
-    return get_bouquet_discount(bouquet, settings)
+    return results
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from app.core.config import settings
+from app.core.critical_logging import log_critical_event
+from app.services.paypal import PayPalApiError
+
+
+T = TypeVar("T")
+
+_STAT_FIELDS = ("calls", "errors", "timeouts", "total_seconds", "max_seconds")
+
+
+class ProviderDeadlineExceeded(TimeoutError):
+    pass
+
+
+class ProviderGateway:
+    """Runs blocking payment-provider calls on a small dedicated thread pool.
+
+    The pool size is the provider's concurrency limit: extra calls queue
+    instead of opening more connections. Every call has a deadline that
+    includes queueing time; a call that misses it raises ``error_factory``'s
+    exception to the caller, while the worker finishes in the background
+    (SDK calls cannot be interrupted). ``acall`` awaits without holding the
+    event loop; ``call`` is for sync code paths. Calls made from one of the
+    gateway's own workers run inline so nested lookups cannot deadlock.
+
+    Abandoned calls are tracked until their worker frees up; ``call_many``
+    does not hand out those workers' slots, so a slow provider cannot make a
+    batch pile more calls onto the pool.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        max_concurrency: int,
+        deadline_seconds: float,
+        error_factory: Optional[Callable[[str], Exception]] = None,
+    ) -> None:
+        self.provider = provider
+        self.max_concurrency = max(max_concurrency, 1)
+        self.deadline_seconds = deadline_seconds
+        self._error_factory = error_factory or ProviderDeadlineExceeded
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+        self._abandoned: set[Future] = set()
+
+    def call(self, operation: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        if getattr(self._local, "active", False):
+            return self._run(operation, fn, args, kwargs)
+        future = self._submit(operation, fn, args, kwargs)
+        try:
+            return future.result(timeout=self.deadline_seconds)
+        except FutureTimeoutError:
+            self._abandon(future)
+            raise self._deadline_exceeded(operation) from None
+
+    async def acall(
+        self, operation: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+    ) -> T:
+        future = self._submit(operation, fn, args, kwargs)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=self.deadline_seconds
+            )
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            raise self._deadline_exceeded(operation) from None
+
+    def call_many(
+        self,
+        operation: str,
+        fn: Callable[..., T],
+        arguments: Sequence[tuple],
+        *,
+        max_parallel: int,
+        call_deadline_seconds: Optional[float] = None,
+    ) -> dict[int, T]:
+        """Run ``fn(*args)`` for every entry of ``arguments`` concurrently.
+
+        At most ``max_parallel`` calls are outstanding at once, minus any
+        workers still held by abandoned calls (from this batch or earlier
+        ones). A call is abandoned once it has been outstanding for
+        ``call_deadline_seconds``. When abandoned calls hold every slot the
+        batch stops submitting and the rest is skipped.
+        Returns the results of the calls that succeeded in time, keyed by
+        their index; failed, abandoned and skipped calls are simply missing.
+        """
+        if not arguments:
+            return {}
+        call_deadline = (
+            self.deadline_seconds if call_deadline_seconds is None else call_deadline_seconds
+        )
+        if getattr(self._local, "active", False):
+            results: dict[int, T] = {}
+            for index, args in enumerate(arguments):
+                try:
+                    results[index] = self._run(operation, fn, args, {})
+                except Exception:
+                    continue
+            return results
+
+        started = time.monotonic()
+        parallel = max(max_parallel, 1)
+        pending: dict[Future, tuple[int, float]] = {}
+        results = {}
+        next_index = 0
+        abandoned = 0
+        while True:
+            free_slots = min(parallel, self.max_concurrency - self._abandoned_count())
+            while next_index < len(arguments) and len(pending) < free_slots:
+                future = self._submit(operation, fn, arguments[next_index], {})
+                pending[future] = (next_index, time.monotonic() + call_deadline)
+                next_index += 1
+            if not pending:
+                break
+            now = time.monotonic()
+            wake_at = min(call_deadline_at for _index, call_deadline_at in pending.values())
+            done, _not_done = wait(
+                pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                index, _call_deadline_at = pending.pop(future)
+                if not future.cancelled() and future.exception() is None:
+                    results[index] = future.result()
+            now = time.monotonic()
+            for future, (_index, call_deadline_at) in list(pending.items()):
+                if call_deadline_at <= now:
+                    del pending[future]
+                    self._abandon(future)
+                    self._record(operation, timed_out=True)
+                    abandoned += 1
+
+        skipped = len(arguments) - next_index
+        if abandoned or skipped:
+            log_critical_event(
+                domain="payment",
+                event="provider_batch_incomplete",
+                message="Payment provider batch left calls unfinished.",
+                context={
+                    "provider": self.provider,
+                    "operation": operation,
+                    "requested": len(arguments),
+                    "completed": len(results),
+                    "timed_out": abandoned,
+                    "skipped": skipped,
+                    "workers_held": self._abandoned_count(),
+                    "elapsed_seconds": round(time.monotonic() - started, 3),
+                },
+                level=logging.WARNING,
+            )
+        return results
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._stats_lock:
+            return {operation: dict(values) for operation, values in self._stats.items()}
+
+    def workers_held(self) -> int:
+        """Workers still busy with calls whose callers gave up on them."""
+        return self._abandoned_count()
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+    def _abandon(self, future: Future) -> None:
+        # cancel() only works while the call is still queued; a running SDK
+        # call keeps its worker until the client's own timeout fires.
+        if future.cancel():
+            return
+        with self._stats_lock:
+            self._abandoned.add(future)
+        future.add_done_callback(self._release_abandoned)
+
+    def _release_abandoned(self, future: Future) -> None:
+        with self._stats_lock:
+            self._abandoned.discard(future)
+
+    def _abandoned_count(self) -> int:
+        with self._stats_lock:
+            return len(self._abandoned)
+
+    def _submit(
+        self, operation: str, fn: Callable[..., T], args: tuple, kwargs: dict
+    ) -> Future:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix=f"{self.provider}-gateway",
+                    )
+        return self._executor.submit(self._run_in_worker, operation, fn, args, kwargs)
+
+    def _run_in_worker(
+        self, operation: str, fn: Callable[..., T], args: tuple, kwargs: dict
+    ) -> T:
+        self._local.active = True
+        try:
+            return self._run(operation, fn, args, kwargs)
+        finally:
+            self._local.active = False
+
+    def _run(self, operation: str, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._record(operation, duration=time.perf_counter() - started, failed=failed)
+
+    def _record(
+        self, operation: str, *, duration: float = 0.0, failed: bool = False, timed_out: bool = False
+    ) -> None:
+        with self._stats_lock:
+            values = self._stats.setdefault(operation, dict.fromkeys(_STAT_FIELDS, 0))
+            if timed_out:
+                values["timeouts"] += 1
+                return
+            values["calls"] += 1
+            values["errors"] += int(failed)
+            values["total_seconds"] += duration
+            values["max_seconds"] = max(values["max_seconds"], duration)
+
+    def _deadline_exceeded(self, operation: str) -> Exception:
+        self._record(operation, timed_out=True)
+        log_critical_event(
+            domain="payment",
+            event="provider_call_deadline_exceeded",
+            message="Payment provider call exceeded its deadline.",
+            context={
+                "provider": self.provider,
+                "operation": operation,
+                "deadline_seconds": self.deadline_seconds,
+            },
+            level=logging.WARNING,
+        )
+        return self._error_factory(
+            f"{self.provider} {operation} exceeded {self.deadline_seconds:g}s deadline."
+        )
+
+
+stripe_gateway = ProviderGateway(
+    "stripe",
+    max_concurrency=settings.stripe_max_concurrency,
+    deadline_seconds=settings.stripe_call_deadline_seconds,
+)
+# PayPal call sites already handle PayPalApiError; a missed deadline looks
+# like a provider error without an HTTP status (retryable, never a decline).
+paypal_gateway = ProviderGateway(
+    "paypal",
+    max_concurrency=settings.paypal_max_concurrency,
+    deadline_seconds=settings.paypal_call_deadline_seconds,
+    error_factory=PayPalApiError,
+)
+# Background reconciliation (worker queue, cron) gets its own pools so reads
+# stuck on a slow provider never take the workers checkout needs.
+stripe_sync_gateway = ProviderGateway(
+    "stripe-sync",
+    max_concurrency=settings.order_sync_concurrency,
+    deadline_seconds=settings.order_sync_call_deadline_seconds,
+)
+paypal_sync_gateway = ProviderGateway(
+    "paypal-sync",
+    max_concurrency=settings.order_sync_concurrency,
+    deadline_seconds=settings.order_sync_call_deadline_seconds,
+    error_factory=PayPalApiError,
+)
+
+
+def provider_gateway_stats() -> dict[str, dict[str, dict[str, float]]]:
+    return {
+        gateway.provider: gateway.stats()
+        for gateway in (stripe_gateway, paypal_gateway, stripe_sync_gateway, paypal_sync_gateway)
+    }
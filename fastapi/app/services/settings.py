@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, fields
+import threading
+import time
+from typing import Optional
+
 from sqlalchemy.orm import Session
 
 from app.models.store_settings import StoreSettings
@@ -34,29 +39,109 @@ DEFAULT_SETTINGS = {
 }
 
 
-def get_store_settings(db: Session) -> StoreSettings:
+# Writes invalidate the cache of the worker that handled them; other workers
+# pick the change up after this TTL.
+STORE_SETTINGS_CACHE_TTL_SECONDS = 30
+
+
+@dataclass(frozen=True, slots=True)
+class StoreSettingsSnapshot:
+    """Immutable copy of the StoreSettings row shared by hot read paths."""
+
+    id: str
+    global_discount_percent: int
+    global_discount_note: Optional[str]
+    category_discount_percent: int
+    category_discount_note: Optional[str]
+    category_flower_type: Optional[str]
+    category_style: Optional[str]
+    category_mixed: Optional[str]
+    category_color: Optional[str]
+    category_min_price_cents: Optional[int]
+    category_max_price_cents: Optional[int]
+    first_order_discount_percent: int
+    first_order_discount_note: Optional[str]
+    home_hero_image: str
+    home_gallery_image_1: str
+    home_gallery_image_2: str
+    home_gallery_image_3: str
+    home_gallery_image_4: str
+    home_gallery_image_5: str
+    home_gallery_image_6: str
+    catalog_category_image_mono: str
+    catalog_category_image_mixed: str
+    catalog_category_image_season: str
+    catalog_category_image_all: str
+
+
+_SNAPSHOT_FIELDS = tuple(item.name for item in fields(StoreSettingsSnapshot))
+_cached_settings: StoreSettingsSnapshot | None = None
+_cached_at = 0.0
+_cache_lock = threading.Lock()
+
+
+def _snapshot_from_row(settings: StoreSettings) -> StoreSettingsSnapshot:
+    values = {name: getattr(settings, name) for name in _SNAPSHOT_FIELDS}
+    # Rows written before colors were normalized on save are fixed up in memory
+    # only; reads never write.
+    if values["category_color"]:
+        values["category_color"] = normalize_color_value(values["category_color"])
+    return StoreSettingsSnapshot(**values)
+
+
+def _default_snapshot() -> StoreSettingsSnapshot:
+    return StoreSettingsSnapshot(**{name: DEFAULT_SETTINGS[name] for name in _SNAPSHOT_FIELDS})
+
+
+def _load_store_settings(db: Session) -> StoreSettingsSnapshot:
     settings = db.get(StoreSettings, "default")
-    if settings:
-        normalized_category_color = normalize_color_value(settings.category_color)
-        if settings.category_color and normalized_category_color != settings.category_color:
-            settings.category_color = normalized_category_color
-            db.commit()
-            db.refresh(settings)
-        return settings
-    settings = StoreSettings(**DEFAULT_SETTINGS)
-    db.add(settings)
-    db.commit()
-    db.refresh(settings)
-    return settings
+    if settings is None:
+        return _default_snapshot()
+    return _snapshot_from_row(settings)
+
+
+def _store_cached_settings(snapshot: StoreSettingsSnapshot | None) -> None:
+    global _cached_settings, _cached_at
+    _cached_settings = snapshot
+    _cached_at = time.monotonic()
 
 
-def update_store_settings(db: Session, data: dict) -> StoreSettings:
-    settings = get_store_settings(db)
+def get_store_settings(db: Session) -> StoreSettingsSnapshot:
+    snapshot = _cached_settings
+    if snapshot is not None and time.monotonic() - _cached_at < STORE_SETTINGS_CACHE_TTL_SECONDS:
+        return snapshot
+    with _cache_lock:
+        snapshot = _cached_settings
+        if (
+            snapshot is not None
+            and time.monotonic() - _cached_at < STORE_SETTINGS_CACHE_TTL_SECONDS
+        ):
+            return snapshot
+        snapshot = _load_store_settings(db)
+        _store_cached_settings(snapshot)
+        return snapshot
+
+
+def invalidate_store_settings_cache() -> None:
+    with _cache_lock:
+        _store_cached_settings(None)
+
+
+def update_store_settings(db: Session, data: dict) -> StoreSettingsSnapshot:
+    settings = db.get(StoreSettings, "default")
+    if settings is None:
+        settings = StoreSettings(**DEFAULT_SETTINGS)
+        db.add(settings)
     if "category_color" in data:
         data["category_color"] = normalize_color_value(data.get("category_color"))
+    elif settings.category_color:
+        settings.category_color = normalize_color_value(settings.category_color)
     for key, value in data.items():
         if hasattr(settings, key):
             setattr(settings, key, value)
     db.commit()
     db.refresh(settings)
-    return settings
+    snapshot = _snapshot_from_row(settings)
+    with _cache_lock:
+        _store_cached_settings(snapshot)
+    return snapshot
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+def get_forwarded_client_ip(request: Request) -> str | None:
+    """Return the caller's address from trusted proxy headers, if any.
+
+    Without TRUST_PROXY_HEADERS every request arrives through the Next.js
+    rewrite, so the socket peer is the proxy and identifies no one; callers
+    that need a real per-client key get None in that case.
+    """
+    if not settings.trust_proxy_headers:
+        return None
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        first = forwarded.split(",")[0].strip()
+        if first:
+            return first
+    real_ip = (request.headers.get("x-real-ip") or "").strip()
+    return real_ip or None
+
+
+def get_client_key(request: Request) -> str:
+    forwarded = get_forwarded_client_ip(request)
+    if forwarded:
+        return forwarded
+    return request.client.host if request.client and request.client.host else "unknown"
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+# Clients and the Next.js data cache may keep a copy but must revalidate it;
+# unchanged data then costs a 304 with no body.
+PUBLIC_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def build_etag(*parts: object) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2).
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        token = candidate.strip()
+        if token == "*":
+            return True
+        if token.startswith("W/"):
+            token = token[2:]
+        if token == etag:
+            return True
+    return False
+
+
+def not_modified_or_tag(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = PUBLIC_CACHE_CONTROL,
+) -> Response | None:
+    """Return a 304 when the client copy is current, else tag ``response``."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def table_content_version(db: Session, model, *criteria) -> str:
+    """Cheap version of a table slice: row count plus max(updatedAt)."""
+    row_count, latest = db.execute(
+        select(func.count(), func.max(model.updated_at)).select_from(model).where(*criteria)
+    ).one()
+    return f"{row_count}:{latest.isoformat() if latest else ''}"
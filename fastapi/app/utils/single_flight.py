@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent coroutine calls that share a key into one task.
+
+    Callers join the in-flight task instead of starting their own; the task is
+    shielded so one caller disconnecting does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task[Any]] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+            self.started += 1
+        else:
+            self.joined += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
@@ -0,0 +1,49 @@
+"""Fill Order.deliveryDate/deliveryWindow/deliveryIdealTime from deliveryDateTime.
+
+Safe to re-run: only rows whose typed columns are still empty are touched,
+one committed batch at a time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.critical_logging import log_critical_event, setup_critical_logging
+from app.core.database import SessionLocal
+from app.services.delivery_schedule import (
+    DELIVERY_SCHEDULE_BACKFILL_BATCH_SIZE,
+    backfill_delivery_schedule,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=DELIVERY_SCHEDULE_BACKFILL_BATCH_SIZE
+    )
+    args = parser.parse_args()
+
+    setup_critical_logging()
+    db = SessionLocal()
+    try:
+        updated = backfill_delivery_schedule(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    log_critical_event(
+        domain="admin",
+        event="delivery_schedule_backfill_completed",
+        message="Delivery schedule backfill completed.",
+        context={"updated": updated},
+        level=logging.INFO,
+    )
+
+
+if __name__ == "__main__":
+    main()
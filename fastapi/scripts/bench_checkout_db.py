@@ -0,0 +1,142 @@
+"""Compare checkout-status throughput on the sync and async database paths.
+
+The "sync" column replays the pre-AsyncSession handler: an ``async def`` route
+that talks to the database through a blocking ``Session``, so every query holds
+the event loop. The "async" column calls the ported ``checkout_status`` route
+with an ``AsyncSession``. Both run the same number of concurrent requests on
+one event loop, which is how uvicorn serves them.
+
+    DATABASE_URL=postgresql://... python scripts/bench_checkout_db.py --requests 2000
+
+Without DATABASE_URL a temporary SQLite file is used (needs ``aiosqlite``);
+SQLite serializes writers, so only PostgreSQL numbers are meaningful.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_TEMP_DIR = None
+if not os.environ.get("DATABASE_URL"):
+    _TEMP_DIR = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_TEMP_DIR.name}/bench.db"
+
+from sqlalchemy import delete
+from starlette.requests import Request
+
+from app.api.routes.checkout import checkout_status
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine, get_async_engine
+from app.models.enums import OrderStatus
+from app.models.order import Order
+from app.models.payment_event import PaymentEvent
+from app.schemas.checkout import CheckoutStatusRequest
+from app.services.payment_events import record_payment_event_best_effort
+
+BENCH_EMAIL = "bench-checkout-db@example.com"
+
+
+def _request() -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/checkout/status",
+            "headers": [],
+            "query_string": b"",
+            "client": ("127.0.0.1", 1234),
+        }
+    )
+
+
+def _seed_orders(count: int) -> list[str]:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        orders = [
+            Order(email=BENCH_EMAIL, total_cents=5000, status=OrderStatus.PAID)
+            for _ in range(count)
+        ]
+        db.add_all(orders)
+        db.commit()
+        return [order.id for order in orders]
+
+
+def _cleanup(order_ids: list[str]) -> None:
+    with SessionLocal() as db:
+        db.execute(delete(PaymentEvent).where(PaymentEvent.order_id.in_(order_ids)))
+        db.execute(delete(Order).where(Order.id.in_(order_ids)))
+        db.commit()
+
+
+async def _sync_status(order_id: str) -> str:
+    # Same queries and writes as the handler before the port.
+    with SessionLocal() as db:
+        order = db.get(Order, order_id)
+        for event in ("checkout_status_requested", "checkout_status_resolved"):
+            record_payment_event_best_effort(
+                db, order_id=order.id, event=event, provider="stripe", source="server"
+            )
+        return order.status.value
+
+
+async def _async_status(order_id: str) -> str:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        response = await checkout_status(
+            CheckoutStatusRequest(order_id=order_id),
+            _request(),
+            user=SimpleNamespace(id=None, email=BENCH_EMAIL),
+            db=db,
+        )
+        return response.status
+
+
+async def _run(handler, order_ids: list[str], requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            await handler(order_ids[index % len(order_ids)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def _main(requests: int, concurrency: int) -> None:
+    order_ids = _seed_orders(min(requests, 200))
+    try:
+        # Warm both pools so connection setup is not part of the measurement.
+        await _run(_sync_status, order_ids, concurrency, concurrency)
+        await _run(_async_status, order_ids, concurrency, concurrency)
+        sync_rps = await _run(_sync_status, order_ids, requests, concurrency)
+        async_rps = await _run(_async_status, order_ids, requests, concurrency)
+    finally:
+        await get_async_engine().dispose()
+        _cleanup(order_ids)
+
+    print(f"{'path':>8} {'req/s':>10}")
+    print(f"{'sync':>8} {sync_rps:>10.1f}")
+    print(f"{'async':>8} {async_rps:>10.1f}")
+    print(f"{'speedup':>8} {async_rps / sync_rps:>9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(_main(max(args.requests, 1), max(args.concurrency, 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.pricing import get_bouquet_pricing, get_bouquet_pricing_batch
+
+
+SIZES = (10, 1_000, 100_000)
+COLORS = ("pink, white", "burgundy, pink", "hot pink, cream", "blush, ivory", "red", "peach")
+
+
+def make_bouquets(count: int, seed: int = 7) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            price_cents=rng.randrange(6500, 18000),
+            discount_percent=rng.choice((0, 0, 0, 10)),
+            discount_note=None,
+            flower_type=rng.choice(("ROSE", "TULIP", "PEONY")),
+            is_mixed=rng.random() < 0.3,
+            bouquet_type=rng.choice(("MONO", "MIXED", "SEASON")),
+            colors=rng.choice(COLORS),
+        )
+        for _ in range(count)
+    ]
+
+
+def make_settings() -> SimpleNamespace:
+    # Worst case for the scalar path: every filter is set, including color.
+    return SimpleNamespace(
+        global_discount_percent=5,
+        global_discount_note="Weekend",
+        category_discount_percent=15,
+        category_discount_note="Category",
+        category_flower_type="ROSE",
+        category_mixed="mono",
+        category_color="pink",
+        category_min_price_cents=7000,
+        category_max_price_cents=16000,
+    )
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    settings = make_settings()
+    print(f"{'items':>8} {'scalar ms':>12} {'batch ms':>12} {'speedup':>8}")
+    for size in SIZES:
+        bouquets = make_bouquets(size)
+        assert get_bouquet_pricing_batch(bouquets, settings) == [
+            get_bouquet_pricing(bouquet, settings) for bouquet in bouquets
+        ]
+        repeats = 3 if size >= 100_000 else 20
+        scalar = _best_of(
+            lambda: [get_bouquet_pricing(bouquet, settings) for bouquet in bouquets], repeats
+        )
+        batch = _best_of(lambda: get_bouquet_pricing_batch(bouquets, settings), repeats)
+        print(f"{size:>8} {scalar * 1000:>12.3f} {batch * 1000:>12.3f} {scalar / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
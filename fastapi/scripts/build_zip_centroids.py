@@ -0,0 +1,56 @@
+"""Build the optional ZIP-centroid table used by GET /api/delivery/estimate.
+
+Input is the Census Bureau ZCTA gazetteer file (tab separated, with GEOID,
+INTPTLAT and INTPTLONG columns). Only ZIPs within --radius straight-line miles
+of the studio are kept, so the output stays a few kilobytes.
+
+    python scripts/build_zip_centroids.py 2020_Gaz_zcta_national.txt \\
+        data/zip_centroids.csv --lat <studio lat> --lng <studio lng>
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.delivery_geo import haversine_miles
+
+
+DEFAULT_RADIUS_MILES = 40.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("gazetteer", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--lat", type=float, required=True, help="Studio latitude")
+    parser.add_argument("--lng", type=float, required=True, help="Studio longitude")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS_MILES)
+    args = parser.parse_args()
+
+    rows: list[tuple[str, float, float]] = []
+    with args.gazetteer.open(newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle, delimiter="\t")
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+        for row in reader:
+            lat = float(row["INTPTLAT"])
+            lng = float(row["INTPTLONG"])
+            if haversine_miles(args.lat, args.lng, lat, lng) <= args.radius:
+                rows.append((row["GEOID"].strip(), lat, lng))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["zip", "lat", "lng"])
+        writer.writerows(sorted(rows))
+    print(f"Wrote {len(rows)} ZIP centroids to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
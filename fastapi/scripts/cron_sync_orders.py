@@ -1,8 +1,22 @@
+"""Reconcile PENDING orders with Stripe and PayPal.
+
+Each pass also purges a bounded batch of long-expired delivery cache rows.
+By default one pass runs and exits (cron). With ``--daemon`` the script keeps
+the advisory lock and schedules itself: each pass takes the orders whose
+``nextSyncAt`` is due, then sleeps until the next one is due (at most
+CRON_SYNC_IDLE_SECONDS). SIGTERM/SIGINT finish the current pass and exit.
+"""
+
 from __future__ import annotations
 
+import argparse
 import logging
 import os
+import signal
 import sys
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 from sqlalchemy import text
@@ -13,7 +27,8 @@ if str(ROOT) not in sys.path:
 
 from app.core.critical_logging import log_critical_event, setup_critical_logging
 from app.core.database import SessionLocal, engine
-from app.services.orders import sync_pending_orders
+from app.services.delivery_cache import purge_expired_delivery_lookups
+from app.services.orders import OrderSyncResult, next_order_sync_at, sync_pending_orders
 
 
 CRON_LOCK_ID = 701264913
@@ -56,7 +71,133 @@ def _resolve_limit() -> int:
         return 200
 
 
+def _resolve_idle_seconds() -> float:
+    raw = os.environ.get("CRON_SYNC_IDLE_SECONDS") or "30"
+    try:
+        return max(1.0, float(raw))
+    except ValueError:
+        return 30.0
+
+
+def _pass_context(result: OrderSyncResult, elapsed: float) -> dict[str, object]:
+    return {
+        "checked": result.checked,
+        "updated": len(result.updates),
+        "errors": result.errors,
+        "lag_seconds": round(result.lag_seconds, 1),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+def _purge_delivery_cache() -> None:
+    # Housekeeping must never fail the order sync pass it rides along with.
+    try:
+        with SessionLocal() as db:
+            purged = purge_expired_delivery_lookups(db)
+    except Exception as exc:
+        log_critical_event(
+            domain="cart",
+            event="delivery_cache_purge_failed",
+            message="Purging expired delivery cache rows failed.",
+            exc=exc,
+        )
+        return
+    if purged:
+        log_critical_event(
+            domain="cart",
+            event="delivery_cache_purged",
+            message="Expired delivery cache rows purged.",
+            context={"purged": purged},
+            level=logging.INFO,
+        )
+
+
+def _run_once(limit: int) -> None:
+    started = time.monotonic()
+    with SessionLocal() as db:
+        result = sync_pending_orders(db, limit=limit)
+    _purge_delivery_cache()
+    log_critical_event(
+        domain="payment",
+        event="cron_sync_completed",
+        message="Cron sync completed.",
+        context=_pass_context(result, time.monotonic() - started),
+        level=logging.INFO,
+    )
+
+
+def _seconds_until_next_pass(limit: int, result: OrderSyncResult, idle_seconds: float) -> float:
+    if result.checked >= limit:
+        return 0.0
+    with SessionLocal() as db:
+        due_at = next_order_sync_at(db)
+    if due_at is None:
+        return idle_seconds
+    wait = (due_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(wait, 0.0), idle_seconds)
+
+
+def _run_daemon(limit: int, idle_seconds: float) -> None:
+    stopping = threading.Event()
+
+    def request_stop(signum, _frame) -> None:
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    totals = {"passes": 0, "checked": 0, "updated": 0, "errors": 0, "failed_passes": 0}
+    log_critical_event(
+        domain="payment",
+        event="cron_sync_daemon_started",
+        message="Order sync daemon started.",
+        context={"limit": limit, "idle_seconds": idle_seconds},
+        level=logging.INFO,
+    )
+    while not stopping.is_set():
+        started = time.monotonic()
+        result = OrderSyncResult()
+        try:
+            with SessionLocal() as db:
+                result = sync_pending_orders(db, limit=limit)
+            _purge_delivery_cache()
+            wait = _seconds_until_next_pass(limit, result, idle_seconds)
+        except Exception as exc:
+            totals["failed_passes"] += 1
+            log_critical_event(
+                domain="payment",
+                event="cron_sync_failed",
+                message="Order sync daemon pass failed.",
+                exc=exc,
+            )
+            wait = idle_seconds
+        totals["passes"] += 1
+        totals["checked"] += result.checked
+        totals["updated"] += len(result.updates)
+        totals["errors"] += result.errors
+        if result.checked:
+            log_critical_event(
+                domain="payment",
+                event="cron_sync_pass_completed",
+                message="Order sync daemon pass completed.",
+                context=_pass_context(result, time.monotonic() - started),
+                level=logging.INFO,
+            )
+        stopping.wait(wait)
+    log_critical_event(
+        domain="payment",
+        event="cron_sync_daemon_stopped",
+        message="Order sync daemon stopped.",
+        context=totals,
+        level=logging.INFO,
+    )
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--daemon", action="store_true", help="keep running and schedule passes by nextSyncAt"
+    )
+    args = parser.parse_args()
     setup_critical_logging()
     lock_conn = None
     try:
@@ -79,16 +220,11 @@ def main() -> None:
         )
         return
 
-    db = SessionLocal()
     try:
-        updates = sync_pending_orders(db, limit=_resolve_limit())
-        log_critical_event(
-            domain="payment",
-            event="cron_sync_completed",
-            message="Cron sync completed.",
-            context={"updated": len(updates)},
-            level=logging.INFO,
-        )
+        if args.daemon:
+            _run_daemon(_resolve_limit(), _resolve_idle_seconds())
+        else:
+            _run_once(_resolve_limit())
     except Exception as exc:
         log_critical_event(
             domain="payment",
@@ -98,7 +234,6 @@ def main() -> None:
         )
         raise
     finally:
-        db.close()
         if lock_conn not in (None, _NO_LOCK):
             _release_advisory_lock(lock_conn)
 
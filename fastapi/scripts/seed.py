@@ -14,6 +14,7 @@ from app.models.promo_slide import PromoSlide
 from app.models.review import Review
 from app.models.user import User
 from app.models.enums import BouquetType, FlowerType, Role
+from app.services.bouquet_tokens import apply_search_tokens
 
 
 bouquets = [
@@ -182,7 +183,10 @@ def main():
             db.add(User(email=admin_email, role=Role.ADMIN))
 
         db.query(Bouquet).delete()
-        db.add_all([Bouquet(**bouquet) for bouquet in bouquets])
+        seeded_bouquets = [Bouquet(**bouquet) for bouquet in bouquets]
+        for bouquet in seeded_bouquets:
+            apply_search_tokens(bouquet)
+        db.add_all(seeded_bouquets)
 
         db.query(PromoSlide).delete()
         db.add_all([PromoSlide(**slide) for slide in promo_slides])
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.api.routes import checkout as checkout_routes
+from app.api.routes import stripe_webhook as stripe_routes
+from app.core.config import Settings
+from app.core.database import AsyncSessionLocal, Base
+from app.models.bouquet import Bouquet
+from app.models.delivery_slot import DeliverySlot
+from app.models.enums import BouquetType, FlowerType, OrderStatus
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment_event import PaymentEvent
+from app.models.webhook_event import WebhookEvent
+from app.schemas.checkout import (
+    CheckoutCancelRequest,
+    CheckoutItemIn,
+    CheckoutRequest,
+    CheckoutStatusRequest,
+)
+from app.services import orders as order_service
+from app.services.delivery import DeliveryQuote
+from app.services.provider_gateway import stripe_gateway
+
+EMAIL = "buyer@example.com"
+
+
+def make_request(body: bytes = b"", headers: dict[str, str] | None = None) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/stripe/webhook",
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in (headers or {}).items()
+            ],
+            "query_string": b"",
+            "client": ("127.0.0.1", 1234),
+        },
+        receive,
+    )
+
+
+class AsyncDatabaseUrlTests(unittest.TestCase):
+    def test_async_url_uses_async_capable_drivers(self):
+        cases = {
+            "postgresql://u:p@db/shop": "postgresql+psycopg://u:p@db/shop",
+            "postgresql+psycopg://u:p@db/shop": "postgresql+psycopg://u:p@db/shop",
+            "sqlite:///./local.db": "sqlite+aiosqlite:///./local.db",
+            "sqlite+pysqlite:///:memory:": "sqlite+aiosqlite:///:memory:",
+        }
+        for value, expected in cases.items():
+            self.assertEqual(
+                Settings(DATABASE_URL=value).normalized_async_database_url(), expected, value
+            )
+
+
+class AsyncCheckoutRouteTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.db = AsyncSessionLocal(bind=self.engine)
+        self.patches = [
+            patch.object(checkout_routes.settings, "stripe_secret_key", "sk_test"),
+            patch.object(checkout_routes.settings, "stripe_webhook_secret", "whsec_test"),
+        ]
+        for item in self.patches:
+            item.start()
+
+    async def asyncTearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        await self.db.close()
+        await self.engine.dispose()
+
+    async def _add_order(self, **values) -> Order:
+        order = Order(
+            email=EMAIL,
+            total_cents=5000,
+            items=[OrderItem(name="Peonies", price_cents=5000, quantity=1, image="")],
+            **values,
+        )
+        self.db.add(order)
+        await self.db.commit()
+        return order
+
+    async def _start_checkout(self, payment_method: str, items: list[CheckoutItemIn]):
+        self.db.add(
+            Bouquet(
+                id="peony",
+                name="Peony Cloud",
+                description="Test bouquet",
+                price_cents=6000,
+                flower_type=FlowerType.PEONY,
+                style="PEONY",
+                bouquet_type=BouquetType.MONO.value,
+                colors="pink",
+                image="/images/peony.webp",
+            )
+        )
+        await self.db.commit()
+        delivery_date = date.today() + timedelta(days=2)
+        payload = CheckoutRequest(
+            items=items,
+            address="123 Main St, Chicago, IL 60601",
+            delivery_date_time=json.dumps(
+                {
+                    "date": delivery_date.isoformat(),
+                    "timeWindow": "12 PM - 4 PM",
+                    "idealTime": "1:00 PM",
+                }
+            ),
+            phone="+1 312 555 0123",
+            email=EMAIL,
+            payment_method=payment_method,
+        )
+        quote = DeliveryQuote(ok=True, miles=5.0, distance_text="5.0 mi", fee_cents=1500)
+        with patch.object(
+            checkout_routes, "get_delivery_quote", AsyncMock(return_value=quote)
+        ):
+            response = await checkout_routes.start_checkout(
+                payload, make_request(), user=None, db=self.db
+            )
+        return response, delivery_date
+
+    async def _events(self, order_id: str) -> list[str]:
+        result = await self.db.execute(
+            select(PaymentEvent.event).where(PaymentEvent.order_id == order_id)
+        )
+        return list(result.scalars())
+
+    async def test_stripe_webhook_marks_order_paid_once(self):
+        order = await self._add_order(stripe_session_id="cs_test_1")
+        event = {
+            "id": "evt_1",
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "id": "cs_test_1",
+                    "status": "complete",
+                    "payment_status": "paid",
+                    "amount_total": 5000,
+                    "currency": "usd",
+                    "metadata": {"orderId": order.id},
+                }
+            },
+        }
+        admin_email = AsyncMock()
+        customer_email = AsyncMock()
+        with patch.object(
+            stripe_routes.stripe.Webhook, "construct_event", return_value=event
+        ), patch.object(stripe_routes, "send_admin_order_email", admin_email), patch.object(
+            stripe_routes, "send_customer_order_email", customer_email
+        ):
+            request = make_request(json.dumps(event).encode(), {"stripe-signature": "sig"})
+            first = await stripe_routes.stripe_webhook(request, db=self.db)
+            second = await stripe_routes.stripe_webhook(request, db=self.db)
+
+        self.assertEqual(first, {"received": True})
+        self.assertEqual(second, {"received": True})
+        await self.db.refresh(order)
+        self.assertEqual(order.status, OrderStatus.PAID)
+        admin_email.assert_awaited_once()
+        self.assertEqual(admin_email.await_args.args[0]["items"][0]["name"], "Peonies")
+        processed = await self.db.execute(select(WebhookEvent.event_id))
+        self.assertEqual(list(processed.scalars()), ["evt_1"])
+        self.assertIn("stripe_payment_marked_paid", await self._events(order.id))
+
+    async def test_checkout_status_reports_closed_order_without_provider_sync(self):
+        order = await self._add_order(status=OrderStatus.FAILED)
+        user = SimpleNamespace(id=None, email=EMAIL)
+
+        response = await checkout_routes.checkout_status(
+            CheckoutStatusRequest(order_id=order.id), make_request(), user=user, db=self.db
+        )
+
+        self.assertEqual(response.status, OrderStatus.FAILED.value)
+        self.assertCountEqual(
+            await self._events(order.id),
+            ["checkout_status_requested", "checkout_status_resolved"],
+        )
+
+    async def test_checkout_status_syncs_pending_order_through_gateway(self):
+        order = await self._add_order(stripe_session_id="cs_test_2")
+        session = {
+            "id": "cs_test_2",
+            "status": "complete",
+            "payment_status": "paid",
+            "amount_total": 5000,
+            "currency": "usd",
+            "metadata": {"orderId": order.id},
+        }
+        stripe_gateway.reset_stats()
+        with patch.object(
+            order_service.stripe.checkout.Session, "retrieve", return_value=session
+        ) as retrieve:
+            response = await checkout_routes.checkout_status(
+                CheckoutStatusRequest(order_id=order.id),
+                make_request(),
+                user=SimpleNamespace(id=None, email=EMAIL),
+                db=self.db,
+            )
+
+        self.assertEqual(response.status, OrderStatus.PAID.value)
+        retrieve.assert_called_once_with(
+            "cs_test_2", expand=order_service.STRIPE_SESSION_EXPAND
+        )
+        self.assertEqual(stripe_gateway.stats()["checkout.Session.retrieve"]["calls"], 1)
+
+    async def test_cancel_checkout_cancels_pending_order_and_releases_slot(self):
+        day = date(2026, 2, 14)
+        window = "12 PM - 4 PM"
+        self.db.add(DeliverySlot(delivery_date=day, window=window, capacity=3, reserved=1))
+        order = await self._add_order(
+            delivery_date=day, delivery_window=window, delivery_slot_reserved=True
+        )
+        user = SimpleNamespace(id=None, email=EMAIL)
+
+        response = await checkout_routes.cancel_checkout(
+            CheckoutCancelRequest(order_id=order.id), make_request(), user=user, db=self.db
+        )
+
+        self.assertTrue(response.canceled)
+        self.assertEqual(response.status, OrderStatus.CANCELED.value)
+        reserved = await self.db.execute(select(DeliverySlot.reserved))
+        self.assertEqual(reserved.scalar_one(), 0)
+        self.assertIn("checkout_marked_canceled", await self._events(order.id))
+
+    async def test_start_checkout_creates_stripe_session_with_item_images(self):
+        session = SimpleNamespace(
+            id="cs_new", url="https://checkout.stripe.test/cs_new", status="open"
+        )
+        items = [
+            CheckoutItemIn(id="peony", quantity=1),
+            CheckoutItemIn(
+                id="custom-1",
+                quantity=1,
+                name="Custom bouquet",
+                price_cents=9500,
+                image="https://cdn.example.com/custom.webp",
+                is_custom=True,
+            ),
+        ]
+        with patch.object(
+            checkout_routes.stripe.checkout.Session, "create", return_value=session
+        ) as create:
+            response, delivery_date = await self._start_checkout("stripe", items)
+
+        self.assertEqual(response.url, session.url)
+        self.assertEqual(response.provider, "stripe")
+        line_items = create.call_args.kwargs["line_items"]
+        self.assertEqual(
+            [line["price_data"]["product_data"]["images"] for line in line_items],
+            [
+                [f"{checkout_routes.settings.resolved_site_url()}/images/peony.webp"],
+                ["https://cdn.example.com/custom.webp"],
+                [],
+            ],
+        )
+        order = await self.db.get(Order, response.order_id)
+        self.assertEqual(order.stripe_session_id, "cs_new")
+        self.assertEqual(order.status, OrderStatus.PENDING)
+        self.assertTrue(order.delivery_slot_reserved)
+        slot = (await self.db.execute(select(DeliverySlot))).scalar_one()
+        self.assertEqual((slot.delivery_date, slot.reserved), (delivery_date, 1))
+        self.assertIn("stripe_checkout_session_created", await self._events(order.id))
+
+    async def test_start_checkout_rejects_full_window_without_order_or_session(self):
+        delivery_date = date.today() + timedelta(days=2)
+        self.db.add(
+            DeliverySlot(
+                delivery_date=delivery_date, window="12 PM - 4 PM", capacity=1, reserved=1
+            )
+        )
+        await self.db.commit()
+        with patch.object(checkout_routes.stripe.checkout.Session, "create") as create:
+            with self.assertRaises(HTTPException) as ctx:
+                await self._start_checkout(
+                    "stripe", [CheckoutItemIn(id="peony", quantity=1)]
+                )
+
+        self.assertEqual(ctx.exception.status_code, 409)
+        create.assert_not_called()
+        self.assertEqual(await self.db.scalar(select(func.count(Order.id))), 0)
+        slot = (await self.db.execute(select(DeliverySlot))).scalar_one()
+        self.assertEqual(slot.reserved, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.bouquets import (
+    BOUQUET_BATCH_MAX_IDS,
+    get_bouquet_batch,
+    post_bouquet_batch,
+)
+from app.core.database import Base
+from app.models.bouquet import Bouquet
+from app.models.enums import FlowerType
+from app.schemas.catalog import BouquetBatchRequest
+from app.services.settings import invalidate_store_settings_cache, update_store_settings
+
+
+def make_request(if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode("latin-1")))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class BouquetBatchTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_store_settings_cache()
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        for bouquet_id, active in (("a", True), ("b", True), ("c", False)):
+            self.db.add(
+                Bouquet(
+                    id=bouquet_id,
+                    name=f"Bouquet {bouquet_id}",
+                    description="Test bouquet",
+                    price_cents=10000,
+                    flower_type=FlowerType.ROSE,
+                    style="ROSE",
+                    colors="red",
+                    is_active=active,
+                    image="/images/mock.webp",
+                )
+            )
+        self.db.commit()
+        update_store_settings(self.db, {"global_discount_percent": 10})
+        self.selects = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_select)
+
+    def tearDown(self):
+        event.remove(self.engine, "before_cursor_execute", self._count_select)
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        invalidate_store_settings_cache()
+
+    def _count_select(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.selects += 1
+
+    def test_get_prices_found_ids_and_reports_missing_and_inactive(self):
+        response = Response()
+        result = get_bouquet_batch(make_request(), response, ids="b, zz,a,c,a", db=self.db)
+
+        self.assertEqual([item.bouquet.id for item in result.items], ["a", "b"])
+        self.assertEqual(result.items[0].pricing.final_price_cents, 9000)
+        self.assertEqual(result.missing, ["zz"])
+        self.assertEqual(result.inactive, ["c"])
+        self.assertEqual(self.selects, 1)
+
+        # Same id set in another order revalidates against the same ETag.
+        not_modified = get_bouquet_batch(
+            make_request(response.headers["etag"]), Response(), ids="c,a,zz,b", db=self.db
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_post_accepts_long_lists_and_enforces_limit(self):
+        result = post_bouquet_batch(BouquetBatchRequest(ids=["c", "b"]), db=self.db)
+        self.assertEqual([item.bouquet.id for item in result.items], ["b"])
+        self.assertEqual(result.inactive, ["c"])
+
+        too_many = [f"id-{index}" for index in range(BOUQUET_BATCH_MAX_IDS + 1)]
+        with self.assertRaises(HTTPException) as ctx:
+            post_bouquet_batch(BouquetBatchRequest(ids=too_many), db=self.db)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import Float, and_, create_engine, func, literal, or_, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import catalog as catalog_routes
+from app.api.routes.catalog import (
+    _build_catalog_filters,
+    _catalog_sql_filters,
+    _list_catalog_from_db,
+    _search_match_and_rank,
+    list_catalog,
+    search_catalog,
+)
+from app.core.database import Base
+from app.models.bouquet import Bouquet
+from app.models.enums import FlowerType
+from app.services.bouquet_tokens import apply_search_tokens
+from app.services.catalog_snapshot import (
+    CATALOG_SORTS,
+    build_catalog_snapshot,
+    clear_catalog_snapshot,
+    decode_catalog_cursor,
+    refresh_catalog_snapshot,
+)
+from app.services.settings import invalidate_store_settings_cache, update_store_settings
+
+
+def _term_match_and_rank(query_text: str):
+    """Stand-in for the Postgres tsvector expression on SQLite: every term must
+    appear in an indexed field and all matches rank equally."""
+    columns = (Bouquet.name, Bouquet.description, Bouquet.style, Bouquet.colors)
+    clauses = [
+        or_(*[func.lower(column).contains(term) for column in columns])
+        for term in query_text.lower().split()
+    ]
+    return and_(*clauses), literal(0.0, Float)
+
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+FIXTURES = [
+    ("Blush Sonata", 9800, "ROSE", "ROSE, RANUNCULUSES", "MIXED", "pink, white", True, True),
+    ("velvet tulip", 7600, "TULIP", "TULIP", "MONO", "burgundy, pink", False, True),
+    ("Cloud", 11200, "HYDRANGEAS", "HYDRANGEAS, ROSE", "MIXED", "white, light blue", True, False),
+    ("Peony Muse", 13400, "PEONY", "PEONY", "MONO", "hot pink, cream", False, False),
+    ("Spray Joy", 7600, "SPRAY_ROSES", "SPRAY_ROSES", "SEASON", "peach", False, False),
+    ("Orchid Line", 15000, "ORCHID", "ORCHID", "MONO", "ivory, lavender", False, True),
+    ("cloud", 11200, "ROSE", "ROSE", "MONO", "red", False, False),
+    ("Garden Mix", 9900, "RANUNCULUSES", "RANUNCULUSES, TULIP, PEONY", "MIXED", "coral, yellow", True, False),
+]
+
+
+class CatalogSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        for index, (name, price, flower, style, kind, colors, is_mixed, featured) in enumerate(
+            FIXTURES
+        ):
+            bouquet = Bouquet(
+                id=f"b{index:02d}",
+                name=name,
+                description="Test bouquet",
+                price_cents=price,
+                flower_type=FlowerType(flower),
+                style=style,
+                bouquet_type=kind,
+                colors=colors,
+                is_mixed=is_mixed,
+                is_featured=featured,
+                image="/images/mock.webp",
+                # Two bouquets share a timestamp to exercise id tie-breaking.
+                created_at=BASE_TIME + timedelta(hours=min(index, 5)),
+            )
+            apply_search_tokens(bouquet)
+            self.db.add(bouquet)
+        hidden = Bouquet(
+            id="b99",
+            name="Hidden",
+            description="Inactive bouquet",
+            price_cents=8000,
+            flower_type=FlowerType.ROSE,
+            style="ROSE",
+            bouquet_type="MONO",
+            colors="red",
+            is_active=False,
+            image="/images/mock.webp",
+            created_at=BASE_TIME,
+        )
+        apply_search_tokens(hidden)
+        self.db.add(hidden)
+        self.db.commit()
+        update_store_settings(self.db, {"global_discount_percent": 10})
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        invalidate_store_settings_cache()
+
+    def _collect_sql(self, filters, sort, take):
+        pages = []
+        cursor = None
+        while True:
+            page = _list_catalog_from_db(
+                self.db,
+                filters,
+                normalized_sort=sort,
+                cursor=decode_catalog_cursor(cursor) if cursor else None,
+                take=take,
+            )
+            pages.append(
+                ([item.model_dump() for item in page.items], page.next_cursor)
+            )
+            if not page.next_cursor:
+                return pages
+            cursor = page.next_cursor
+
+    def _collect_snapshot(self, snapshot, filters, sort, take):
+        pages = []
+        cursor = None
+        while True:
+            page = snapshot.query(
+                filters,
+                sort=sort,
+                cursor=decode_catalog_cursor(cursor) if cursor else None,
+                take=take,
+            )
+            pages.append(
+                ([item.model_dump() for item in page.items], page.next_cursor)
+            )
+            if not page.next_cursor:
+                return pages
+            cursor = page.next_cursor
+
+    def test_snapshot_matches_sql_path_for_filters_sorts_and_pages(self):
+        snapshot = build_catalog_snapshot(self.db)
+        filter_cases = [
+            {},
+            {"filter": "featured"},
+            {"flower": "rose"},
+            {"flower": "tulip,peony,mixed"},
+            {"color": "pink"},
+            {"color": "blush"},
+            {"color": "ivory"},
+            {"bouquet_type": "mono"},
+            {"mixed": "mixed"},
+            {"style": "season"},
+            {"min": 90.0, "max": 120.0},
+            {"min": 76.0},
+            {"flower": "rose", "color": "white", "max": 115.0},
+        ]
+        for raw in filter_cases:
+            params = {
+                "flower": None,
+                "color": None,
+                "bouquet_type": None,
+                "style": None,
+                "mixed": None,
+                "min": None,
+                "max": None,
+                "filter": None,
+                **raw,
+            }
+            filters = _build_catalog_filters(**params)
+            for sort in CATALOG_SORTS:
+                for take in (1, 3, 50):
+                    with self.subTest(filters=raw, sort=sort, take=take):
+                        self.assertEqual(
+                            self._collect_snapshot(snapshot, filters, sort, take),
+                            self._collect_sql(filters, sort, take),
+                        )
+
+    def test_snapshot_excludes_inactive_rows_and_prices_with_settings(self):
+        snapshot = build_catalog_snapshot(self.db)
+        filters = _build_catalog_filters(
+            flower=None,
+            color=None,
+            bouquet_type=None,
+            style=None,
+            mixed=None,
+            min=None,
+            max=None,
+            filter=None,
+        )
+        page = snapshot.query(filters, sort="created_desc", cursor=None, take=50)
+
+        self.assertEqual(len(page.items), len(FIXTURES))
+        self.assertNotIn("b99", snapshot.positions["created_desc"])
+        self.assertEqual(page.items[0].pricing.discount.source, "global")
+        self.assertEqual(
+            page.items[0].pricing.final_price_cents,
+            round(page.items[0].pricing.original_price_cents * 0.9),
+        )
+
+    def test_color_and_flower_filters_match_whole_tokens(self):
+        snapshot = build_catalog_snapshot(self.db)
+        for raw, expected in (
+            ({"color": "pink"}, {"b00", "b01"}),
+            ({"color": "hot pink"}, {"b03"}),
+            ({"flower": "rose"}, {"b00", "b02", "b06"}),
+            ({"flower": "spray_roses"}, {"b04"}),
+        ):
+            params = {
+                "flower": None,
+                "color": None,
+                "bouquet_type": None,
+                "style": None,
+                "mixed": None,
+                "min": None,
+                "max": None,
+                "filter": None,
+                **raw,
+            }
+            filters = _build_catalog_filters(**params)
+            with self.subTest(filters=raw):
+                sql_page = _list_catalog_from_db(
+                    self.db, filters, normalized_sort="created_desc", cursor=None, take=50
+                )
+                snapshot_page = snapshot.query(
+                    filters, sort="created_desc", cursor=None, take=50
+                )
+                self.assertEqual({item.bouquet.id for item in sql_page.items}, expected)
+                self.assertEqual({item.bouquet.id for item in snapshot_page.items}, expected)
+
+    def test_unknown_color_tokens_are_not_cached(self):
+        snapshot = build_catalog_snapshot(self.db)
+        known = dict(snapshot.color_masks)
+
+        for token in ("chartreuse", "not-a-color", "x" * 200):
+            self.assertEqual(snapshot.color_mask(token), 0)
+
+        self.assertEqual(snapshot.color_masks, known)
+        self.assertTrue(snapshot.color_mask("pink"))
+
+    def test_overlap_filter_compiles_to_array_operator_on_postgres(self):
+        filters = _build_catalog_filters(
+            flower="rose",
+            color="pink",
+            bouquet_type=None,
+            style=None,
+            mixed=None,
+            min=None,
+            max=None,
+            filter=None,
+        )
+        statement = select(Bouquet.id).where(*_catalog_sql_filters(filters))
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        self.assertIn('"Bouquet"."flowerTypes" && CAST(ARRAY[', sql)
+        self.assertIn('"Bouquet"."colorTokens" && CAST(ARRAY[', sql)
+        self.assertNotIn("LIKE", sql)
+
+    def _list(self, cursor=None, sort="price_asc", take=3):
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+        return list_catalog(
+            request,
+            Response(),
+            flower=None,
+            color=None,
+            bouquet_type=None,
+            style=None,
+            mixed=None,
+            min=None,
+            max=None,
+            sort=sort,
+            filter=None,
+            cursor=cursor,
+            take=take,
+            db=self.db,
+        )
+
+    def test_pagination_survives_anchor_deactivation(self):
+        clear_catalog_snapshot()
+        self.addCleanup(clear_catalog_snapshot)
+        first = self._list()
+        anchor_id = first.items[-1].bouquet.id
+        self.assertNotIn(anchor_id, first.next_cursor)
+        expected = [item.bouquet.id for item in self._list(cursor=first.next_cursor).items]
+
+        anchor = self.db.get(Bouquet, anchor_id)
+        anchor.is_active = False
+        self.db.commit()
+        refresh_catalog_snapshot(self.db)
+
+        second = self._list(cursor=first.next_cursor)
+        self.assertEqual([item.bouquet.id for item in second.items], expected)
+
+    def test_rejects_tampered_or_mismatched_cursor(self):
+        clear_catalog_snapshot()
+        self.addCleanup(clear_catalog_snapshot)
+        cursor = self._list().next_cursor
+        body, signature = cursor.split(".")
+        for bad_cursor, sort in (
+            ("b00", "price_asc"),
+            (f"{body}.{signature[::-1]}", "price_asc"),
+            (f"{body}.{signature[:-1]}\u00e9", "price_asc"),
+            (f"{body}\u00e9.{signature}", "price_asc"),
+            (cursor, "name_asc"),
+        ):
+            with self.subTest(cursor=bad_cursor, sort=sort):
+                with self.assertRaises(HTTPException) as ctx:
+                    self._list(cursor=bad_cursor, sort=sort)
+                self.assertEqual(ctx.exception.status_code, 400)
+
+    def _search(self, q, cursor=None, take=12, **filters):
+        params = {
+            "flower": None,
+            "color": None,
+            "bouquet_type": None,
+            "style": None,
+            "mixed": None,
+            "min": None,
+            "max": None,
+            "filter": None,
+            **filters,
+        }
+        with patch.object(catalog_routes, "_search_match_and_rank", _term_match_and_rank):
+            return search_catalog(q=q, cursor=cursor, take=take, db=self.db, **params)
+
+    def test_search_combines_filters_and_pages_with_keyset_cursor(self):
+        self.assertEqual(
+            {item.bouquet.id for item in self._search("cloud").items}, {"b02", "b06"}
+        )
+        self.assertEqual(
+            [item.bouquet.id for item in self._search("cloud", flower="hydrangeas").items],
+            ["b02"],
+        )
+        self.assertEqual(
+            {item.bouquet.id for item in self._search("  PINK   ").items},
+            {"b00", "b01", "b03"},
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            page = self._search("test bouquet", cursor=cursor, take=3)
+            seen.extend(item.bouquet.id for item in page.items)
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, sorted((f"b{index:02d}" for index in range(8)), reverse=True))
+
+        # A cursor is bound to the query it was issued for.
+        with self.assertRaises(HTTPException) as ctx:
+            self._search("bouquet", cursor=cursor)
+        self.assertEqual(ctx.exception.status_code, 400)
+        with self.assertRaises(HTTPException) as ctx:
+            self._search("test bouquet", cursor=f"{cursor[:-1]}\u00e9")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_search_uses_tsvector_match_and_rank_on_postgres(self):
+        match, rank = _search_match_and_rank("pink roses")
+        sql = str(
+            select(Bouquet.id)
+            .where(match)
+            .order_by(rank.desc())
+            .compile(dialect=postgresql.dialect())
+        )
+        self.assertIn('"Bouquet"."searchVector" @@ websearch_to_tsquery(', sql)
+        self.assertIn("ts_rank(", sql)
+
+    def _sql_count(self, filters):
+        page = _list_catalog_from_db(
+            self.db, filters, normalized_sort="created_desc", cursor=None, take=1000
+        )
+        return len(page.items)
+
+    def test_facets_match_sql_counts_excluding_own_dimension(self):
+        snapshot = build_catalog_snapshot(self.db)
+        for raw in ({}, {"flower": "rose"}, {"color": "pink", "mixed": "mixed"}, {"max": 100.0}):
+            params = {
+                "flower": None,
+                "color": None,
+                "bouquet_type": None,
+                "style": None,
+                "mixed": None,
+                "min": None,
+                "max": None,
+                "filter": None,
+                **raw,
+            }
+            filters = _build_catalog_filters(**params)
+            facets = snapshot.facets(filters)
+            with self.subTest(filters=raw):
+                self.assertIs(snapshot.facets(filters), facets)
+                self.assertEqual(facets.total, self._sql_count(filters))
+                for value, count in facets.flowers:
+                    expected = self._sql_count(
+                        _build_catalog_filters(**{**params, "flower": value})
+                    )
+                    self.assertEqual(count, expected, value)
+                for value, count in facets.colors:
+                    expected = self._sql_count(
+                        _build_catalog_filters(**{**params, "color": value})
+                    )
+                    self.assertEqual(count, expected, value)
+                for value, count in facets.bouquet_types:
+                    expected = self._sql_count(
+                        _build_catalog_filters(
+                            **{**params, "mixed": None, "style": None, "bouquet_type": value}
+                        )
+                    )
+                    self.assertEqual(count, expected, value)
+                unpriced = _build_catalog_filters(**{**params, "min": None, "max": None})
+                self.assertEqual(
+                    sum(bucket.count for bucket in facets.price_histogram),
+                    self._sql_count(unpriced),
+                )
+                for bucket in facets.price_histogram:
+                    self.assertEqual(
+                        bucket.count,
+                        self._sql_count(
+                            _build_catalog_filters(
+                                **{
+                                    **params,
+                                    "min": bucket.min_cents / 100,
+                                    "max": bucket.max_cents / 100,
+                                }
+                            )
+                        ),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import checkout as checkout_routes
+from app.api.routes.checkout import quote_checkout
+from app.core.database import Base
+from app.models.bouquet import Bouquet
+from app.models.enums import BouquetType, FlowerType, OrderStatus
+from app.models.order import Order
+from app.schemas.checkout import CheckoutItemIn, CheckoutQuoteRequest
+from app.services.settings import invalidate_store_settings_cache, update_store_settings
+from app.utils import client_keys
+
+
+def make_request(client_ip: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", client_ip.encode())] if client_ip else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers})
+
+
+class CheckoutQuoteTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_store_settings_cache()
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all(
+            [
+                Bouquet(
+                    id="mono",
+                    name="Mono Roses",
+                    description="Test bouquet",
+                    price_cents=10000,
+                    flower_type=FlowerType.ROSE,
+                    style="ROSE",
+                    bouquet_type=BouquetType.MONO.value,
+                    colors="red",
+                    allow_flower_quantity=True,
+                    image="/images/mock.webp",
+                ),
+                Bouquet(
+                    id="promo",
+                    name="Promo Mix",
+                    description="Test bouquet",
+                    price_cents=8000,
+                    flower_type=FlowerType.TULIP,
+                    style="TULIP",
+                    bouquet_type=BouquetType.MIXED.value,
+                    colors="pink",
+                    discount_percent=25,
+                    image="/images/mock.webp",
+                ),
+            ]
+        )
+        self.db.commit()
+        update_store_settings(self.db, {"first_order_discount_percent": 10})
+        self.writes: list[str] = []
+        event.listen(self.engine, "before_cursor_execute", self._record_write)
+
+    def tearDown(self):
+        checkout_routes.quote_rate_limit.clear()
+        event.remove(self.engine, "before_cursor_execute", self._record_write)
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        invalidate_store_settings_cache()
+
+    def _record_write(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            self.writes.append(statement)
+
+    def _quote(self, items, user=None, client_ip=None):
+        payload = CheckoutQuoteRequest(items=[CheckoutItemIn(**item) for item in items])
+        return quote_checkout(payload, make_request(client_ip), user=user, db=self.db)
+
+    def test_quote_applies_first_order_discount_for_new_user_without_writes(self):
+        quote = self._quote(
+            [{"id": "mono", "quantity": 12}],
+            user=SimpleNamespace(id="u2", email="New@Example.com"),
+        )
+
+        self.assertEqual(quote.first_order_discount_percent, 10)
+        self.assertEqual(quote.items[0].unit_price_cents, 9000)
+        self.assertEqual(quote.items[0].details, "Flowers: 12")
+        self.assertEqual(quote.subtotal_cents, 9000 * 12)
+        self.assertEqual(self.writes, [])
+
+    def test_quote_skips_first_order_discount_when_blocked_or_unknown(self):
+        self.db.add(Order(email="repeat@example.com", total_cents=100, status=OrderStatus.PAID))
+        self.db.commit()
+        self.writes.clear()
+
+        repeat = self._quote(
+            [{"id": "mono", "quantity": 1}],
+            user=SimpleNamespace(id="u1", email="Repeat@example.com"),
+        )
+        anonymous = self._quote([{"id": "mono", "quantity": 1}])
+        discounted = self._quote(
+            [{"id": "promo", "quantity": 2}],
+            user=SimpleNamespace(id="u2", email="new@example.com"),
+        )
+
+        self.assertEqual(repeat.first_order_discount_percent, 0)
+        self.assertEqual(anonymous.first_order_discount_percent, 0)
+        self.assertEqual(discounted.first_order_discount_percent, 0)
+        self.assertTrue(discounted.has_item_discount)
+        self.assertEqual(discounted.subtotal_cents, 6000 * 2)
+        self.assertEqual(self.writes, [])
+
+    def test_guest_quote_ignores_email_and_is_rate_limited(self):
+        payload = CheckoutQuoteRequest.model_validate(
+            {"items": [{"id": "mono", "quantity": 1}], "email": "new@example.com"}
+        )
+        guest = quote_checkout(payload, make_request(), user=None, db=self.db)
+
+        self.assertEqual(guest.first_order_discount_percent, 0)
+        self.assertEqual(guest.subtotal_cents, 10000)
+
+        with patch.object(client_keys.settings, "trust_proxy_headers", True), patch.object(
+            checkout_routes, "QUOTE_RATE_LIMIT", 1
+        ):
+            self._quote([{"id": "mono", "quantity": 1}], client_ip="10.0.0.1")
+            with self.assertRaises(HTTPException) as ctx:
+                self._quote([{"id": "mono", "quantity": 1}], client_ip="10.0.0.1")
+            self._quote(
+                [{"id": "mono", "quantity": 1}],
+                user=SimpleNamespace(id="u2", email="new@example.com"),
+                client_ip="10.0.0.1",
+            )
+        self.assertEqual(ctx.exception.status_code, 429)
+
+    def test_quote_rejects_unavailable_items(self):
+        with self.assertRaises(HTTPException) as ctx:
+            self._quote([{"id": "missing", "quantity": 1}])
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
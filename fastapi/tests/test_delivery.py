@@ -7,7 +7,8 @@ from unittest.mock import AsyncMock, patch
 
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 
-from app.services import delivery
+from app.core.security import create_delivery_quote_token
+from app.services import delivery, delivery_cache
 
 
 class _FakeResponse:
@@ -128,8 +129,49 @@ class DeliveryValidationTests(unittest.TestCase):
         self.assertEqual(delivery.delivery_quote_failure_level(technical), logging.ERROR)
         self.assertEqual(delivery.delivery_quote_failure_level(user_input), logging.WARNING)
 
+    def test_delivery_quote_token_round_trip_is_bound_to_address(self):
+        quote = delivery.DeliveryQuote(
+            ok=True, miles=14.2, distance_text="14.2 mi", fee_cents=1500
+        )
+        token = delivery.issue_delivery_quote_token("123 Main St, Chicago, IL", quote)
+
+        restored = delivery.delivery_quote_from_token(token, "123 main st,Chicago, IL")
+        self.assertIsNotNone(restored)
+        self.assertTrue(restored.ok)
+        self.assertEqual(restored.fee_cents, 1500)
+        self.assertEqual(restored.miles, 14.2)
+        self.assertEqual(restored.distance_text, "14.2 mi")
+        self.assertIsNone(delivery.delivery_quote_from_token(token, "9 Other St, Chicago, IL"))
+        tampered = token[:-2] + "xx"
+        self.assertIsNone(delivery.delivery_quote_from_token(tampered, "123 Main St, Chicago, IL"))
+        self.assertIsNone(delivery.delivery_quote_from_token(None, "123 Main St, Chicago, IL"))
+
+    def test_expired_delivery_quote_token_is_ignored(self):
+        token = create_delivery_quote_token(
+            address_key="123 main st, chicago, il",
+            miles=4.0,
+            fee_cents=0,
+            distance_text="4 mi",
+            expires_minutes=-1,
+        )
+        self.assertIsNone(delivery.delivery_quote_from_token(token, "123 Main St, Chicago, IL"))
+
 
 class DeliveryQuoteTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        delivery_cache.clear_delivery_cache()
+        self.cache_patches = [
+            patch.object(delivery, "get_cached_delivery_lookup", AsyncMock(return_value=None)),
+            patch.object(delivery_cache, "_save_to_db", lambda entry: None),
+        ]
+        for item in self.cache_patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.cache_patches):
+            item.stop()
+        delivery_cache.clear_delivery_cache()
+
     async def test_delivery_quote_requires_address(self):
         quote = await delivery.get_delivery_quote("   ")
         self.assertFalse(quote.ok)
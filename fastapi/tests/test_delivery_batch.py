@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException
+
+from app.api.routes import delivery as delivery_routes
+from app.schemas.delivery import DeliveryBatchQuoteRequest
+from app.services import delivery, delivery_cache
+
+
+async def _geocode(address: str, _api_key: str):
+    return delivery.DeliveryValidationResult(
+        ok=True,
+        formatted_address=f"{address}, USA",
+        lat=41.88,
+        lng=-87.62,
+        provider_status="OK",
+    )
+
+
+async def _distances(_base_address: str, destinations: list[str], _api_key: str):
+    return [
+        delivery.DistanceMeasurement(miles=12.5, distance_text="12.5 mi", provider_status="OK")
+        for _ in destinations
+    ]
+
+
+class DeliveryBatchQuoteTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        delivery_cache.clear_delivery_cache()
+        delivery.google_maps_breaker.reset()
+        self.geocode = AsyncMock(side_effect=_geocode)
+        self.distances = AsyncMock(side_effect=_distances)
+        self.patches = [
+            patch.object(delivery.settings, "google_maps_api_key", "test-key"),
+            # About 8 straight-line miles from the geocoded point, so every
+            # address still needs the distance matrix.
+            patch.object(delivery.settings, "delivery_base_lat", 41.996),
+            patch.object(delivery.settings, "delivery_base_lng", -87.62),
+            patch.object(delivery_cache, "_load_from_db", lambda _key: None),
+            patch.object(delivery_cache, "_save_to_db", lambda _entry: None),
+            patch.object(delivery, "_validate_and_geocode", self.geocode),
+            patch.object(delivery, "_fetch_distances", self.distances),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        delivery_cache.clear_delivery_cache()
+        delivery.google_maps_breaker.reset()
+
+    async def _collect(self, addresses: list[str]) -> dict[int, delivery.DeliveryQuote]:
+        return {index: quote async for index, quote in delivery.quote_delivery_batch(addresses)}
+
+    async def test_packs_destinations_into_matrix_requests(self):
+        addresses = [f"{100 + number} Main St, Chicago, IL" for number in range(30)]
+        results = await self._collect(addresses)
+
+        self.assertEqual(len(results), 30)
+        self.assertTrue(all(quote.ok and quote.fee_cents == 1500 for quote in results.values()))
+        self.assertEqual(
+            [len(call.args[1]) for call in self.distances.await_args_list], [25, 5]
+        )
+
+    async def test_duplicates_and_cached_addresses_skip_provider_calls(self):
+        await delivery.get_delivery_quote("1 Oak St, Chicago, IL")
+        self.geocode.reset_mock()
+        self.distances.reset_mock()
+
+        results = await self._collect(
+            ["1 Oak St, Chicago, IL", "2 Elm St, Chicago, IL", "2 elm st,  Chicago, IL"]
+        )
+
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertIs(results[1], results[2])
+        self.geocode.assert_awaited_once()
+        self.assertEqual([call.args[1] for call in self.distances.await_args_list], [
+            ["2 Elm St, Chicago, IL, USA"]
+        ])
+
+    async def test_invalid_input_is_reported_per_line(self):
+        results = await self._collect(["", "5 Pine St, Chicago, IL"])
+
+        self.assertFalse(results[0].ok)
+        self.assertEqual(results[0].code, "delivery_address_missing")
+        self.assertTrue(results[1].ok)
+
+    async def test_failing_address_yields_error_line(self):
+        async def flaky_geocode(address: str, api_key: str):
+            if address.startswith("9 "):
+                raise RuntimeError("unexpected payload")
+            return await _geocode(address, api_key)
+
+        self.geocode.side_effect = flaky_geocode
+        with self.assertLogs("app.critical", level="ERROR"):
+            results = await self._collect(
+                ["9 Ash St, Chicago, IL", "10 Ash St, Chicago, IL", "9 ash st, Chicago, IL"]
+            )
+
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertFalse(results[0].ok)
+        self.assertEqual(results[0].code, "delivery_batch_failed")
+        self.assertIs(results[0], results[2])
+        self.assertTrue(results[1].ok)
+
+    async def test_route_streams_ndjson(self):
+        response = await delivery_routes.quote_delivery_batch_admin(
+            DeliveryBatchQuoteRequest(addresses=["7 Birch St, Chicago, IL"]), _admin=None
+        )
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        lines = [json.loads(chunk) async for chunk in response.body_iterator]
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["index"], 0)
+        self.assertEqual(lines[0]["feeCents"], 1500)
+        self.assertEqual(lines[0]["distanceText"], "12.5 mi")
+
+    async def test_route_rejects_oversized_batch(self):
+        payload = DeliveryBatchQuoteRequest(
+            addresses=["1 Main St, Chicago, IL"] * (delivery_routes.DELIVERY_BATCH_MAX_ADDRESSES + 1)
+        )
+        with self.assertRaises(HTTPException) as ctx:
+            await delivery_routes.quote_delivery_batch_admin(payload, _admin=None)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from app.services import delivery, delivery_cache
+from app.services.circuit_breaker import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.transitions: list[tuple[str, str]] = []
+        self.breaker = CircuitBreaker(
+            "test",
+            minimum_calls=4,
+            failure_rate_threshold=0.5,
+            slow_call_seconds=2.0,
+            open_seconds=30.0,
+            clock=self.clock,
+            on_transition=lambda previous, state, _snapshot: self.transitions.append(
+                (previous, state)
+            ),
+        )
+
+    def test_opens_on_error_rate_and_probes_after_cooldown(self):
+        for success in (True, False, True, False):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(success=success, duration=0.1)
+
+        self.assertEqual(self.breaker.state, CIRCUIT_OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot().rejected, 1)
+
+        self.clock.now += 31
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CIRCUIT_HALF_OPEN)
+        # Only one probe at a time while half-open.
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(success=True, duration=0.1)
+
+        self.assertEqual(self.breaker.state, CIRCUIT_CLOSED)
+        self.assertEqual(
+            self.transitions,
+            [
+                (CIRCUIT_CLOSED, CIRCUIT_OPEN),
+                (CIRCUIT_OPEN, CIRCUIT_HALF_OPEN),
+                (CIRCUIT_HALF_OPEN, CIRCUIT_CLOSED),
+            ],
+        )
+
+    def test_slow_calls_open_and_failed_probe_reopens(self):
+        for _ in range(4):
+            self.breaker.allow()
+            self.breaker.record(success=True, duration=5.0)
+        self.assertEqual(self.breaker.state, CIRCUIT_OPEN)
+
+        self.clock.now += 31
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(success=False, duration=0.1)
+        self.assertEqual(self.breaker.state, CIRCUIT_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_old_calls_leave_the_rolling_window(self):
+        for _ in range(3):
+            self.breaker.allow()
+            self.breaker.record(success=False, duration=0.1)
+        self.clock.now += 61
+        self.breaker.allow()
+        self.breaker.record(success=False, duration=0.1)
+
+        self.assertEqual(self.breaker.state, CIRCUIT_CLOSED)
+        self.assertEqual(self.breaker.snapshot().calls, 1)
+
+
+class DegradedDeliveryQuoteTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        delivery.google_maps_breaker.reset()
+        delivery_cache.clear_delivery_cache()
+        self.patches = [
+            patch.object(delivery.settings, "google_maps_api_key", "test-key"),
+            patch.object(delivery.settings, "delivery_base_lat", 42.0),
+            patch.object(delivery.settings, "delivery_base_lng", -88.0),
+            patch.object(delivery, "store_delivery_lookup", AsyncMock()),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        delivery.google_maps_breaker.reset()
+        delivery_cache.clear_delivery_cache()
+
+    def _open_circuit(self):
+        for _ in range(delivery.google_maps_breaker.minimum_calls):
+            delivery.google_maps_breaker.allow()
+            delivery.google_maps_breaker.record(success=False, duration=0.1)
+        self.assertEqual(delivery.google_maps_breaker.state, CIRCUIT_OPEN)
+
+    async def test_open_circuit_fails_fast_without_degraded_mode(self):
+        self._open_circuit()
+        geocode = AsyncMock()
+        with patch.object(delivery.settings, "delivery_degraded_mode", "off"), patch.object(
+            delivery, "get_cached_delivery_lookup", AsyncMock(return_value=None)
+        ), patch.object(delivery, "_validate_and_geocode", geocode):
+            quote = await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+
+        geocode.assert_not_awaited()
+        self.assertFalse(quote.ok)
+        self.assertEqual(quote.code, "geocode_circuit_open")
+
+    async def test_open_circuit_serves_expired_cache_row(self):
+        self._open_circuit()
+        stale = delivery_cache.CachedDeliveryLookup(
+            address_key="123 main st, chicago, il",
+            base_address=delivery.settings.delivery_base_address,
+            expires_at=datetime.now(timezone.utc) - timedelta(days=1),
+            formatted_address="123 Main St, Chicago, IL",
+            miles=14.0,
+            distance_text="14 mi",
+        )
+
+        async def lookup(address_key, base_address, *, allow_stale=False):  # noqa: ARG001
+            return stale if allow_stale else None
+
+        with patch.object(delivery.settings, "delivery_degraded_mode", "cache"), patch.object(
+            delivery, "get_cached_delivery_lookup", AsyncMock(side_effect=lookup)
+        ):
+            quote = await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+
+        self.assertTrue(quote.ok)
+        self.assertEqual(quote.fee_cents, 1500)
+        self.assertEqual(quote.provider, "degraded_cache")
+
+    async def test_distance_outage_charges_upper_tier_of_estimate(self):
+        geocode = AsyncMock(
+            return_value=delivery.DeliveryValidationResult(
+                ok=True,
+                formatted_address="123 Main St, Somewhere, IL",
+                # ~8 straight-line miles north: road distance is 8-12.8 mi.
+                lat=42.0 + 8 / 69.09,
+                lng=-88.0,
+                provider_status="OK",
+            )
+        )
+        distance = AsyncMock(
+            return_value=delivery._build_failed_quote(
+                error="Unable to calculate delivery distance.",
+                stage="distance_matrix_request",
+                code="distance_matrix_request_failed",
+            )
+        )
+        with patch.object(delivery.settings, "delivery_degraded_mode", "estimate"), patch.object(
+            delivery, "get_cached_delivery_lookup", AsyncMock(return_value=None)
+        ), patch.object(delivery, "_validate_and_geocode", geocode), patch.object(
+            delivery, "_fetch_distance", distance
+        ):
+            quote = await delivery.get_delivery_quote("123 Main St, Somewhere, IL")
+
+        distance.assert_awaited_once()
+        self.assertTrue(quote.ok)
+        self.assertEqual(quote.provider, "degraded_estimate")
+        self.assertEqual(quote.fee_cents, 1500)
+        self.assertEqual(quote.details["min_fee_cents"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.delivery_geocode_cache import DeliveryGeocodeCache
+from app.services import delivery, delivery_cache
+
+
+def _fetch_distance_ok(miles: float = 12.5):
+    return AsyncMock(
+        return_value=delivery.DistanceMeasurement(
+            miles=miles, distance_text=f"{miles} mi", provider_status="OK"
+        )
+    )
+
+
+class DeliveryCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Cache reads and writes run in worker threads, so the in-memory
+        # database must be shared across connections.
+        self.engine = create_engine(
+            "sqlite+pysqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        delivery_cache.clear_delivery_cache()
+        self.patches = [
+            patch.object(delivery_cache, "SessionLocal", self.Session),
+            patch.object(delivery.settings, "google_maps_api_key", "test-key"),
+            patch.object(
+                delivery.settings, "delivery_base_address", "1995 Hicks Rd, Rolling Meadows, IL"
+            ),
+            # About 8 straight-line miles from the test address: close enough
+            # to a tier boundary that the distance matrix is still consulted.
+            patch.object(delivery.settings, "delivery_base_lat", 41.996),
+            patch.object(delivery.settings, "delivery_base_lng", -87.62),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        delivery_cache.clear_delivery_cache()
+        self.engine.dispose()
+
+    def test_normalize_delivery_address(self):
+        self.assertEqual(
+            delivery_cache.normalize_delivery_address("  123  Main St. ,Chicago ,  IL, "),
+            "123 main st, chicago, il",
+        )
+
+    async def test_repeat_quote_skips_both_provider_calls(self):
+        geocode = AsyncMock(
+            return_value=delivery.DeliveryValidationResult(
+                ok=True,
+                formatted_address="123 Main St, Chicago, IL 60601, USA",
+                lat=41.88,
+                lng=-87.62,
+                provider_status="OK",
+            )
+        )
+        distance = _fetch_distance_ok()
+        with patch.object(delivery, "_validate_and_geocode", geocode), patch.object(
+            delivery, "_fetch_distance", distance
+        ):
+            first = await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+            second = await delivery.get_delivery_quote("123 main st,  Chicago, IL")
+
+            self.assertTrue(first.ok)
+            self.assertEqual(second.fee_cents, first.fee_cents)
+            self.assertEqual(second.miles, 12.5)
+            self.assertEqual(geocode.await_count, 1)
+            self.assertEqual(distance.await_count, 1)
+
+            # A fresh process still skips Google thanks to the Postgres tier.
+            delivery_cache.clear_delivery_cache()
+            third = await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+
+        self.assertEqual(third.formatted_address, "123 Main St, Chicago, IL 60601, USA")
+        self.assertEqual(geocode.await_count, 1)
+        self.assertEqual(distance.await_count, 1)
+        self.assertEqual(delivery_cache.delivery_cache_stats()["db_hits"], 1)
+
+        db = self.Session()
+        try:
+            row = db.get(DeliveryGeocodeCache, "123 main st, chicago, il")
+            self.assertAlmostEqual(row.lat, 41.88)
+            self.assertEqual(row.miles, 12.5)
+            self.assertIsNone(row.error_code)
+        finally:
+            db.close()
+
+    async def test_zero_results_is_cached_with_short_ttl(self):
+        geocode = AsyncMock(
+            return_value=delivery.DeliveryValidationResult(
+                ok=False,
+                error="Address not found. Please check and try again.",
+                code="address_not_found",
+                provider_status="ZERO_RESULTS",
+            )
+        )
+        with patch.object(delivery, "_validate_and_geocode", geocode):
+            first = await delivery.get_delivery_quote("999 Missing St, Chicago, IL")
+            second = await delivery.get_delivery_quote("999 Missing St, Chicago, IL")
+
+        self.assertEqual(first.code, "address_not_found")
+        self.assertEqual(second.code, "address_not_found")
+        self.assertEqual(second.provider_status, "ZERO_RESULTS")
+        self.assertEqual(geocode.await_count, 1)
+        stats = delivery_cache.delivery_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["negative_hits"], 1)
+
+        db = self.Session()
+        try:
+            row = db.get(DeliveryGeocodeCache, "999 missing st, chicago, il")
+            expires_at = row.expires_at.replace(tzinfo=timezone.utc)
+        finally:
+            db.close()
+        self.assertLessEqual(
+            expires_at,
+            datetime.now(timezone.utc)
+            + timedelta(seconds=delivery.settings.delivery_cache_negative_ttl_seconds + 5),
+        )
+
+    async def test_transport_failures_are_not_cached(self):
+        geocode = AsyncMock(
+            return_value=delivery.DeliveryValidationResult(
+                ok=False, error="Unable to validate address.", code="geocode_request_failed"
+            )
+        )
+        with patch.object(delivery, "_validate_and_geocode", geocode):
+            await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+            await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+
+        self.assertEqual(geocode.await_count, 2)
+        self.assertEqual(delivery_cache.delivery_cache_stats()["stores"], 0)
+
+    async def test_expired_entry_and_moved_studio_trigger_refresh(self):
+        stale = delivery_cache.CachedDeliveryLookup(
+            address_key="123 main st, chicago, il",
+            base_address="1995 Hicks Rd, Rolling Meadows, IL",
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+            formatted_address="123 Main St, Chicago, IL",
+            miles=5.0,
+        )
+        await delivery_cache.store_delivery_lookup(stale)
+        self.assertIsNone(
+            await delivery_cache.get_cached_delivery_lookup(
+                stale.address_key, stale.base_address
+            )
+        )
+
+        fresh = delivery_cache.CachedDeliveryLookup(
+            address_key=stale.address_key,
+            base_address="Old studio, Chicago, IL",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            formatted_address="123 Main St, Chicago, IL",
+            lat=41.88,
+            lng=-87.62,
+            miles=5.0,
+        )
+        await delivery_cache.store_delivery_lookup(fresh)
+        geocode = AsyncMock()
+        distance = _fetch_distance_ok(22.0)
+        with patch.object(delivery, "_validate_and_geocode", geocode), patch.object(
+            delivery, "_fetch_distance", distance
+        ):
+            quote = await delivery.get_delivery_quote("123 Main St, Chicago, IL")
+
+        geocode.assert_not_awaited()
+        self.assertEqual(distance.await_count, 1)
+        self.assertEqual(quote.miles, 22.0)
+        self.assertEqual(quote.fee_cents, 3000)
+
+    def test_purge_removes_long_expired_rows_in_bounded_batches(self):
+        now = datetime.now(timezone.utc)
+        retention = timedelta(seconds=delivery.settings.delivery_cache_stale_retention_seconds)
+        expiries = {
+            "old a": now - retention - timedelta(days=2),
+            "old b": now - retention - timedelta(days=1),
+            "recently expired": now - timedelta(hours=1),
+            "fresh": now + timedelta(hours=1),
+        }
+        with self.Session() as db:
+            db.add_all(
+                DeliveryGeocodeCache(address_key=key, base_address="studio", expires_at=value)
+                for key, value in expiries.items()
+            )
+            db.commit()
+
+            self.assertEqual(
+                delivery_cache.purge_expired_delivery_lookups(db, now=now, limit=1), 1
+            )
+            self.assertEqual(delivery_cache.purge_expired_delivery_lookups(db, now=now), 1)
+            self.assertEqual(delivery_cache.purge_expired_delivery_lookups(db, now=now), 0)
+            remaining = db.query(DeliveryGeocodeCache.address_key).all()
+
+        self.assertEqual(sorted(key for (key,) in remaining), ["fresh", "recently expired"])
+
+
+if __name__ == "__main__":
+    unittest.main()
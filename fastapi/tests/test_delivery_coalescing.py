@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.routes import delivery as delivery_routes
+from app.schemas.delivery import DeliveryQuoteRequest
+from app.services import delivery, delivery_cache
+from app.utils import client_keys
+from app.utils.single_flight import SingleFlight
+
+
+def _request(client_ip: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/delivery/quote",
+            "headers": [(b"x-forwarded-for", client_ip.encode())],
+            "client": ("10.0.0.254", 1234),
+        }
+    )
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_one_task(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(flights.in_flight(), 1)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(*waiters), [1] * 5)
+        self.assertEqual(calls, 1)
+        self.assertEqual((flights.started, flights.joined), (1, 4))
+        self.assertEqual(flights.in_flight(), 0)
+
+    async def test_cancelled_caller_does_not_cancel_shared_task(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.run("key", work))
+        second = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        self.assertEqual(await second, "done")
+
+
+class DeliveryQuoteCoalescingTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        delivery_cache.clear_delivery_cache()
+        delivery_routes.quote_clients.clear()
+        delivery_routes.quote_bursts.clear()
+        self.patches = [
+            patch.object(delivery.settings, "google_maps_api_key", "test-key"),
+            patch.object(client_keys.settings, "trust_proxy_headers", True),
+            patch.object(delivery, "get_cached_delivery_lookup", AsyncMock(return_value=None)),
+            patch.object(delivery, "store_delivery_lookup", AsyncMock()),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        delivery_routes.quote_clients.clear()
+        delivery_routes.quote_bursts.clear()
+        delivery_cache.clear_delivery_cache()
+
+    async def test_overlapping_quotes_for_same_address_geocode_once(self):
+        release = asyncio.Event()
+
+        async def slow_geocode(address, api_key):  # noqa: ARG001
+            await release.wait()
+            return delivery.DeliveryValidationResult(
+                ok=True, formatted_address="123 Main St, Chicago, IL", provider_status="OK"
+            )
+
+        geocode = AsyncMock(side_effect=slow_geocode)
+        distance = AsyncMock(
+            return_value=delivery.DistanceMeasurement(miles=12.0, provider_status="OK")
+        )
+        with patch.object(delivery, "_validate_and_geocode", geocode), patch.object(
+            delivery, "_fetch_distance", distance
+        ):
+            waiters = [
+                asyncio.create_task(delivery.get_delivery_quote(address))
+                for address in (
+                    "123 Main St, Chicago, IL",
+                    "123 main st,  chicago, il",
+                    "123 Main St., Chicago, IL",
+                )
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            quotes = await asyncio.gather(*waiters)
+
+        self.assertEqual(geocode.await_count, 1)
+        self.assertEqual(distance.await_count, 1)
+        self.assertEqual({quote.fee_cents for quote in quotes}, {1500})
+
+    async def test_repeated_quote_burst_only_answers_latest_request(self):
+        quote = delivery.DeliveryQuote(ok=True, miles=5.0, distance_text="5 mi", fee_cents=0)
+        get_quote = AsyncMock(return_value=quote)
+        with patch.object(delivery_routes, "get_delivery_quote", get_quote), patch.object(
+            delivery_routes, "QUOTE_DEBOUNCE_SECONDS", 0.05
+        ):
+            first = await delivery_routes.quote_delivery(
+                DeliveryQuoteRequest(address="123 Main St, Chicago, IL"), _request("10.0.0.1")
+            )
+            middle = asyncio.create_task(
+                delivery_routes.quote_delivery(
+                    DeliveryQuoteRequest(address="123 main st, Chicago, IL"),
+                    _request("10.0.0.1"),
+                )
+            )
+            await asyncio.sleep(0)
+            latest = await delivery_routes.quote_delivery(
+                DeliveryQuoteRequest(address="123 Main St,  Chicago, IL"), _request("10.0.0.1")
+            )
+            with self.assertRaises(HTTPException) as ctx:
+                await middle
+
+        self.assertEqual(first.fee_cents, 0)
+        self.assertEqual(latest.fee_cents, 0)
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(
+            [call.args[0] for call in get_quote.await_args_list],
+            ["123 Main St, Chicago, IL", "123 Main St,  Chicago, IL"],
+        )
+
+    async def test_shoppers_sharing_an_address_do_not_supersede_each_other(self):
+        quote = delivery.DeliveryQuote(ok=True, miles=5.0, distance_text="5 mi", fee_cents=0)
+        get_quote = AsyncMock(return_value=quote)
+        with patch.object(delivery_routes, "get_delivery_quote", get_quote), patch.object(
+            delivery_routes, "QUOTE_DEBOUNCE_SECONDS", 0.05
+        ):
+            quotes = await asyncio.gather(
+                delivery_routes.quote_delivery(
+                    DeliveryQuoteRequest(address="12 Main St, Chicago, IL"), _request("10.0.0.1")
+                ),
+                delivery_routes.quote_delivery(
+                    DeliveryQuoteRequest(address="34 Oak St, Chicago, IL"), _request("10.0.0.1")
+                ),
+            )
+
+        self.assertEqual([item.fee_cents for item in quotes], [0, 0])
+        self.assertEqual(get_quote.await_count, 2)
+
+    async def test_rate_limit_is_per_client(self):
+        quote = delivery.DeliveryQuote(ok=True, miles=5.0, distance_text="5 mi", fee_cents=0)
+        with patch.object(
+            delivery_routes, "get_delivery_quote", AsyncMock(return_value=quote)
+        ), patch.object(delivery_routes, "QUOTE_RATE_LIMIT", 2), patch.object(
+            delivery_routes, "QUOTE_DEBOUNCE_SECONDS", 0
+        ):
+            payload = DeliveryQuoteRequest(address="123 Main St, Chicago, IL")
+            await delivery_routes.quote_delivery(payload, _request("10.0.0.1"))
+            await delivery_routes.quote_delivery(payload, _request("10.0.0.1"))
+            with self.assertRaises(HTTPException) as ctx:
+                await delivery_routes.quote_delivery(payload, _request("10.0.0.1"))
+            other = await delivery_routes.quote_delivery(payload, _request("10.0.0.2"))
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(other.fee_cents, 0)
+
+    async def test_untrusted_proxy_address_is_not_debounced(self):
+        quote = delivery.DeliveryQuote(ok=True, miles=5.0, distance_text="5 mi", fee_cents=0)
+        get_quote = AsyncMock(return_value=quote)
+        with patch.object(delivery_routes, "get_delivery_quote", get_quote), patch.object(
+            client_keys.settings, "trust_proxy_headers", False
+        ), patch.object(delivery_routes, "QUOTE_RATE_LIMIT", 1):
+            quotes = await asyncio.gather(
+                delivery_routes.quote_delivery(
+                    DeliveryQuoteRequest(address="12 Main St, Chicago, IL"), _request("10.0.0.1")
+                ),
+                delivery_routes.quote_delivery(
+                    DeliveryQuoteRequest(address="34 Oak St, Chicago, IL"), _request("10.0.0.2")
+                ),
+            )
+
+        self.assertEqual([item.fee_cents for item in quotes], [0, 0])
+        self.assertEqual(get_quote.await_count, 2)
+        self.assertEqual(delivery_routes.quote_clients, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
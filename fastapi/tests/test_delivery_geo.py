@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from app.services import delivery, delivery_cache, delivery_geo
+
+
+STUDIO = (42.0, -88.0)
+# One degree of latitude is ~69.09 miles.
+MILES_PER_DEGREE_LAT = 69.09
+
+
+def _north_of_studio(miles: float) -> tuple[float, float]:
+    return STUDIO[0] + miles / MILES_PER_DEGREE_LAT, STUDIO[1]
+
+
+class RoadDistanceEstimateTests(unittest.TestCase):
+    def test_haversine_matches_known_distance(self):
+        # Chicago Loop to O'Hare is roughly 15.7 straight-line miles.
+        miles = delivery_geo.haversine_miles(41.8781, -87.6298, 41.9742, -87.9073)
+        self.assertAlmostEqual(miles, 15.7, delta=0.5)
+        self.assertAlmostEqual(delivery_geo.haversine_miles(*STUDIO, *STUDIO), 0.0)
+
+    def test_tier_is_decided_only_when_bounds_agree(self):
+        fee = delivery.get_delivery_fee_cents
+        near = delivery_geo.estimate_road_distance(4.0, fee)
+        self.assertTrue(near.decided)
+        self.assertEqual(near.max_fee_cents, 0)
+        self.assertLessEqual(near.estimated_miles, 10)
+
+        boundary = delivery_geo.estimate_road_distance(8.0, fee)
+        self.assertFalse(boundary.decided)
+
+        beyond = delivery_geo.estimate_road_distance(32.0, fee)
+        self.assertTrue(beyond.decided)
+        self.assertIsNone(beyond.min_fee_cents)
+
+    def test_only_clear_cases_are_decided_around_each_boundary(self):
+        fee = delivery.get_delivery_fee_cents
+        margin = delivery_geo.LOCAL_DECISION_MARGIN_MILES
+        factor = delivery_geo.LOCAL_DECISION_ROAD_FACTOR
+        first_tier = delivery.DELIVERY_TIERS[0]["max_miles"]
+        radius = delivery.DELIVERY_TIERS[-1]["max_miles"]
+        # The first tier is only decided where even a steep detour stays in it.
+        first_tier_edge = (first_tier - margin) / factor
+        # Road distance is never shorter than the straight line, so beyond
+        # the radius plus the margin no detour can bring it back in range.
+        radius_edge = radius + margin
+        cases = [
+            (first_tier_edge - 0.1, True, 0),
+            (first_tier_edge + 0.1, False, None),
+            (first_tier - 0.1, False, None),
+            (first_tier + 0.1, False, None),
+            (delivery.DELIVERY_TIERS[1]["max_miles"] - 0.1, False, None),
+            (delivery.DELIVERY_TIERS[1]["max_miles"] + 0.1, False, None),
+            (radius - 0.1, False, None),
+            (radius + 0.1, False, None),
+            (radius_edge - 0.1, False, None),
+            (radius_edge + 0.1, True, None),
+        ]
+        for straight_miles, decided, fee_cents in cases:
+            with self.subTest(straight_miles=straight_miles):
+                estimate = delivery_geo.estimate_road_distance(straight_miles, fee)
+                self.assertIs(estimate.decided, decided)
+                if decided:
+                    self.assertEqual(estimate.min_fee_cents, fee_cents)
+
+
+class HaversinePrecheckTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        delivery_cache.clear_delivery_cache()
+        self.patches = [
+            patch.object(delivery.settings, "google_maps_api_key", "test-key"),
+            patch.object(delivery.settings, "delivery_base_lat", STUDIO[0]),
+            patch.object(delivery.settings, "delivery_base_lng", STUDIO[1]),
+            patch.object(delivery, "get_cached_delivery_lookup", AsyncMock(return_value=None)),
+            patch.object(delivery, "store_delivery_lookup", AsyncMock()),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        delivery_cache.clear_delivery_cache()
+
+    async def _quote_at(self, straight_miles: float, distance: AsyncMock):
+        lat, lng = _north_of_studio(straight_miles)
+        geocode = AsyncMock(
+            return_value=delivery.DeliveryValidationResult(
+                ok=True,
+                formatted_address="123 Main St, Somewhere, IL",
+                lat=lat,
+                lng=lng,
+                provider_status="OK",
+            )
+        )
+        with patch.object(delivery, "_validate_and_geocode", geocode), patch.object(
+            delivery, "_fetch_distance", distance
+        ):
+            return await delivery.get_delivery_quote("123 Main St, Somewhere, IL")
+
+    async def test_clearly_inside_first_tier_skips_distance_matrix(self):
+        distance = AsyncMock()
+        quote = await self._quote_at(3.0, distance)
+
+        distance.assert_not_awaited()
+        self.assertTrue(quote.ok)
+        self.assertEqual(quote.fee_cents, 0)
+        self.assertEqual(quote.provider, "local_estimate")
+        self.assertTrue(quote.distance_text.startswith("~"))
+
+    async def test_clearly_beyond_radius_skips_distance_matrix(self):
+        distance = AsyncMock()
+        quote = await self._quote_at(45.0, distance)
+
+        distance.assert_not_awaited()
+        self.assertFalse(quote.ok)
+        self.assertEqual(quote.code, "delivery_out_of_range")
+
+    async def test_first_tier_edge_uses_distance_matrix(self):
+        # A detour around water can push a 4.8-mile straight line past the
+        # first tier, so the matrix decides.
+        distance = AsyncMock(
+            return_value=delivery.DistanceMeasurement(
+                miles=10.4, distance_text="10.4 mi", provider_status="OK"
+            )
+        )
+        quote = await self._quote_at(4.8, distance)
+
+        distance.assert_awaited_once()
+        self.assertEqual(quote.fee_cents, 1500)
+        self.assertEqual(quote.provider, "google_maps")
+
+    async def test_near_tier_boundary_uses_distance_matrix(self):
+        distance = AsyncMock(
+            return_value=delivery.DistanceMeasurement(
+                miles=11.2, distance_text="11.2 mi", provider_status="OK"
+            )
+        )
+        quote = await self._quote_at(8.0, distance)
+
+        distance.assert_awaited_once()
+        self.assertEqual(quote.fee_cents, 1500)
+        self.assertEqual(quote.provider, "google_maps")
+
+    async def test_zip_centroid_estimate(self):
+        near_lat, near_lng = _north_of_studio(2.0)
+        far_lat, far_lng = _north_of_studio(60.0)
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(f"zip,lat,lng\n60008,{near_lat},{near_lng}\n53001,{far_lat},{far_lng}\n")
+            path = handle.name
+        self.addCleanup(os.unlink, path)
+        delivery_geo.load_zip_centroids.cache_clear()
+        self.addCleanup(delivery_geo.load_zip_centroids.cache_clear)
+
+        with patch.object(delivery.settings, "delivery_zip_centroids_path", path):
+            near = await delivery.estimate_delivery_for_postal_code("60008-1234")
+            far = await delivery.estimate_delivery_for_postal_code("53001")
+            unknown = await delivery.estimate_delivery_for_postal_code("99999")
+
+        self.assertEqual(near.postal_code, "60008")
+        self.assertEqual(near.min_fee_cents, 0)
+        self.assertIsNone(far.min_fee_cents)
+        self.assertIsNone(far.max_fee_cents)
+        self.assertIsNone(unknown)
+
+
+if __name__ == "__main__":
+    unittest.main()
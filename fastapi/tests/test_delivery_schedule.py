@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from datetime import date, time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.order import Order
+from app.services.delivery_schedule import (
+    backfill_delivery_schedule,
+    parse_delivery_date_time,
+)
+from app.services.orders import get_admin_orders_by_delivery_day
+
+
+def _schedule_json(day: str, window: str, ideal_time: str) -> str:
+    return json.dumps({"date": day, "timeWindow": window, "idealTime": ideal_time})
+
+
+class ParseDeliveryDateTimeTests(unittest.TestCase):
+    def test_parses_checkout_json(self):
+        schedule = parse_delivery_date_time(_schedule_json("2026-10-20", "12 PM - 4 PM", "1:30 PM"))
+
+        self.assertEqual(schedule.date, date(2026, 10, 20))
+        self.assertEqual(schedule.window, "12 PM - 4 PM")
+        self.assertEqual(schedule.ideal_time, time(13, 30))
+
+    def test_parses_legacy_iso_datetime(self):
+        schedule = parse_delivery_date_time("2026-10-20T09:15")
+
+        self.assertEqual(schedule.date, date(2026, 10, 20))
+        self.assertIsNone(schedule.window)
+        self.assertEqual(schedule.ideal_time, time(9, 15))
+
+    def test_rejects_unparseable_values(self):
+        for value in (None, "", "tomorrow", "2026-10-20", json.dumps({"date": "soon"}), "[]"):
+            self.assertIsNone(parse_delivery_date_time(value), value)
+
+
+class DeliveryScheduleQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+
+    def test_backfill_walks_batches_and_skips_bad_rows(self):
+        self.db.add_all(
+            [
+                Order(
+                    total_cents=1000,
+                    delivery_date_time=_schedule_json("2026-10-20", "4 PM - 8 PM", "5:00 PM"),
+                ),
+                Order(total_cents=1000, delivery_date_time="2026-10-21T10:00"),
+                Order(total_cents=1000, delivery_date_time="not a date"),
+                Order(total_cents=1000),
+            ]
+        )
+        self.db.commit()
+
+        self.assertEqual(backfill_delivery_schedule(self.db, batch_size=1), 2)
+        self.assertEqual(backfill_delivery_schedule(self.db, batch_size=1), 0)
+        dates = self.db.execute(
+            select(Order.delivery_date).where(Order.delivery_date.is_not(None))
+        ).scalars()
+        self.assertEqual(sorted(dates), [date(2026, 10, 20), date(2026, 10, 21)])
+
+    def test_orders_by_delivery_day_sorted_by_ideal_time(self):
+        day = date(2026, 10, 20)
+        late = Order(total_cents=1000, delivery_date=day, delivery_ideal_time=time(17, 0))
+        early = Order(total_cents=1000, delivery_date=day, delivery_ideal_time=time(9, 0))
+        deleted = Order(
+            total_cents=1000, delivery_date=day, delivery_ideal_time=time(12, 0), is_deleted=True
+        )
+        other_day = Order(total_cents=1000, delivery_date=date(2026, 10, 21))
+        self.db.add_all([late, early, deleted, other_day])
+        self.db.commit()
+
+        active = get_admin_orders_by_delivery_day(self.db, day)
+        removed = get_admin_orders_by_delivery_day(self.db, day, only_deleted=True)
+
+        self.assertEqual([order.id for order in active], [early.id, late.id])
+        self.assertEqual([order.id for order in removed], [deleted.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
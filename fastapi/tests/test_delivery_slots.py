@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.routes import delivery as delivery_routes
+from app.core.database import Base
+from app.models.delivery_slot import DeliverySlot
+from app.models.enums import OrderStatus
+from app.models.order import Order
+from app.services import delivery_slots
+from app.services.delivery_slots import (
+    get_delivery_slot_availability,
+    reclaim_delivery_slots,
+    release_delivery_slots,
+    reserve_delivery_slot,
+    set_delivery_slot_capacity,
+)
+from app.services.orders import expire_pending_orders
+
+DAY = date(2026, 2, 14)
+WINDOW = "12 PM - 4 PM"
+
+
+def make_request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/delivery/slots",
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in (headers or {}).items()
+            ],
+            "query_string": b"",
+            "client": ("127.0.0.1", 1234),
+        }
+    )
+
+
+class DeliverySlotTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        delivery_slots.clear_delivery_slot_availability_cache()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        delivery_slots.clear_delivery_slot_availability_cache()
+
+    def _reserved(self) -> int:
+        return self.db.execute(
+            select(DeliverySlot.reserved).where(
+                DeliverySlot.delivery_date == DAY, DeliverySlot.window == WINDOW
+            )
+        ).scalar_one()
+
+    def _order_with_slot(self, **values) -> Order:
+        self.assertTrue(reserve_delivery_slot(self.db, DAY, WINDOW))
+        order = Order(
+            total_cents=1000,
+            delivery_date=DAY,
+            delivery_window=WINDOW,
+            delivery_slot_reserved=True,
+            **values,
+        )
+        self.db.add(order)
+        self.db.commit()
+        return order
+
+    def test_reserve_stops_at_capacity_and_release_is_idempotent(self):
+        with patch.object(delivery_slots.settings, "delivery_slot_capacity", 2):
+            first = self._order_with_slot()
+            self._order_with_slot()
+            self.assertFalse(reserve_delivery_slot(self.db, DAY, WINDOW))
+            self.db.rollback()
+
+        first.status = OrderStatus.CANCELED
+        self.db.commit()
+        self.assertEqual(release_delivery_slots(self.db, [first.id]), 1)
+        self.assertEqual(release_delivery_slots(self.db, [first.id]), 0)
+        self.assertEqual(self._reserved(), 1)
+        self.assertFalse(first.delivery_slot_reserved)
+
+    def test_release_skips_orders_that_are_still_open(self):
+        order = self._order_with_slot()
+
+        self.assertEqual(release_delivery_slots(self.db, [order.id]), 0)
+        self.assertEqual(self._reserved(), 1)
+
+    def test_reclaim_counts_revived_paid_order(self):
+        order = self._order_with_slot(status=OrderStatus.FAILED)
+        release_delivery_slots(self.db, [order.id])
+        order.status = OrderStatus.PAID
+        self.db.commit()
+
+        self.assertEqual(reclaim_delivery_slots(self.db, [order.id]), 1)
+        self.assertEqual(reclaim_delivery_slots(self.db, [order.id]), 0)
+        self.assertEqual(self._reserved(), 1)
+
+    def test_expire_pending_orders_releases_slots(self):
+        order = self._order_with_slot()
+        order.created_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        self.db.commit()
+
+        expire_pending_orders(self.db)
+
+        self.assertEqual(order.status, OrderStatus.FAILED)
+        self.assertEqual(self._reserved(), 0)
+
+    def test_availability_fills_missing_windows_and_is_cached(self):
+        set_delivery_slot_capacity(self.db, DAY, WINDOW, 1)
+        first = get_delivery_slot_availability(self.db, DAY, 1)
+        self.assertTrue(reserve_delivery_slot(self.db, DAY, WINDOW))
+        self.db.commit()
+        cached = get_delivery_slot_availability(self.db, DAY, 1)
+        delivery_slots.clear_delivery_slot_availability_cache()
+        fresh = get_delivery_slot_availability(self.db, DAY, 1)
+
+        self.assertEqual(len(first), 3)
+        self.assertIs(cached, first)
+        slot = next(item for item in fresh if item.window == WINDOW)
+        self.assertFalse(slot.available)
+        self.assertEqual(slot.remaining, 0)
+        self.assertTrue(all(item.available for item in fresh if item.window != WINDOW))
+
+    def test_slots_route_answers_304_for_matching_etag(self):
+        response = Response()
+        body = delivery_routes.delivery_slots(
+            make_request(), response, start_date=DAY, days=2, db=self.db
+        )
+        etag = response.headers["etag"]
+
+        again = delivery_routes.delivery_slots(
+            make_request({"If-None-Match": etag}), Response(), start_date=DAY, days=2, db=self.db
+        )
+
+        self.assertEqual(len(body.slots), 6)
+        self.assertEqual(again.status_code, 304)
+
+
+class ConcurrentReservationTests(unittest.TestCase):
+    def test_concurrent_checkouts_never_oversell(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(
+                f"sqlite+pysqlite:///{directory}/slots.db",
+                connect_args={"check_same_thread": False, "timeout": 30},
+            )
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine)
+            results: list[bool] = []
+            results_lock = threading.Lock()
+
+            def checkout():
+                db = Session()
+                try:
+                    reserved = reserve_delivery_slot(db, DAY, WINDOW)
+                    db.commit()
+                finally:
+                    db.close()
+                with results_lock:
+                    results.append(reserved)
+
+            with patch.object(delivery_slots.settings, "delivery_slot_capacity", 5):
+                threads = [threading.Thread(target=checkout) for _ in range(20)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            with Session() as db:
+                reserved = db.execute(select(DeliverySlot.reserved)).scalar_one()
+            engine.dispose()
+
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(reserved, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.catalog import list_catalog
+from app.api.routes.reviews import list_reviews
+from app.api.routes.settings import get_settings
+from app.core.database import Base
+from app.models.bouquet import Bouquet
+from app.models.enums import FlowerType
+from app.models.review import Review
+from app.services.bouquet_tokens import apply_search_tokens
+from app.services.catalog_snapshot import clear_catalog_snapshot, refresh_catalog_snapshot
+from app.services.settings import invalidate_store_settings_cache, update_store_settings
+from app.utils.http_cache import PUBLIC_CACHE_CONTROL, etag_matches
+
+
+def make_request(if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode("latin-1")))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+CATALOG_QUERY = {
+    "flower": None,
+    "color": None,
+    "bouquet_type": None,
+    "style": None,
+    "mixed": None,
+    "min": None,
+    "max": None,
+    "sort": None,
+    "filter": None,
+    "cursor": None,
+    "take": 12,
+}
+
+
+class EtagMatchTests(unittest.TestCase):
+    def test_matches_exact_weak_list_and_wildcard(self):
+        etag = '"abc"'
+        self.assertTrue(etag_matches('"abc"', etag))
+        self.assertTrue(etag_matches('W/"abc"', etag))
+        self.assertTrue(etag_matches('"zzz", "abc"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches(None, etag))
+        self.assertFalse(etag_matches('"abcd"', etag))
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self):
+        clear_catalog_snapshot()
+        invalidate_store_settings_cache()
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        bouquet = Bouquet(
+            id="b1",
+            name="Blush Sonata",
+            description="Test bouquet",
+            price_cents=9800,
+            flower_type=FlowerType.ROSE,
+            style="ROSE",
+            colors="pink",
+            image="/images/mock.webp",
+        )
+        apply_search_tokens(bouquet)
+        self.db.add(bouquet)
+        self.db.add(Review(name="Ann", email="ann@example.com", rating=5, text="Lovely"))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        clear_catalog_snapshot()
+        invalidate_store_settings_cache()
+
+    def _get(self, handler, if_none_match=None, **kwargs):
+        response = Response()
+        result = handler(make_request(if_none_match), response, db=self.db, **kwargs)
+        return result, response
+
+    def test_reviews_return_304_until_content_changes(self):
+        body, response = self._get(list_reviews)
+        etag = response.headers["etag"]
+        self.assertEqual(len(body), 1)
+        self.assertEqual(response.headers["cache-control"], PUBLIC_CACHE_CONTROL)
+
+        not_modified, _ = self._get(list_reviews, etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.headers["etag"], etag)
+
+        self.db.add(Review(name="Bo", email="bo@example.com", rating=4, text="Nice"))
+        self.db.commit()
+        body, response = self._get(list_reviews, etag)
+        self.assertEqual(len(body), 2)
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_settings_etag_changes_after_update(self):
+        _, response = self._get(get_settings)
+        etag = response.headers["etag"]
+        self.assertEqual(self._get(get_settings, etag)[0].status_code, 304)
+
+        update_store_settings(self.db, {"global_discount_percent": 5})
+        body, response = self._get(get_settings, etag)
+        self.assertEqual(body.global_discount_percent, 5)
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    def test_catalog_etag_tracks_snapshot_content_and_query(self):
+        body, response = self._get(list_catalog, **CATALOG_QUERY)
+        etag = response.headers["etag"]
+        self.assertEqual(len(body.items), 1)
+        self.assertEqual(
+            self._get(list_catalog, etag, **CATALOG_QUERY)[0].status_code, 304
+        )
+
+        # Rebuilding from unchanged data keeps the ETag stable.
+        refresh_catalog_snapshot(self.db)
+        self.assertEqual(
+            self._get(list_catalog, etag, **CATALOG_QUERY)[0].status_code, 304
+        )
+
+        other_query = {**CATALOG_QUERY, "sort": "price_asc"}
+        _, other_response = self._get(list_catalog, etag, **other_query)
+        self.assertNotEqual(other_response.headers["etag"], etag)
+
+        update_store_settings(self.db, {"global_discount_percent": 20})
+        refresh_catalog_snapshot(self.db)
+        body, response = self._get(list_catalog, etag, **CATALOG_QUERY)
+        self.assertEqual(body.items[0].pricing.final_price_cents, 7840)
+        self.assertNotEqual(response.headers["etag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import orders as order_routes
+from app.core.database import Base
+from app.models.enums import OrderStatus
+from app.models.order import Order
+from app.services import orders as order_service
+from app.services.order_reconciliation import OrderReconciliationQueue
+from app.services.provider_gateway import stripe_sync_gateway
+
+EMAIL = "buyer@example.com"
+
+
+def paid_session(session_id: str) -> dict:
+    return {
+        "id": session_id,
+        "status": "complete",
+        "payment_status": "paid",
+        "amount_total": 5000,
+        "currency": "usd",
+    }
+
+
+class OrderReadReconciliationTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.queue = OrderReconciliationQueue(
+            order_service.reconcile_orders,
+            max_size=100,
+            batch_size=10,
+            session_factory=self.Session,
+        )
+        self.patches = [
+            patch.object(order_service.settings, "stripe_secret_key", "sk_test"),
+            patch.object(order_service, "paypal_is_configured", return_value=False),
+            patch.object(order_service, "order_reconciliation_queue", self.queue),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+
+    def _add_orders(self) -> dict[str, Order]:
+        now = datetime.now(timezone.utc)
+        orders = {
+            "stale": Order(email=EMAIL, total_cents=5000, stripe_session_id="cs_stale"),
+            "fresh": Order(
+                email=EMAIL, total_cents=5000, stripe_session_id="cs_fresh", synced_at=now
+            ),
+            "old_sync": Order(
+                email=EMAIL,
+                total_cents=5000,
+                stripe_session_id="cs_old",
+                synced_at=now - timedelta(hours=1),
+            ),
+            "paid": Order(
+                email=EMAIL, total_cents=5000, stripe_session_id="cs_paid", status=OrderStatus.PAID
+            ),
+        }
+        self.db.add_all(orders.values())
+        self.db.commit()
+        return orders
+
+    def test_listing_reads_db_only_and_queues_stale_pending_orders(self):
+        orders = self._add_orders()
+
+        with patch.object(order_service.stripe.checkout.Session, "retrieve") as retrieve:
+            listed = order_service.get_orders_by_email(self.db, EMAIL)
+
+        retrieve.assert_not_called()
+        self.assertEqual(len(listed), 4)
+        self.assertEqual(
+            self.queue.stats()["queued"], 2, "only never-synced and stale PENDING orders"
+        )
+        self.assertEqual(self.queue.enqueue([orders["stale"].id]), 0)
+
+    def test_order_detail_queues_stale_order_without_provider_call(self):
+        orders = self._add_orders()
+
+        with patch.object(order_service.stripe.checkout.Session, "retrieve") as retrieve:
+            order = order_routes.get_order(orders["stale"].id, db=self.db, _admin=None)
+
+        retrieve.assert_not_called()
+        self.assertEqual(order.status, OrderStatus.PENDING)
+        self.assertIsNone(order.synced_at)
+        self.assertEqual(self.queue.stats()["queued"], 1)
+
+    def test_worker_batch_reconciles_and_stamps_synced_at(self):
+        orders = self._add_orders()
+        stale_id, old_id = orders["stale"].id, orders["old_sync"].id
+        order_service.get_orders_by_email(self.db, EMAIL)
+
+        def retrieve(session_id: str, **_params) -> dict:
+            if session_id == "cs_stale":
+                return paid_session(session_id)
+            return {**paid_session(session_id), "status": "open", "payment_status": "unpaid"}
+
+        with patch.object(order_service.stripe.checkout.Session, "retrieve", side_effect=retrieve):
+            self.assertEqual(self.queue.run_once(), 2)
+
+        self.db.expire_all()
+        stale, old_sync = self.db.get(Order, stale_id), self.db.get(Order, old_id)
+        self.assertEqual(stale.status, OrderStatus.PAID)
+        self.assertIsNotNone(stale.synced_at)
+        self.assertEqual(old_sync.status, OrderStatus.PENDING)
+        self.assertGreater(
+            old_sync.synced_at.replace(tzinfo=timezone.utc),
+            datetime.now(timezone.utc) - timedelta(minutes=1),
+        )
+        self.assertEqual(self.queue.stats()["updated"], 1)
+        self.assertEqual(self.queue.stats()["queued"], 0)
+
+    def test_queue_is_bounded(self):
+        queue = OrderReconciliationQueue(
+            order_service.reconcile_orders, max_size=2, batch_size=1, session_factory=self.Session
+        )
+
+        self.assertEqual(queue.enqueue(["a", "b", "c"]), 2)
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+
+
+class ScheduledSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.patches = [
+            patch.object(order_service.settings, "stripe_secret_key", "sk_test"),
+            patch.object(order_service.settings, "order_sync_backoff_base_seconds", 30),
+            patch.object(order_service.settings, "order_sync_backoff_max_seconds", 100),
+            patch.object(order_service, "paypal_is_configured", return_value=False),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+
+    def _open_session(self, session_id: str, **_params) -> dict:
+        return {**paid_session(session_id), "status": "open", "payment_status": "unpaid"}
+
+    def test_pending_orders_back_off_exponentially(self):
+        order = Order(email=EMAIL, total_cents=5000, stripe_session_id="cs_open")
+        self.db.add(order)
+        self.db.commit()
+        order_id = order.id
+        delays = []
+
+        with patch.object(
+            order_service.stripe.checkout.Session, "retrieve", side_effect=self._open_session
+        ):
+            for _ in range(4):
+                result = order_service.sync_pending_orders(self.db)
+                self.assertEqual((result.checked, result.errors, result.updates), (1, 0, {}))
+                self.assertEqual(order_service.sync_pending_orders(self.db).checked, 0)
+                order = self.db.get(Order, order_id)
+                next_sync_at = order.next_sync_at.replace(tzinfo=timezone.utc)
+                delays.append(round((next_sync_at - datetime.now(timezone.utc)).total_seconds()))
+                order.next_sync_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+                self.db.commit()
+
+        self.assertEqual(delays, [30, 60, 100, 100])
+        self.assertEqual(self.db.get(Order, order_id).sync_attempts, 4)
+
+    def test_new_sessions_go_first_and_failures_count_as_errors(self):
+        overdue = Order(
+            email=EMAIL,
+            total_cents=5000,
+            stripe_session_id="cs_overdue",
+            sync_attempts=3,
+            next_sync_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        )
+        fresh = Order(email=EMAIL, total_cents=5000, stripe_session_id="cs_new")
+        self.db.add_all([overdue, fresh])
+        self.db.commit()
+
+        with patch.object(
+            order_service.stripe.checkout.Session, "retrieve", side_effect=RuntimeError("down")
+        ) as retrieve:
+            first = order_service.sync_pending_orders(self.db, limit=1)
+            retrieve.assert_called_once_with(
+                "cs_new", expand=order_service.STRIPE_SESSION_EXPAND
+            )
+            second = order_service.sync_pending_orders(self.db, limit=1)
+
+        self.assertEqual((first.checked, first.errors), (1, 1))
+        self.assertEqual(second.checked, 1)
+        self.assertGreater(second.lag_seconds, 3500)
+        due_at = order_service.next_order_sync_at(self.db)
+        self.assertGreater(due_at, datetime.now(timezone.utc))
+
+
+class ExpandedSessionSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.patches = [
+            patch.object(order_service.settings, "stripe_secret_key", "sk_test"),
+            patch.object(order_service, "paypal_is_configured", return_value=False),
+        ]
+        for item in self.patches:
+            item.start()
+        stripe_sync_gateway.reset_stats()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+
+    def test_unpaid_complete_sessions_resolve_with_one_call_per_order(self):
+        intents = {"cs_ok": "succeeded", "cs_declined": "requires_payment_method"}
+        orders = [
+            Order(email=EMAIL, total_cents=5000, stripe_session_id=session_id)
+            for session_id in intents
+        ]
+        self.db.add_all(orders)
+        self.db.commit()
+        order_ids = {order.stripe_session_id: order.id for order in orders}
+
+        def retrieve(session_id: str, expand: list[str]) -> dict:
+            self.assertIn("payment_intent", expand)
+            return {
+                **paid_session(session_id),
+                "payment_status": "unpaid",
+                "payment_intent": {
+                    "id": f"pi_{session_id}",
+                    "status": intents[session_id],
+                    "last_payment_error": {"code": "card_declined"},
+                    "latest_charge": {"id": "ch_1", "outcome": {"type": "issuer_declined"}},
+                },
+            }
+
+        with patch.object(
+            order_service.stripe.checkout.Session, "retrieve", side_effect=retrieve
+        ), patch.object(order_service.stripe.PaymentIntent, "retrieve") as intent_retrieve:
+            result = order_service.sync_pending_orders(self.db)
+
+        intent_retrieve.assert_not_called()
+        stats = stripe_sync_gateway.stats()
+        self.assertEqual(stats["checkout.Session.retrieve"]["calls"], 2)
+        self.assertNotIn("PaymentIntent.retrieve", stats)
+        self.assertEqual(
+            result.updates,
+            {
+                order_ids["cs_ok"]: OrderStatus.PAID,
+                order_ids["cs_declined"]: OrderStatus.FAILED,
+            },
+        )
+        declined = self.db.get(Order, order_ids["cs_declined"])
+        self.assertEqual(declined.payment_failure_code, "card_declined")
+
+
+class BulkStripeSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.patches = [
+            patch.object(order_service.settings, "stripe_secret_key", "sk_test"),
+            patch.object(order_service.settings, "stripe_bulk_sync_min_orders", 20),
+            patch.object(order_service, "paypal_is_configured", return_value=False),
+        ]
+        for item in self.patches:
+            item.start()
+        stripe_sync_gateway.reset_stats()
+
+    def tearDown(self):
+        for item in reversed(self.patches):
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+
+    def test_large_batches_are_listed_and_updated_in_one_statement(self):
+        orders = [
+            Order(email=EMAIL, total_cents=5000, stripe_session_id=f"cs_{index:03}")
+            for index in range(150)
+        ]
+        self.db.add_all(orders)
+        self.db.commit()
+        order_ids = [order.id for order in orders]
+        open_session = {"status": "open", "payment_status": "unpaid"}
+        # Stripe lists newest first; cs_149 is missing from the listing.
+        listed = [
+            {**paid_session(f"cs_{index:03}"), **({} if index % 2 else open_session)}
+            for index in range(148, -1, -1)
+        ] + [paid_session("cs_other")]
+        pages = [
+            {"data": listed[:100], "has_more": True},
+            {"data": listed[100:], "has_more": False},
+        ]
+        updates: list[int] = []
+
+        def count_updates(_conn, _cursor, statement, parameters, _context, executemany):
+            assignments, _, where = statement.partition("WHERE")
+            if "status=" in assignments and '"Order".id = ?' in where:
+                updates.append(len(parameters) if executemany else 1)
+
+        event.listen(self.engine, "before_cursor_execute", count_updates)
+        with patch.object(
+            order_service.stripe.checkout.Session, "list", side_effect=pages
+        ) as session_list, patch.object(
+            order_service.stripe.checkout.Session,
+            "retrieve",
+            side_effect=lambda session_id, **_params: paid_session(session_id),
+        ) as retrieve:
+            result = order_service.sync_pending_orders(self.db)
+        event.remove(self.engine, "before_cursor_execute", count_updates)
+
+        self.assertEqual(session_list.call_count, 2)
+        self.assertEqual(session_list.call_args_list[1].kwargs["starting_after"], "cs_049")
+        retrieve.assert_called_once_with("cs_149", expand=order_service.STRIPE_SESSION_EXPAND)
+        self.assertEqual((result.checked, result.errors), (150, 0))
+        self.assertEqual(len(result.updates), 75)
+        self.assertEqual(updates, [75])
+        self.db.expire_all()
+        statuses = [self.db.get(Order, order_id).status for order_id in order_ids]
+        self.assertEqual(statuses.count(OrderStatus.PAID), 75)
+
+
+if __name__ == "__main__":
+    unittest.main()
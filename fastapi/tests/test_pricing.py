@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from dataclasses import FrozenInstanceError
+from itertools import product
 import os
 from types import SimpleNamespace
 import unittest
@@ -11,6 +13,7 @@ from app.services.pricing import (
     clamp_percent,
     get_bouquet_discount,
     get_bouquet_pricing,
+    get_bouquet_pricing_batch,
     get_cart_item_discount,
 )
 
@@ -183,6 +186,65 @@ class PricingTests(unittest.TestCase):
         self.assertEqual(discount.percent, 11)
         self.assertEqual(discount.source, "category")
 
+    def test_batch_pricing_matches_scalar_pricing(self):
+        bouquets = [
+            make_bouquet(
+                price_cents=price,
+                discount_percent=discount_percent,
+                flower_type=flower_type,
+                is_mixed=is_mixed,
+                bouquet_type=bouquet_type,
+                colors=colors,
+            )
+            for price, discount_percent, flower_type, is_mixed, bouquet_type, colors in product(
+                (6500, 10000, 15001),
+                (0, 12),
+                ("ROSE", "TULIP"),
+                (False, True),
+                ("MONO", "MIXED", "SEASON", "", None),
+                ("Red,White", "blush, ivory", "hot pink", ""),
+            )
+        ]
+        settings_cases = [
+            make_settings(),
+            make_settings(global_discount_percent=10, global_discount_note="Weekend"),
+            make_settings(category_discount_percent=20),
+            make_settings(category_discount_percent=0, category_flower_type="ROSE"),
+            make_settings(
+                category_discount_percent=15,
+                category_discount_note="Category",
+                category_flower_type="ROSE",
+                category_mixed="mono",
+                category_color="red",
+                category_min_price_cents=9000,
+                category_max_price_cents=11000,
+                global_discount_percent=5,
+            ),
+            make_settings(category_discount_percent=25, category_mixed="mixed"),
+            make_settings(category_discount_percent=25, category_mixed="season"),
+            make_settings(category_discount_percent=30, category_color="Blush"),
+            make_settings(category_discount_percent=30, category_color="pink"),
+            make_settings(category_discount_percent=8, category_max_price_cents=6500),
+        ]
+        for settings in settings_cases:
+            with self.subTest(settings=settings):
+                self.assertEqual(
+                    get_bouquet_pricing_batch(bouquets, settings),
+                    [get_bouquet_pricing(bouquet, settings) for bouquet in bouquets],
+                )
+
+    def test_shared_batch_discount_cannot_be_mutated(self):
+        settings = make_settings(global_discount_percent=10, global_discount_note="Weekend")
+        first, second = get_bouquet_pricing_batch([make_bouquet(), make_bouquet()], settings)
+
+        self.assertIs(first["discount"], second["discount"])
+        with self.assertRaises(FrozenInstanceError):
+            first["discount"].percent = 50
+        self.assertEqual(second["discount"].percent, 10)
+
+    def test_batch_pricing_accepts_empty_input(self):
+        self.assertEqual(get_bouquet_pricing_batch([], make_settings()), [])
+
 
 if __name__ == "__main__":
     unittest.main()
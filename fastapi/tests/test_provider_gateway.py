@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from app.services.paypal import PayPalApiError
+from app.services.provider_gateway import ProviderDeadlineExceeded, ProviderGateway
+
+
+class ProviderGatewayTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_is_capped_per_provider(self):
+        gateway = ProviderGateway("test", max_concurrency=2, deadline_seconds=5)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def slow_call(value: int) -> int:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.03)
+            with lock:
+                in_flight -= 1
+            return value * 2
+
+        results = await asyncio.gather(
+            *(gateway.acall("slow", slow_call, value) for value in range(6))
+        )
+
+        self.assertEqual(results, [0, 2, 4, 6, 8, 10])
+        self.assertEqual(peak, 2)
+        stats = gateway.stats()["slow"]
+        self.assertEqual(stats["calls"], 6)
+        self.assertGreater(stats["max_seconds"], 0)
+
+    async def test_deadline_raises_and_counts_timeout(self):
+        gateway = ProviderGateway("test", max_concurrency=1, deadline_seconds=0.05)
+
+        with self.assertRaises(ProviderDeadlineExceeded):
+            await gateway.acall("hang", time.sleep, 0.3)
+        with self.assertRaises(ProviderDeadlineExceeded):
+            gateway.call("hang", time.sleep, 0.3)
+
+        self.assertEqual(gateway.stats()["hang"]["timeouts"], 2)
+
+    async def test_paypal_deadline_surfaces_as_api_error_without_status(self):
+        gateway = ProviderGateway(
+            "paypal", max_concurrency=1, deadline_seconds=0.05, error_factory=PayPalApiError
+        )
+
+        with self.assertRaises(PayPalApiError) as ctx:
+            await gateway.acall("get_order", time.sleep, 0.3)
+        self.assertIsNone(ctx.exception.status_code)
+
+    async def test_errors_are_counted_and_reraised(self):
+        gateway = ProviderGateway("test", max_concurrency=1, deadline_seconds=5)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await gateway.acall("fail", fail)
+        self.assertEqual(gateway.stats()["fail"]["errors"], 1)
+
+    def test_nested_call_from_worker_runs_inline(self):
+        gateway = ProviderGateway("test", max_concurrency=1, deadline_seconds=1)
+
+        def outer() -> str:
+            return gateway.call("inner", lambda: threading.current_thread().name)
+
+        worker_name = gateway.call("outer", outer)
+
+        self.assertTrue(worker_name.startswith("test-gateway"))
+        self.assertEqual(gateway.stats()["inner"]["calls"], 1)
+
+    def test_call_many_caps_parallelism_and_drops_late_calls(self):
+        gateway = ProviderGateway("test", max_concurrency=8, deadline_seconds=5)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def lookup(delay: float) -> float:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(delay)
+            with lock:
+                in_flight -= 1
+            return delay
+
+        started = time.monotonic()
+        results = gateway.call_many(
+            "lookup",
+            lookup,
+            [(0.02,), (0.02,), (0.5,), (0.02,), (0.02,)],
+            max_parallel=3,
+            call_deadline_seconds=0.15,
+        )
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(sorted(results), [0, 1, 3, 4])
+        self.assertLessEqual(peak, 3)
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(gateway.stats()["lookup"]["timeouts"], 1)
+
+    def test_call_many_does_not_reuse_workers_held_by_abandoned_calls(self):
+        gateway = ProviderGateway("test", max_concurrency=2, deadline_seconds=5)
+        release = threading.Event()
+        started: list[int] = []
+
+        def hang(index: int) -> int:
+            started.append(index)
+            release.wait(2)
+            return index
+
+        first = gateway.call_many(
+            "hang", hang, [(0,), (1,), (2,)], max_parallel=2, call_deadline_seconds=0.05
+        )
+        held = gateway.workers_held()
+        second = gateway.call_many("hang", hang, [(3,)], max_parallel=2)
+        release.set()
+
+        self.assertEqual((first, second), ({}, {}))
+        self.assertEqual(held, 2)
+        self.assertEqual(sorted(started), [0, 1])
+        self.assertEqual(gateway.stats()["hang"]["timeouts"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.store_settings import StoreSettings
+from app.services import settings as settings_service
+from app.services.settings import (
+    DEFAULT_SETTINGS,
+    get_store_settings,
+    invalidate_store_settings_cache,
+    update_store_settings,
+)
+
+
+class StoreSettingsCacheTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_store_settings_cache()
+        self.engine = create_engine("sqlite+pysqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.statements: list[str] = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+    def tearDown(self):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        self.db.close()
+        Base.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        invalidate_store_settings_cache()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.strip().split()[0].upper())
+
+    def test_get_returns_defaults_without_writing_missing_row(self):
+        snapshot = get_store_settings(self.db)
+
+        self.assertEqual(snapshot.id, "default")
+        self.assertEqual(
+            snapshot.first_order_discount_percent,
+            DEFAULT_SETTINGS["first_order_discount_percent"],
+        )
+        self.assertEqual(set(self.statements), {"SELECT"})
+        self.assertIsNone(self.db.execute(select(StoreSettings)).scalars().first())
+
+    def test_get_normalizes_legacy_color_in_memory_only(self):
+        self.db.add(StoreSettings(id="default", category_color="Blush"))
+        self.db.commit()
+        self.statements.clear()
+
+        snapshot = get_store_settings(self.db)
+
+        self.assertEqual(snapshot.category_color, "pink")
+        self.assertEqual(set(self.statements), {"SELECT"})
+        self.db.expire_all()
+        self.assertEqual(self.db.get(StoreSettings, "default").category_color, "Blush")
+
+    def test_get_is_served_from_cache_until_ttl_expires(self):
+        first = get_store_settings(self.db)
+        self.statements.clear()
+
+        self.assertIs(get_store_settings(self.db), first)
+        self.assertEqual(self.statements, [])
+
+        with patch.object(
+            settings_service.time,
+            "monotonic",
+            return_value=settings_service._cached_at
+            + settings_service.STORE_SETTINGS_CACHE_TTL_SECONDS,
+        ):
+            self.assertIsNot(get_store_settings(self.db), first)
+        self.assertEqual(self.statements, ["SELECT"])
+
+    def test_update_creates_row_normalizes_color_and_refreshes_cache(self):
+        stale = get_store_settings(self.db)
+
+        updated = update_store_settings(
+            self.db, {"global_discount_percent": 15, "category_color": "Ivory"}
+        )
+
+        self.assertEqual(updated.global_discount_percent, 15)
+        self.assertEqual(updated.category_color, "white")
+        self.assertIsNot(get_store_settings(self.db), stale)
+        self.assertIs(get_store_settings(self.db), updated)
+        self.assertEqual(self.db.get(StoreSettings, "default").category_color, "white")
+
+    def test_snapshot_is_immutable(self):
+        snapshot = get_store_settings(self.db)
+        with self.assertRaises(AttributeError):
+            snapshot.global_discount_percent = 50
+
+
+if __name__ == "__main__":
+    unittest.main()
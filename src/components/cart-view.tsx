@@ -661,6 +661,7 @@ export default function CartView({
   const [deliveryDate, setDeliveryDate] = useState("");
   const [deliveryTimeWindow, setDeliveryTimeWindow] = useState("");
   const [idealDeliveryTime, setIdealDeliveryTime] = useState("");
+  const [fullDeliveryWindows, setFullDeliveryWindows] = useState<string[]>([]);
   const [orderComment, setOrderComment] = useState("");
   const [phoneLocal, setPhoneLocal] = useState(() => toLocalPhoneDigits(userPhone));
   const inputRef = useRef<HTMLInputElement | null>(null);
@@ -688,6 +689,7 @@ export default function CartView({
     miles: number;
     distanceText: string;
     address: string;
+    quoteToken: string | null;
   } | null>(null);
   const [quoteError, setQuoteError] = useState<string | null>(null);
   const [quoteLoading, setQuoteLoading] = useState(false);
@@ -715,9 +717,9 @@ export default function CartView({
     isValidDateValue(deliveryDate) &&
     !isPastDateValue(deliveryDate) &&
     deliveryDate <= maxDeliveryDate;
-  const deliveryTimeWindowValid = DELIVERY_TIME_WINDOWS.some(
-    (window) => window.value === deliveryTimeWindow
-  );
+  const deliveryTimeWindowValid =
+    DELIVERY_TIME_WINDOWS.some((window) => window.value === deliveryTimeWindow) &&
+    !fullDeliveryWindows.includes(deliveryTimeWindow);
   const selectedDeliveryTimeWindow = getDeliveryTimeWindow(deliveryTimeWindow);
   const idealDeliveryTimeValid = isValidTimeValue(
     idealDeliveryTime,
@@ -737,6 +739,30 @@ export default function CartView({
   );
   const deliveryDateTimeValid =
     deliveryDateValid && deliveryTimeWindowValid && idealDeliveryTimeValid;
+
+  useEffect(() => {
+    if (!deliveryDateValid) {
+      setFullDeliveryWindows([]);
+      return;
+    }
+    let active = true;
+    fetch(`/api/delivery/slots?startDate=${encodeURIComponent(deliveryDate)}&days=1`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((payload) => {
+        if (!active || !Array.isArray(payload?.slots)) return;
+        setFullDeliveryWindows(
+          payload.slots
+            .filter((slot: { available?: boolean }) => slot.available === false)
+            .map((slot: { window: string }) => slot.window)
+        );
+      })
+      .catch(() => {
+        // Availability is advisory; checkout still enforces capacity.
+      });
+    return () => {
+      active = false;
+    };
+  }, [deliveryDate, deliveryDateValid]);
   const addressForQuote = useMemo(
     () =>
       formatAddressForQuote({
@@ -1352,6 +1378,7 @@ export default function CartView({
         miles: payload.miles,
         distanceText: payload.distanceText,
         address: trimmed,
+        quoteToken: payload.quoteToken || null,
       });
     } catch {
       if (quoteRequestIdRef.current !== requestId) return;
@@ -1826,11 +1853,14 @@ export default function CartView({
                   className="w-full min-w-0 rounded-2xl border border-stone-200 bg-white/80 px-4 py-3 text-sm text-stone-800 outline-none focus:border-stone-400"
                 >
                   <option value="">Select time</option>
-                  {DELIVERY_TIME_WINDOWS.map((window) => (
-                    <option key={window.value} value={window.value}>
-                      {window.label}
-                    </option>
-                  ))}
+                  {DELIVERY_TIME_WINDOWS.map((window) => {
+                    const full = fullDeliveryWindows.includes(window.value);
+                    return (
+                      <option key={window.value} value={window.value} disabled={full}>
+                        {full ? `${window.label} (fully booked)` : window.label}
+                      </option>
+                    );
+                  })}
                 </select>
               </label>
             </div>
@@ -1961,6 +1991,9 @@ export default function CartView({
           <CheckoutButton
             items={items}
             deliveryAddress={addressForQuote}
+            deliveryQuoteToken={
+              quote?.address === addressForQuote.trim() ? quote.quoteToken : null
+            }
             deliveryAddressLine1={addressLine1.trim()}
             deliveryAddressLine2={addressLine2.trim()}
             deliveryCity={addressCity.trim()}
@@ -2069,6 +2102,9 @@ export default function CartView({
           <CheckoutButton
             items={items}
             deliveryAddress={addressForQuote}
+            deliveryQuoteToken={
+              quote?.address === addressForQuote.trim() ? quote.quoteToken : null
+            }
             deliveryAddressLine1={addressLine1.trim()}
             deliveryAddressLine2={addressLine2.trim()}
             deliveryCity={addressCity.trim()}
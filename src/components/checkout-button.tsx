@@ -52,6 +52,7 @@ const recordCheckoutEvent = async (
 type CheckoutButtonProps = {
   items: CartItem[];
   deliveryAddress: string;
+  deliveryQuoteToken?: string | null;
   deliveryAddressLine1?: string;
   deliveryAddressLine2?: string;
   deliveryCity?: string;
@@ -76,6 +77,7 @@ type CheckoutButtonProps = {
 export default function CheckoutButton({
   items,
   deliveryAddress,
+  deliveryQuoteToken,
   deliveryAddressLine1,
   deliveryAddressLine2,
   deliveryCity,
@@ -157,6 +159,7 @@ export default function CheckoutButton({
         body: JSON.stringify({
           items: checkoutItems,
           address: deliveryAddress,
+          deliveryQuoteToken: deliveryQuoteToken || undefined,
           addressLine1: deliveryAddressLine1,
           addressLine2: deliveryAddressLine2,
           city: deliveryCity,
@@ -99,6 +99,7 @@ export type Order = {
   paymentFailureMessage: string | null;
   paymentFailureDetails: string | null;
   paymentFailedAt: string | null;
+  syncedAt: string | null;
   createdAt: string;
   items: OrderItem[];
 };